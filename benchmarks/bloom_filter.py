@@ -0,0 +1,100 @@
+"""
+Registered-Email Bloom Filter Benchmark
+
+Measures the ``utils.bloom.BloomFilter`` that backs the registration
+prefilter. For each size and target false-positive rate it reports:
+
+- memory: filter bytes, bits per email and MB per million emails, next to
+  the memory of a Python ``set`` holding the same emails
+- the false-positive rate measured with emails that were never added
+  (there are no false negatives by construction; this is checked too)
+- add and lookup throughput
+- the size of the persisted file
+
+Usage:
+    python -m benchmarks.bloom_filter --items 100000 1000000 --fp-rates 0.01 0.001 --output bloom.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from utils.bloom import BloomFilter
+
+
+def email(i, domain="example.com"):
+    return f"guest{i}@{domain}"
+
+
+def set_memory(items):
+    """Bytes used by a set of the emails, including the strings themselves."""
+    values = set(items)
+    return sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+
+
+def run_case(items, fp_rate, probes, workdir):
+    bloom = BloomFilter(items, fp_rate)
+    emails = [email(i) for i in range(items)]
+
+    start = time.perf_counter()
+    for value in emails:
+        bloom.add(value)
+    add_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    false_negatives = sum(1 for value in emails[:probes] if value not in bloom)
+    hit_seconds = time.perf_counter() - start
+
+    unseen = [email(i, "unseen.org") for i in range(probes)]
+    start = time.perf_counter()
+    false_positives = sum(1 for value in unseen if value in bloom)
+    miss_seconds = time.perf_counter() - start
+
+    path = os.path.join(workdir, f"bloom-{items}-{fp_rate}.bin")
+    bloom.save(path)
+    loaded = BloomFilter.load(path)
+    assert loaded is not None and loaded.bits == bloom.bits
+
+    return {
+        "items": items,
+        "target_fp_rate": fp_rate,
+        "hashes": bloom.num_hashes,
+        "filter_bytes": bloom.size_bytes,
+        "file_bytes": os.path.getsize(path),
+        "bits_per_item": round(bloom.num_bits / items, 2),
+        "mb_per_million": round(bloom.size_bytes / items * 1_000_000 / 1_048_576, 3),
+        "python_set_mb_per_million": round(set_memory(emails) / items * 1_000_000 / 1_048_576, 1),
+        "measured_fp_rate": round(false_positives / probes, 6),
+        "expected_fp_rate": round(bloom.expected_fp_rate(), 6),
+        "false_negatives": false_negatives,
+        "adds_per_s": round(items / add_seconds),
+        "lookup_hit_ns": round(hit_seconds / min(probes, items) * 1e9),
+        "lookup_miss_ns": round(miss_seconds / probes * 1e9),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the registered-email Bloom filter.")
+    parser.add_argument("--items", type=int, nargs="+", default=[100_000, 1_000_000], help="Emails added.")
+    parser.add_argument("--fp-rates", type=float, nargs="+", default=[0.01, 0.001], help="Target FP rates.")
+    parser.add_argument("--probes", type=int, default=200_000, help="Unseen emails used to measure FPs.")
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as to stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="hotel-bloom-") as workdir:
+        cases = [run_case(items, fp_rate, args.probes, workdir)
+                 for items in args.items for fp_rate in args.fp_rates]
+    text = json.dumps({"benchmark": "bloom_filter", "cases": cases}, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Double-Booking Stress Test
+
+Many threads in several processes book a handful of rooms for overlapping
+dates through ``HotelService.book``, as fast as they can. Each process has
+its own availability index, which goes stale as soon as another process
+books, so cross-process races reach the database. There, only the
+conditional room claim (``CLAIM_ROOM``) stands between them and a double
+booking. Within a process, the per-room locks serialize bookings of the
+same room.
+
+Afterwards every pair of active bookings of the same room is checked for a
+shared night. The report is JSON: bookings made, requests refused because
+the room was taken, retryable conflicts, unexpected errors, throughput, and
+the number of double bookings. The exit status is 1 if any double booking
+exists.
+
+Each run uses a fresh SQLite database (the local stand-in for Snowflake).
+
+Usage:
+    python -m benchmarks.double_booking --processes 4 --threads 32 --attempts 100 --rooms 5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+# Active bookings that share a night with another active booking of the same
+# room (a same-day booking holds its check-in night).
+DOUBLE_BOOKINGS_SQL = """
+    SELECT a.booking_id, b.booking_id, a.room_id
+    FROM bookings a
+    JOIN bookings b ON a.room_id = b.room_id AND a.booking_id < b.booking_id
+    WHERE (a.status = 'CONFIRMED' OR a.cancellation_status = 'PARTIAL CANCELLED')
+      AND (b.status = 'CONFIRMED' OR b.cancellation_status = 'PARTIAL CANCELLED')
+      AND a.check_in < CASE WHEN b.check_out > b.check_in THEN b.check_out ELSE DATE(b.check_in, '+1 day') END
+      AND b.check_in < CASE WHEN a.check_out > a.check_in THEN a.check_out ELSE DATE(a.check_in, '+1 day') END
+"""
+
+
+def seed(rooms, customers):
+    from config.db_config import get_connection
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO rooms (room_id, room_type, price, is_available) VALUES (%s, %s, %s, %s)",
+            [(room_id, "Double", 100.0, True) for room_id in range(1, rooms + 1)]
+        )
+        cursor.executemany(
+            "INSERT INTO customers (customer_id, first_name, last_name, email, password, phone_number) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [(i, "Stress", f"Guest{i}", f"guest{i}@example.com", f"pw{i}", "5550000000")
+             for i in range(1, customers + 1)]
+        )
+        conn.commit()
+        cursor.close()
+
+
+def guest(thread_id, args, counts, lock):
+    from modules.service import BookRequest, HotelService
+    from utils.exceptions import BookingConflictError, BookingError
+
+    rng = random.Random(args.seed * 1000003 + os.getpid() * 1009 + thread_id)
+    first_night = date.today() + timedelta(days=1)
+    local = {"booked": 0, "taken": 0, "conflicts": 0, "errors": 0}
+    for _ in range(args.attempts):
+        check_in = first_night + timedelta(days=rng.randrange(args.days))
+        check_out = check_in + timedelta(days=rng.randint(0, 3))
+        request = BookRequest(rng.randint(1, args.customers), rng.randint(1, args.rooms), check_in, check_out)
+        try:
+            HotelService.book(request)
+            local["booked"] += 1
+        except BookingConflictError:
+            local["conflicts"] += 1
+        except BookingError:
+            local["taken"] += 1
+        except Exception as e:
+            local["errors"] += 1
+            print(f"unexpected error: {type(e).__name__}: {e}", file=sys.stderr)
+    with lock:
+        for key, value in local.items():
+            counts[key] += value
+
+
+def worker(args, results):
+    """One process: ``args.threads`` guests booking at once."""
+    counts = {"booked": 0, "taken": 0, "conflicts": 0, "errors": 0}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=guest, args=(i, args, counts, lock)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(counts)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hammer a few rooms with concurrent bookings.")
+    parser.add_argument("--processes", type=int, default=4, help="Processes, each with its own caches.")
+    parser.add_argument("--threads", type=int, default=32, help="Booking threads per process.")
+    parser.add_argument("--attempts", type=int, default=100, help="Booking attempts per thread.")
+    parser.add_argument("--rooms", type=int, default=5, help="Rooms being fought over.")
+    parser.add_argument("--days", type=int, default=30, help="Check-in dates are spread over this many days.")
+    parser.add_argument("--customers", type=int, default=100, help="Customers seeded.")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed.")
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as to stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="hotel-stress-") as workdir:
+        os.environ["DB_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(workdir, "hotel.db")
+        os.environ["DB_POOL_MAX_SIZE"] = str(args.threads)
+        os.environ.setdefault("LOG_FILE", os.path.join(workdir, "bench.log"))
+        os.environ.setdefault("LOG_STDOUT_LEVEL", "ERROR")
+        os.environ["EMAIL_BLOOM_PATH"] = os.path.join(workdir, "email_bloom.bin")
+        os.environ["JOURNAL_DIR"] = os.path.join(workdir, "journal")
+        from utils.logger import setup_logger
+        setup_logger()
+        seed(args.rooms, args.customers)
+
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        processes = [context.Process(target=worker, args=(args, results)) for _ in range(args.processes)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        counts = {"booked": 0, "taken": 0, "conflicts": 0, "errors": 0}
+        for _ in processes:
+            for key, value in results.get().items():
+                counts[key] += value
+        for process in processes:
+            process.join()
+        seconds = time.perf_counter() - start
+
+        from config.db_config import get_connection, use_backend
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(DOUBLE_BOOKINGS_SQL)
+            doubles = cursor.fetchall()
+            cursor.execute("SELECT COUNT(*) FROM bookings")
+            stored = cursor.fetchone()[0]
+            cursor.close()
+        use_backend("sqlite")  # Release the stress database before the directory is removed
+
+    attempts = args.processes * args.threads * args.attempts
+    report = {
+        "benchmark": "double_booking",
+        "processes": args.processes,
+        "threads_per_process": args.threads,
+        "rooms": args.rooms,
+        "attempts": attempts,
+        **counts,
+        "bookings_stored": stored,
+        "attempts_per_s": round(attempts / seconds, 1),
+        "double_bookings": len(doubles),
+        "examples": [list(row) for row in doubles[:10]],
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 1 if doubles or stored != counts["booked"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
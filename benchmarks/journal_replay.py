@@ -0,0 +1,189 @@
+"""
+Event Journal Benchmark
+
+Measures the booking event journal (``modules.events``): how fast events are
+appended, and how long a process takes to rebuild its room cache and
+availability index from a snapshot plus the journal tail, compared with
+loading them from the database.
+
+A fresh SQLite database (the local stand-in for Snowflake) is seeded with
+rooms and bookings, and a snapshot is written. Then ``--tail`` more bookings
+and cancellations are made through their journal events. Both rebuild paths
+must end with identical caches. The report is JSON.
+
+Usage:
+    python -m benchmarks.journal_replay --rooms 2000 --bookings 200000 --tail 50000 --output journal.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+
+def seed(rooms, bookings, rng):
+    """Fills the database with rooms and non-overlapping bookings per room."""
+    from config.db_config import get_connection
+
+    today = date.today()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO rooms (room_id, room_type, price, is_available) VALUES (%s, %s, %s, %s)",
+            [(room_id, rng.choice(("Single", "Double", "Suite")), float(rng.randint(60, 400)), True)
+             for room_id in range(1, rooms + 1)]
+        )
+        next_check_in = {room_id: today for room_id in range(1, rooms + 1)}
+        rows = []
+        for booking_id in range(1, bookings + 1):
+            room_id = rng.randint(1, rooms)
+            check_in = next_check_in[room_id]
+            check_out = check_in + timedelta(days=rng.randint(1, 5))
+            next_check_in[room_id] = check_out + timedelta(days=rng.randint(0, 3))
+            rows.append((booking_id, room_id, check_in, check_out, 100.0))
+        cursor.executemany(
+            "INSERT INTO bookings (booking_id, room_id, check_in, check_out, total_amount) VALUES (%s, %s, %s, %s, %s)",
+            rows
+        )
+        conn.commit()
+        cursor.close()
+    return next_check_in
+
+
+def journal_tail(count, next_check_in, first_booking_id, rng):
+    """
+    Appends ``count`` booking events (new bookings, cancellations, shortenings).
+
+    Returns:
+        float: Seconds spent appending.
+    """
+    from modules.availability import availability_index
+    from modules.events import BOOKING_CANCELLED, BOOKING_CREATED, BOOKING_SHORTENED, event_log
+
+    booking_id = first_booking_id
+    created = []
+    start = time.perf_counter()
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.7 or not created:
+            booking_id += 1
+            room_id = rng.randint(1, len(next_check_in))
+            check_in = next_check_in[room_id]
+            check_out = check_in + timedelta(days=rng.randint(2, 5))
+            next_check_in[room_id] = check_out
+            event = dict(booking_id=booking_id, room_id=room_id, check_in=check_in, check_out=check_out)
+            event_log.record(BOOKING_CREATED, total_amount=100.0, **event)
+            created.append(event)
+        elif roll < 0.85:
+            event = created.pop(rng.randrange(len(created)))
+            event_log.record(BOOKING_CANCELLED, booking_id=event["booking_id"], room_id=event["room_id"])
+        else:
+            event = created[rng.randrange(len(created))]
+            event_log.record(BOOKING_SHORTENED, booking_id=event["booking_id"], room_id=event["room_id"],
+                             check_out=event["check_in"] + timedelta(days=1))
+    seconds = time.perf_counter() - start
+    # Apply the same events to the database, so a cold load sees them too.
+    from config.db_config import get_connection
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for seq, event in event_log.events():
+            if event["type"] == BOOKING_CREATED:
+                cursor.execute(
+                    "INSERT INTO bookings (booking_id, room_id, check_in, check_out, total_amount) "
+                    "VALUES (%s, %s, %s, %s, %s)",
+                    (event["booking_id"], event["room_id"], event["check_in"], event["check_out"], 100.0)
+                )
+            elif event["type"] == BOOKING_CANCELLED:
+                cursor.execute("UPDATE bookings SET status = 'CANCELLED', cancellation_status = 'CANCELLED' "
+                               "WHERE booking_id = %s", (event["booking_id"],))
+            elif event["type"] == BOOKING_SHORTENED:
+                cursor.execute("UPDATE bookings SET check_out = %s WHERE booking_id = %s",
+                               (event["check_out"], event["booking_id"]))
+        conn.commit()
+        cursor.close()
+    availability_index.invalidate()
+    return seconds
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark journal appends and cache rebuilds.")
+    parser.add_argument("--rooms", type=int, default=2000, help="Rooms seeded.")
+    parser.add_argument("--bookings", type=int, default=200000, help="Bookings in the database and snapshot.")
+    parser.add_argument("--tail", type=int, default=50000, help="Events appended after the snapshot.")
+    parser.add_argument("--segment-bytes", type=int, default=4 * 1024 * 1024, help="Journal segment size.")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed.")
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as to stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="hotel-journal-") as workdir:
+        os.environ.setdefault("LOG_FILE", os.path.join(workdir, "bench.log"))
+        os.environ.setdefault("LOG_STDOUT_LEVEL", "ERROR")
+        os.environ["JOURNAL_DIR"] = os.path.join(workdir, "journal")
+        os.environ["JOURNAL_SEGMENT_BYTES"] = str(args.segment_bytes)
+        os.environ["ROOM_CACHE_TTL"] = os.environ["AVAILABILITY_TTL"] = "86400"
+        from utils.logger import setup_logger
+        setup_logger()
+        from config.backends.sqlite_backend import SQLiteBackend
+        from config.db_config import use_backend
+        from modules.availability import availability_index
+        from modules.events import event_log
+        from modules.room_cache import room_cache
+
+        use_backend(SQLiteBackend(os.path.join(workdir, "hotel.db")))
+        rng = random.Random(args.seed)
+        next_check_in = seed(args.rooms, args.bookings, rng)
+
+        start = time.perf_counter()
+        snapshot = event_log.snapshot()
+        snapshot_seconds = time.perf_counter() - start
+        append_seconds = journal_tail(args.tail, next_check_in, args.bookings, rng)
+
+        room_cache.invalidate()
+        availability_index.invalidate()
+        start = time.perf_counter()
+        room_cache.get(1)
+        availability_index.is_free(1, date.today(), date.today())
+        database_seconds = time.perf_counter() - start
+        from_database = (dict(availability_index._bookings), dict(room_cache._rooms))
+
+        room_cache.invalidate()
+        availability_index.invalidate()
+        warm = event_log.warm_start()
+        from_journal = (dict(availability_index._bookings), dict(room_cache._rooms))
+
+        stats = event_log.journal().stats()
+        snapshot_bytes = sum(os.path.getsize(os.path.join(event_log.directory, name))
+                             for name in os.listdir(event_log.directory) if name.endswith(".snapshot.json"))
+        use_backend("sqlite")  # Release the benchmark database before the directory is removed
+
+    report = {
+        "benchmark": "journal_replay",
+        "rooms": args.rooms,
+        "bookings": args.bookings,
+        "tail_events": args.tail,
+        "snapshot": {"seq": snapshot["seq"], "ms": round(snapshot_seconds * 1000, 1), "bytes": snapshot_bytes},
+        "append": {"events_per_s": round(args.tail / append_seconds), "mean_us": round(append_seconds / args.tail * 1e6, 1)},
+        "journal": {"segments": stats["segments"], "bytes": stats["bytes"]},
+        "rebuild": {
+            "database_ms": round(database_seconds * 1000, 1),
+            "journal_ms": round(warm["seconds"] * 1000, 1),
+            "replayed": warm["projections"].get("availability", {}).get("replayed", 0),
+        },
+        "identical": from_database == from_journal,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0 if report["identical"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
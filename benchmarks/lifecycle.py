@@ -0,0 +1,332 @@
+"""
+Booking Lifecycle Load Benchmark
+
+Simulates N concurrent virtual guests, each running the lifecycle ``main.py``
+drives through ``HotelService``:
+
+    register -> login -> list rooms -> quote -> book & pay -> view history
+             -> partial cancel -> full cancel
+
+The run uses a fresh SQLite database (the local stand-in for Snowflake),
+seeded with a configurable number of rooms, customers and existing bookings.
+Registration emails are queued in a private outbox whose workers are never
+started, so only the cost of queueing is measured.
+
+The report is JSON. It has throughput and p50/p95/p99/mean latency per
+operation. It also has the statements executed per operation, which is a
+DB round trip each on Snowflake. Use ``--output`` to keep the report and
+``--baseline`` to compare it with an earlier commit's report.
+
+Usage:
+    python -m benchmarks.lifecycle --guests 16 --iterations 5 --rooms 200 --output bench.json
+    python -m benchmarks.lifecycle --baseline bench.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+OPERATIONS = (
+    "register", "login", "list_rooms", "quote", "book", "history", "cancel_partial", "cancel_full"
+)
+ROOM_TYPES = (("Single", 80.0), ("Double", 120.0), ("Deluxe", 200.0), ("Suite", 350.0))
+
+
+class Recorder:
+    """Collects per-operation latencies, errors and statement counts from all guest threads."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.latencies = {name: [] for name in OPERATIONS}
+        self.statements = {name: 0 for name in OPERATIONS}
+        self.errors = {name: {} for name in OPERATIONS}
+
+    def count_statement(self):
+        self._local.statements = getattr(self._local, "statements", 0) + 1
+
+    @contextmanager
+    def measure(self, name):
+        self._local.statements = 0
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self._lock:
+                self.errors[name][type(e).__name__] = self.errors[name].get(type(e).__name__, 0) + 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies[name].append(elapsed)
+                self.statements[name] += self._local.statements
+
+
+class CountingCursor:
+    """Cursor wrapper that counts statements for the calling guest thread."""
+    def __init__(self, cursor, recorder):
+        self._cursor = cursor
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, *args, **kwargs):
+        self._recorder.count_statement()
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._recorder.count_statement()
+        return self._cursor.executemany(*args, **kwargs)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def letters(n):
+    """Encodes a number as letters, since the name validator only accepts alphabets."""
+    out = ""
+    while True:
+        n, r = divmod(n, 26)
+        out = chr(ord("a") + r) + out
+        if n == 0:
+            return out.capitalize()
+
+
+def seed(args):
+    """Fills the fresh database with rooms, customers and past bookings."""
+    from config.db_config import get_connection
+
+    rng = random.Random(args.seed)
+    today = date.today()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO rooms (room_id, room_type, price, is_available) VALUES (%s, %s, %s, %s)",
+            [(room_id, *ROOM_TYPES[room_id % len(ROOM_TYPES)], True) for room_id in range(1, args.rooms + 1)]
+        )
+        cursor.executemany(
+            "INSERT INTO customers (customer_id, first_name, last_name, email, password, phone_number) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [(i, "Seed", "Seed" + letters(i).lower(), f"seed{i}@example.com", f"Seed#{i}Pass", str(5000000000 + i))
+             for i in range(1, args.customers + 1)]
+        )
+        payments, bookings = [], []
+        for i in range(1, args.bookings + 1):
+            room_id = rng.randint(1, args.rooms)
+            # Past stays, so the seeded rows add history and index size without blocking the run.
+            check_in = today - timedelta(days=rng.randint(30, 3650))
+            nights = rng.randint(1, 7)
+            amount = ROOM_TYPES[room_id % len(ROOM_TYPES)][1] * nights
+            payments.append((i, room_id, amount))
+            bookings.append((i, i, room_id, rng.randint(1, max(args.customers, 1)), check_in,
+                             check_in + timedelta(days=nights), amount))
+        if args.customers:
+            cursor.executemany("INSERT INTO payments (payment_id, room_id, amount) VALUES (%s, %s, %s)", payments)
+            cursor.executemany(
+                "INSERT INTO bookings (booking_id, payment_id, room_id, customer_id, check_in, check_out, total_amount) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                bookings
+            )
+        conn.commit()
+        cursor.close()
+
+
+def run_guest(guest, args, recorder):
+    """Runs ``args.iterations`` lifecycles for one virtual guest."""
+    from modules.service import (
+        AuthenticateRequest, BookRequest, CancelFullRequest, CancelPartialRequest,
+        HistoryRequest, HotelService, QuoteRequest, RegisterRequest,
+    )
+    from utils.exceptions import BookingError
+
+    rng = random.Random(args.seed * 100003 + guest)
+    today = date.today()
+    for iteration in range(args.iterations):
+        n = guest * args.iterations + iteration
+        email = f"guest{n}@example.com"
+        password = f"Guest#{n}Pass"
+        with recorder.measure("register"):
+            HotelService.register(RegisterRequest("Guest", "Guest" + letters(n).lower(), email, password, str(6000000000 + n)))
+        with recorder.measure("login"):
+            token = HotelService.login(AuthenticateRequest(email, password)).token
+        profile = HotelService.current_customer(token)
+
+        bookings = []
+        for _ in range(2):
+            for _attempt in range(args.max_attempts):
+                check_in = today + timedelta(days=rng.randint(1, args.horizon))
+                check_out = check_in + timedelta(days=rng.randint(2, 5))
+                with recorder.measure("list_rooms"):
+                    rooms = HotelService.list_rooms(check_in, check_out)
+                if not rooms:
+                    continue
+                room = rng.choice(rooms)
+                with recorder.measure("quote"):
+                    quote = HotelService.quote(QuoteRequest(room.room_id, check_in, check_out))
+                try:
+                    with recorder.measure("book"):
+                        confirmation = HotelService.book(
+                            BookRequest(profile.customer_id, room.room_id, check_in, check_out, quote.total_amount)
+                        )
+                except BookingError:
+                    # Another guest took the room between listing and booking; pick again.
+                    continue
+                bookings.append(confirmation)
+                break
+
+        with recorder.measure("history"):
+            HotelService.history(HistoryRequest(profile.customer_id))
+        if bookings:
+            first = bookings[0]
+            with recorder.measure("cancel_partial"):
+                HotelService.cancel_partial(CancelPartialRequest(
+                    first.booking_id, first.check_in + timedelta(days=1), profile.customer_id
+                ))
+        if len(bookings) > 1:
+            with recorder.measure("cancel_full"):
+                HotelService.cancel_full(CancelFullRequest(bookings[1].booking_id, profile.customer_id))
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(args, recorder, elapsed):
+    operations = {}
+    total = 0
+    for name in OPERATIONS:
+        values = sorted(recorder.latencies[name])
+        count = len(values)
+        total += count
+        operations[name] = {
+            "count": count,
+            "errors": recorder.errors[name],
+            "p50_ms": _ms(percentile(values, 0.50)),
+            "p95_ms": _ms(percentile(values, 0.95)),
+            "p99_ms": _ms(percentile(values, 0.99)),
+            "mean_ms": _ms(sum(values) / count if count else None),
+            "round_trips_per_op": round(recorder.statements[name] / count, 2) if count else None,
+            "throughput_per_s": round(count / elapsed, 2) if elapsed else None,
+        }
+    return {
+        "benchmark": "lifecycle",
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "config": {
+            "guests": args.guests, "iterations": args.iterations, "rooms": args.rooms,
+            "customers": args.customers, "bookings": args.bookings, "pool_size": args.pool_size,
+            "horizon_days": args.horizon, "seed": args.seed,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "throughput_ops_per_s": round(total / elapsed, 2) if elapsed else None,
+        "operations": operations,
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def compare(report, baseline):
+    """Prints per-operation p95 and throughput changes against a previous report."""
+    print(f"\nCompared with {baseline.get('commit')} (negative p95 change is faster):", file=sys.stderr)
+    for name in OPERATIONS:
+        new, old = report["operations"].get(name), baseline.get("operations", {}).get(name)
+        if not new or not old or not new["p95_ms"] or not old["p95_ms"]:
+            continue
+        change = (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+        print(f"  {name:15} p95 {old['p95_ms']:9.3f} -> {new['p95_ms']:9.3f} ms ({change:+6.1f}%)  "
+              f"round trips {old['round_trips_per_op']} -> {new['round_trips_per_op']}", file=sys.stderr)
+    old_tput, new_tput = baseline.get("throughput_ops_per_s"), report["throughput_ops_per_s"]
+    if old_tput and new_tput:
+        print(f"  throughput {old_tput} -> {new_tput} ops/s ({(new_tput - old_tput) / old_tput * 100:+.1f}%)",
+              file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the booking lifecycle against a local SQLite database.")
+    parser.add_argument("--guests", type=int, default=8, help="Concurrent virtual guests.")
+    parser.add_argument("--iterations", type=int, default=5, help="Lifecycles per guest.")
+    parser.add_argument("--rooms", type=int, default=100, help="Rooms in the seeded dataset.")
+    parser.add_argument("--customers", type=int, default=1000, help="Pre-existing customers.")
+    parser.add_argument("--bookings", type=int, default=5000, help="Pre-existing (past) bookings.")
+    parser.add_argument("--horizon", type=int, default=365, help="Days ahead in which guests book.")
+    parser.add_argument("--max-attempts", type=int, default=5, help="Booking retries after a conflict.")
+    parser.add_argument("--pool-size", type=int, default=None, help="DB_POOL_MAX_SIZE (default: --guests).")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed.")
+    parser.add_argument("--db", default=None, help="SQLite file to create (default: a temporary file).")
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as to stdout.")
+    parser.add_argument("--baseline", default=None, help="Earlier JSON report to compare against.")
+    args = parser.parse_args(argv)
+    args.pool_size = args.pool_size or args.guests
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="hotel-bench-")
+    db_path = args.db or os.path.join(workdir, "bench.db")
+    if os.path.exists(db_path):
+        sys.exit(f"{db_path} already exists; the benchmark needs a fresh database.")
+    os.environ["DB_POOL_MAX_SIZE"] = str(args.pool_size)
+    os.environ.setdefault("LOG_FILE", os.path.join(workdir, "bench.log"))
+    os.environ["EMAIL_BLOOM_PATH"] = os.path.join(workdir, "email_bloom.bin")
+    os.environ["JOURNAL_DIR"] = os.path.join(workdir, "journal")
+    os.environ.setdefault("LOG_STDOUT_LEVEL", "ERROR")
+
+    from config.backends.sqlite_backend import SQLiteBackend
+    from config.db_config import get_pool, use_backend
+    from modules.email import Email, EmailOutbox
+    from utils.logger import setup_logger
+
+    setup_logger()
+    use_backend(SQLiteBackend(db_path))
+    # Queue registration emails without ever starting the SMTP workers.
+    Email._outbox = EmailOutbox(path=os.path.join(workdir, "outbox.db"))
+
+    seed(args)
+    recorder = Recorder()
+    pool = get_pool()
+    wrap = pool.cursor_wrapper
+    pool.cursor_wrapper = lambda cursor, conn: CountingCursor(wrap(cursor, conn) if wrap else cursor, recorder)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.guests, thread_name_prefix="guest") as executor:
+        futures = [executor.submit(run_guest, guest, args, recorder) for guest in range(args.guests)]
+        failures = [f.exception() for f in futures if f.exception() is not None]
+    elapsed = time.perf_counter() - start
+
+    report = build_report(args, recorder, elapsed)
+    report["guest_failures"] = [f"{type(e).__name__}: {e}" for e in failures]
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
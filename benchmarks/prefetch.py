@@ -0,0 +1,160 @@
+"""
+Booking Dialog Prefetch Benchmark
+
+Replays the booking dialog of ``main.py``: a guest picks a room, spends
+``--typing`` seconds typing the stay dates, and then waits for the quote.
+Before each dialog the caches are expired, as they are after the guest has
+idled at the menu past their TTLs. Each dialog is run once without a
+prefetch and once with ``prefetcher.room`` started as soon as the room is
+picked.
+
+Both runs must produce the same quotes. The report is JSON and gives the
+median and worst time from "dates entered" to "quote ready" for each.
+
+A fresh SQLite database (the local stand-in for Snowflake) is seeded with
+rooms, bookings and rate plans, so the loads that the prefetch hides are
+local queries and matrix builds rather than warehouse round trips.
+
+Usage:
+    python -m benchmarks.prefetch --rooms 2000 --bookings 200000 --dialogs 10 --typing 3
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+
+def seed(rooms, bookings, plans, rng):
+    """Fills the database with rooms, non-overlapping bookings per room and rate plans."""
+    from config.db_config import get_connection
+    from modules.rates import RatePlan, rate_engine
+
+    today = date.today()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO rooms (room_id, room_type, price, is_available) VALUES (%s, %s, %s, %s)",
+            [(room_id, rng.choice(("Single", "Double", "Suite")), float(rng.randint(60, 400)), True)
+             for room_id in range(1, rooms + 1)]
+        )
+        next_check_in = {room_id: today for room_id in range(1, rooms + 1)}
+        rows = []
+        for booking_id in range(1, bookings + 1):
+            room_id = rng.randint(1, rooms)
+            check_in = next_check_in[room_id]
+            check_out = check_in + timedelta(days=rng.randint(1, 5))
+            next_check_in[room_id] = check_out + timedelta(days=rng.randint(0, 3))
+            rows.append((booking_id, room_id, check_in, check_out, 100.0))
+        cursor.executemany(
+            "INSERT INTO bookings (booking_id, room_id, check_in, check_out, total_amount) VALUES (%s, %s, %s, %s, %s)",
+            rows
+        )
+        conn.commit()
+        cursor.close()
+    for i in range(plans):
+        start = today + timedelta(days=rng.randint(0, 600))
+        rate_engine.save_plan(RatePlan(None, f"Season {i}", rng.choice((None, "Single", "Double", "Suite")), start,
+                                       start + timedelta(days=rng.randint(7, 60)), None, 1,
+                                       round(rng.uniform(0.8, 1.5), 2)))
+
+
+def expire_caches():
+    """Forces the next read of every cache a quote uses to reload it, as after its TTL runs out."""
+    from modules.availability import availability_index
+    from modules.rates import rate_engine
+    from modules.room_cache import room_cache
+
+    room_cache.invalidate()
+    availability_index.invalidate()
+    rate_engine.invalidate()
+
+
+def dialog(room_id, check_in, check_out, typing, prefetch):
+    """
+    One booking dialog.
+
+    Returns:
+        tuple: (seconds from dates entered to quote ready, quote total, available).
+    """
+    from modules.prefetch import prefetcher
+    from modules.service import HotelService, QuoteRequest
+
+    expire_caches()
+    if prefetch:
+        prefetcher.room(room_id)
+    time.sleep(typing)  # The guest types the dates
+    start = time.perf_counter()
+    quote = HotelService.quote(QuoteRequest(room_id, check_in, check_out))
+    return time.perf_counter() - start, quote.total_amount, quote.available
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark quote latency with and without prefetching.")
+    parser.add_argument("--rooms", type=int, default=2000, help="Rooms seeded.")
+    parser.add_argument("--bookings", type=int, default=200000, help="Bookings seeded.")
+    parser.add_argument("--plans", type=int, default=50, help="Rate plans seeded.")
+    parser.add_argument("--dialogs", type=int, default=10, help="Booking dialogs replayed per mode.")
+    parser.add_argument("--typing", type=float, default=3.0, help="Seconds the guest takes to type the dates.")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed.")
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as to stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="hotel-prefetch-") as workdir:
+        os.environ["DB_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(workdir, "hotel.db")
+        os.environ.setdefault("LOG_FILE", os.path.join(workdir, "bench.log"))
+        os.environ.setdefault("LOG_STDOUT_LEVEL", "ERROR")
+        os.environ["EMAIL_BLOOM_PATH"] = os.path.join(workdir, "email_bloom.bin")
+        os.environ["JOURNAL_DIR"] = ""
+        from utils.logger import setup_logger
+        setup_logger()
+        from config.db_config import use_backend
+        from modules.prefetch import prefetcher
+
+        rng = random.Random(args.seed)
+        seed(args.rooms, args.bookings, args.plans, rng)
+        stays = []
+        for _ in range(args.dialogs):
+            check_in = date.today() + timedelta(days=rng.randint(1, 365))
+            stays.append((rng.randint(1, args.rooms), check_in, check_in + timedelta(days=rng.randint(1, 7))))
+
+        results = {False: [], True: []}
+        for room_id, check_in, check_out in stays:
+            for prefetch in (False, True):
+                results[prefetch].append(dialog(room_id, check_in, check_out, args.typing, prefetch))
+        stats = prefetcher.stats()
+        use_backend("sqlite")  # Release the benchmark database before the directory is removed
+
+    def summary(runs):
+        latencies = [seconds * 1000 for seconds, _, _ in runs]
+        return {"median_ms": round(statistics.median(latencies), 2), "max_ms": round(max(latencies), 2)}
+
+    report = {
+        "benchmark": "prefetch",
+        "rooms": args.rooms,
+        "bookings": args.bookings,
+        "rate_plans": args.plans,
+        "dialogs": args.dialogs,
+        "typing_s": args.typing,
+        "quote_ready": {"no_prefetch": summary(results[False]), "prefetch": summary(results[True])},
+        "prefetcher": stats,
+        "identical": [run[1:] for run in results[False]] == [run[1:] for run in results[True]],
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0 if report["identical"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
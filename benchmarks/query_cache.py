@@ -0,0 +1,189 @@
+"""
+Query Result Cache Benchmark
+
+Replays a read-heavy mix of booking-history page reads and daily reports,
+with occasional bookings in between, once with the query result cache off
+and once with it on (``utils.query_cache``). Both passes must return the
+same pages. The report is JSON: mean read latency per pass, the speed-up,
+and the cache's hit/miss statistics.
+
+Each run uses a fresh SQLite database (the local stand-in for Snowflake),
+so the saving per hit is a local query rather than a warehouse round trip.
+
+Usage:
+    python -m benchmarks.query_cache --customers 200 --bookings 20000 --reads 20000 --write-every 50
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+
+def seed(rooms, customers, bookings, rng):
+    """Fills the database with rooms, customers and past bookings."""
+    from config.db_config import get_connection
+
+    today = date.today()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO rooms (room_id, room_type, price, is_available) VALUES (%s, %s, %s, %s)",
+            [(room_id, rng.choice(("Single", "Double", "Suite")), float(rng.randint(60, 400)), True)
+             for room_id in range(1, rooms + 1)]
+        )
+        cursor.executemany(
+            "INSERT INTO customers (customer_id, first_name, last_name, email, password, phone_number) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            [(i, "Bench", f"Guest{i}", f"guest{i}@example.com", f"pw{i}", "5550000000")
+             for i in range(1, customers + 1)]
+        )
+        rows = []
+        for booking_id in range(1, bookings + 1):
+            check_in = today - timedelta(days=rng.randint(1, 720))
+            rows.append((booking_id, rng.randint(1, rooms), rng.randint(1, customers), check_in,
+                         check_in + timedelta(days=rng.randint(1, 5)), 100.0))
+        cursor.executemany(
+            "INSERT INTO bookings (booking_id, room_id, customer_id, check_in, check_out, total_amount) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            rows
+        )
+        conn.commit()
+        cursor.close()
+
+
+def workload(args):
+    """The same sequence of operations for both passes: ("read", customer) or ("book", customer, room, day)."""
+    rng = random.Random(args.seed)
+    # A few customers read far more often than the rest, as on a busy site.
+    weights = [1.0 / (rank + 1) for rank in range(args.customers)]
+    operations = []
+    for i in range(args.reads):
+        customer_id = rng.choices(range(1, args.customers + 1), weights)[0]
+        if args.write_every and i % args.write_every == args.write_every - 1:
+            operations.append(("book", customer_id, rng.randint(1, args.rooms), rng.randint(1, 365)))
+        elif rng.random() < args.report_share:
+            operations.append(("report", customer_id))
+        else:
+            operations.append(("read", customer_id))
+    return operations
+
+
+def run(operations, first_booking_day):
+    """
+    Runs the operations.
+
+    Returns:
+        tuple: (mean read seconds, pages read in order).
+    """
+    from modules.rollups import Rollups
+    from modules.service import BookRequest, HistoryRequest, HotelService
+    from utils.exceptions import BookingError
+
+    read_seconds = 0.0
+    reads = 0
+    pages = []
+    for operation in operations:
+        if operation[0] == "book":
+            _, customer_id, room_id, offset = operation
+            check_in = first_booking_day + timedelta(days=offset)
+            try:
+                HotelService.book(BookRequest(customer_id, room_id, check_in, check_in + timedelta(days=1)))
+            except BookingError:
+                pass
+            continue
+        start = time.perf_counter()
+        if operation[0] == "read":
+            page = HotelService.history_page(HistoryRequest(operation[1], page_size=50))
+            result = [(record.booking_id, record.status) for record in page.records]
+        else:
+            result = [(str(rollup.day), rollup.room_type, rollup.room_nights)
+                      for rollup in Rollups.report(first_booking_day, first_booking_day + timedelta(days=30))]
+        read_seconds += time.perf_counter() - start
+        reads += 1
+        pages.append(result)
+    return read_seconds / max(reads, 1), pages
+
+
+def cancel_new_bookings(first_booking_id):
+    """Puts the database back as seeded, so the second pass books the same rooms."""
+    from config.db_config import get_connection
+    from modules.availability import availability_index
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM bookings WHERE booking_id > %s", (first_booking_id,))
+        cursor.execute("DELETE FROM payments")
+        cursor.execute("DELETE FROM daily_rollups")
+        conn.commit()
+        cursor.close()
+    availability_index.invalidate()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the query result cache.")
+    parser.add_argument("--rooms", type=int, default=200, help="Rooms seeded.")
+    parser.add_argument("--customers", type=int, default=200, help="Customers seeded.")
+    parser.add_argument("--bookings", type=int, default=20000, help="Past bookings seeded.")
+    parser.add_argument("--reads", type=int, default=20000, help="Operations replayed per pass.")
+    parser.add_argument("--write-every", type=int, default=50, help="Every Nth operation is a booking; 0 for none.")
+    parser.add_argument("--report-share", type=float, default=0.1, help="Share of reads that are daily reports.")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed.")
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as to stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="hotel-query-cache-") as workdir:
+        os.environ["DB_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.join(workdir, "hotel.db")
+        os.environ.setdefault("LOG_FILE", os.path.join(workdir, "bench.log"))
+        os.environ.setdefault("LOG_STDOUT_LEVEL", "ERROR")
+        os.environ["EMAIL_BLOOM_PATH"] = os.path.join(workdir, "email_bloom.bin")
+        os.environ["JOURNAL_DIR"] = ""
+        from utils.logger import setup_logger
+        setup_logger()
+        from config.db_config import get_query_cache, query_cache_stats, use_backend
+
+        rng = random.Random(args.seed)
+        seed(args.rooms, args.customers, args.bookings, rng)
+        operations = workload(args)
+        first_booking_day = date.today() + timedelta(days=1)
+        cache = get_query_cache()
+        max_bytes = cache.max_bytes or 16 * 1024 * 1024
+
+        cache.max_bytes = 0
+        uncached_seconds, uncached_pages = run(operations, first_booking_day)
+        cancel_new_bookings(args.bookings)
+
+        cache.max_bytes = max_bytes
+        cache.clear()
+        cached_seconds, cached_pages = run(operations, first_booking_day)
+        stats = query_cache_stats()
+        use_backend("sqlite")  # Release the benchmark database before the directory is removed
+
+    report = {
+        "benchmark": "query_cache",
+        "customers": args.customers,
+        "bookings": args.bookings,
+        "operations": len(operations),
+        "bookings_made_per_pass": sum(1 for operation in operations if operation[0] == "book"),
+        "read_mean_ms": {"uncached": round(uncached_seconds * 1000, 4), "cached": round(cached_seconds * 1000, 4)},
+        "speedup": round(uncached_seconds / cached_seconds, 2) if cached_seconds else None,
+        "cache": stats,
+        "identical": uncached_pages == cached_pages,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0 if report["identical"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+"""
+Room Search Benchmark
+
+Compares the columnar room search index (``modules.room_index``) with the
+equivalent SQL query (``RoomSearchIndex.search_sql``) for searches of the form
+"rooms of type X, free for [check_in, check_out), price <= P, cheapest first".
+
+Each property size gets a fresh SQLite database (the local stand-in for
+Snowflake). It is seeded with rooms of several types and prices, plus a
+number of upcoming bookings per room. Every query is run through both paths
+and the results are checked to be identical. The report is JSON: per size,
+the index build time and memory, and p50/p95/p99 latency for the index and
+the SQL path, for both limited ("first page") and unlimited searches.
+
+Usage:
+    python -m benchmarks.room_search --rooms 1000 10000 50000 --queries 300 --output search.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOM_TYPES = (("Single", 60, 120), ("Double", 90, 180), ("Deluxe", 150, 300), ("Suite", 250, 600),
+              ("Family", 120, 240))
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def seed(rooms, bookings_per_room, rng):
+    """Fills the database with rooms and upcoming bookings; returns nothing."""
+    from config.db_config import get_connection
+
+    today = date.today()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        room_rows = []
+        for room_id in range(1, rooms + 1):
+            room_type, low, high = rng.choice(ROOM_TYPES)
+            room_rows.append((room_id, room_type, float(rng.randint(low, high)), rng.random() > 0.02))
+        cursor.executemany(
+            "INSERT INTO rooms (room_id, room_type, price, is_available) VALUES (%s, %s, %s, %s)", room_rows
+        )
+        bookings = []
+        booking_id = 0
+        for room_id in range(1, rooms + 1):
+            check_in = today + timedelta(days=rng.randint(0, 5))
+            for _ in range(bookings_per_room):
+                nights = rng.randint(1, 6)
+                booking_id += 1
+                bookings.append((booking_id, room_id, check_in, check_in + timedelta(days=nights), 100.0 * nights))
+                check_in += timedelta(days=nights + rng.randint(0, 8))
+        cursor.executemany(
+            "INSERT INTO bookings (booking_id, room_id, check_in, check_out, total_amount) VALUES (%s, %s, %s, %s, %s)",
+            bookings
+        )
+        conn.commit()
+        cursor.close()
+
+
+def random_query(rng, limit):
+    room_type, low, high = rng.choice(ROOM_TYPES)
+    check_in = date.today() + timedelta(days=rng.randint(0, 60))
+    return {
+        "room_type": room_type if rng.random() < 0.8 else None,
+        "check_in": check_in,
+        "check_out": check_in + timedelta(days=rng.randint(1, 7)),
+        "max_price": float(rng.randint(low, high)) if rng.random() < 0.8 else None,
+        "limit": limit,
+    }
+
+
+def time_queries(search, queries):
+    timings, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(**query))
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        "p50_us": round(percentile(timings, 0.50) * 1e6, 1),
+        "p95_us": round(percentile(timings, 0.95) * 1e6, 1),
+        "p99_us": round(percentile(timings, 0.99) * 1e6, 1),
+        "mean_us": round(sum(timings) / len(timings) * 1e6, 1),
+    }, results
+
+
+def run_size(rooms, args, workdir):
+    from config.backends.sqlite_backend import SQLiteBackend
+    from config.db_config import use_backend
+    from modules.availability import availability_index
+    from modules.room_cache import room_cache
+    from modules.room_index import room_index
+
+    use_backend(SQLiteBackend(os.path.join(workdir, f"rooms-{rooms}.db")))
+    room_cache.invalidate()
+    availability_index.invalidate()
+    rng = random.Random(args.seed)
+    seed(rooms, args.bookings_per_room, rng)
+
+    availability_index.is_free(1, date.today(), date.today())  # Loads the availability index
+    start = time.perf_counter()
+    room_index.search(check_in=date.today(), limit=1)  # Loads the room cache and builds the columns
+    build_seconds = time.perf_counter() - start
+
+    case = {"rooms": rooms, "bookings": rooms * args.bookings_per_room,
+            "index_build_ms": round(build_seconds * 1000, 1), "index": room_index.stats()}
+    for label, limit in (("first_page", args.limit), ("all_matches", None)):
+        queries = [random_query(rng, limit) for _ in range(args.queries)]
+        index_latency, index_results = time_queries(room_index.search, queries)
+        sql_latency, sql_results = time_queries(room_index.search_sql, queries)
+        mismatches = sum(1 for a, b in zip(index_results, sql_results) if a != b)
+        case[label] = {
+            "limit": limit,
+            "mean_results": round(sum(len(r) for r in index_results) / len(index_results), 1),
+            "index": index_latency,
+            "sql": sql_latency,
+            "speedup_p50": round(sql_latency["p50_us"] / max(index_latency["p50_us"], 0.1), 1),
+            "mismatches": mismatches,
+        }
+    return case
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the room search index against SQL.")
+    parser.add_argument("--rooms", type=int, nargs="+", default=[1000, 10000, 50000], help="Property sizes.")
+    parser.add_argument("--bookings-per-room", type=int, default=4, help="Upcoming bookings seeded per room.")
+    parser.add_argument("--queries", type=int, default=300, help="Searches per size and mode.")
+    parser.add_argument("--limit", type=int, default=20, help="Page size of the 'first_page' searches.")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed.")
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as to stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="hotel-search-") as workdir:
+        os.environ.setdefault("LOG_FILE", os.path.join(workdir, "bench.log"))
+        os.environ.setdefault("LOG_STDOUT_LEVEL", "ERROR")
+        # Nothing is reloaded by TTL during a run; both paths see the same data.
+        os.environ["ROOM_CACHE_TTL"] = os.environ["AVAILABILITY_TTL"] = "86400"
+        from utils.logger import setup_logger
+        setup_logger()
+        cases = [run_size(rooms, args, workdir) for rooms in args.rooms]
+        from config.db_config import use_backend
+        use_backend("sqlite")  # Release the last benchmark database before the directory is removed
+    report = {"benchmark": "room_search", "cases": cases}
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 1 if any(case[mode]["mismatches"] for case in cases for mode in ("first_page", "all_matches")) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
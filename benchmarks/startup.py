@@ -0,0 +1,158 @@
+"""
+Startup Benchmark
+
+Measures how long the interactive client (``main.py``) takes to show its
+first prompt, and how long the guest then waits for the first database
+query (the login lookup) after typing their credentials, with the
+background warm-up on and off.
+
+Each measurement runs in a fresh interpreter, so nothing is already
+imported or connected:
+
+- first_prompt: ``import main``, logger setup and starting the warm-up,
+  which is everything before the registration/login prompt.
+- eager_imports: the same plus importing every module the menu uses up
+  front, as ``main.py`` used to.
+- first_query: after ``--typing`` seconds at the prompt, the time until
+  ``HotelService.authenticate`` returns, including any imports and the
+  connect it still has to do.
+
+The ten slowest imports (cumulative, from ``python -X importtime``) are
+listed too. The report is JSON, with medians over ``--runs`` runs. A fresh
+SQLite database (the local stand-in for Snowflake) is used, so the connect
+measured here is a local file open rather than a warehouse login.
+
+Usage:
+    python -m benchmarks.startup --runs 5 --typing 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the menu uses, which main.py imported before the first prompt.
+MENU_MODULES = ("modules.customer", "modules.room", "modules.history", "modules.booking", "modules.payment",
+                "modules.checkin", "modules.menu", "modules.service", "modules.email", "modules.events")
+
+
+def child(mode, typing):
+    """Runs one measurement in this (fresh) interpreter and prints it as JSON."""
+    start = time.perf_counter()
+    import main
+    main.setup_logger()
+    thread = main.start_warm_up()
+    if mode == "eager_imports":
+        import importlib
+        for name in MENU_MODULES:
+            importlib.import_module(name)
+    result = {"first_prompt_ms": (time.perf_counter() - start) * 1000}
+    if mode == "first_query":
+        time.sleep(typing)
+        start = time.perf_counter()
+        from modules.service import AuthenticateRequest, HotelService
+        HotelService.authenticate(AuthenticateRequest("guest1@example.com", "pw1"))
+        result["first_query_ms"] = (time.perf_counter() - start) * 1000
+        result["warm_up_done"] = thread is None or not thread.is_alive()
+    print(json.dumps(result))
+
+
+def seed():
+    from config.db_config import get_connection, use_backend
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO customers (customer_id, first_name, last_name, email, password, phone_number) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            (1, "Bench", "Guest", "guest1@example.com", "pw1", "5550000000")
+        )
+        conn.commit()
+        cursor.close()
+    use_backend("sqlite")  # Release the database before the children open it
+
+
+def run_child(args, mode, env, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + [
+        "-m", "benchmarks.startup", "--child", mode, "--typing", str(args.typing)]
+    done = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(done.stdout.strip().splitlines()[-1]), done.stderr
+
+
+def slowest_imports(stderr, count=10):
+    """Parses ``-X importtime`` output into the ``count`` slowest imports by cumulative time."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return [{"module": name, "ms": round(us / 1000, 1)} for us, name in rows[:count]]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark time to first prompt and first query.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement.")
+    parser.add_argument("--typing", type=float, default=1.5, help="Seconds the guest spends at the prompt.")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--output", default=None, help="Write the JSON report here as well as to stdout.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.child:
+        child(args.child, args.typing)
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="hotel-startup-") as workdir:
+        env = dict(os.environ, DB_BACKEND="sqlite", SQLITE_PATH=os.path.join(workdir, "hotel.db"),
+                   LOG_FILE=os.path.join(workdir, "bench.log"), LOG_STDOUT_LEVEL="ERROR",
+                   EMAIL_BLOOM_PATH=os.path.join(workdir, "email_bloom.bin"), JOURNAL_DIR="",
+                   METRICS_FILE="")
+        os.environ.update(env)
+        from utils.logger import setup_logger
+        setup_logger()
+        seed()
+
+        runs = {"first_prompt": [], "eager_imports": [], "first_query_cold": [], "first_query_warm": []}
+        warm_up_done = []
+        for _ in range(args.runs):
+            runs["first_prompt"].append(
+                run_child(args, "first_prompt", dict(env, DB_WARMUP="1"))[0]["first_prompt_ms"])
+            runs["eager_imports"].append(
+                run_child(args, "eager_imports", dict(env, DB_WARMUP="0"))[0]["first_prompt_ms"])
+            runs["first_query_cold"].append(
+                run_child(args, "first_query", dict(env, DB_WARMUP="0"))[0]["first_query_ms"])
+            result, _ = run_child(args, "first_query", dict(env, DB_WARMUP="1"))
+            runs["first_query_warm"].append(result["first_query_ms"])
+            warm_up_done.append(result["warm_up_done"])
+        _, importtime = run_child(args, "eager_imports", dict(env, DB_WARMUP="0"), importtime=True)
+
+    median = {name: round(statistics.median(values), 1) for name, values in runs.items()}
+    report = {
+        "benchmark": "startup",
+        "runs": args.runs,
+        "typing_s": args.typing,
+        "first_prompt_ms": median["first_prompt"],
+        "eager_imports_ms": median["eager_imports"],
+        "first_query_ms": {"no_warm_up": median["first_query_cold"], "warm_up": median["first_query_warm"]},
+        "warm_up_finished_before_login": all(warm_up_done),
+        "slowest_imports": slowest_imports(importtime),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
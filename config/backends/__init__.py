@@ -0,0 +1,32 @@
+import importlib
+import os
+from config.backends.base import StorageBackend
+
+_BACKENDS = {
+    "snowflake": ("config.backends.snowflake_backend", "SnowflakeBackend"),
+    "sqlite": ("config.backends.sqlite_backend", "SQLiteBackend"),
+}
+
+
+def create_backend(name=None):
+    """
+    Instantiates a storage backend by name.
+
+    Drivers are imported on demand, so the SQLite backend can be used on a
+    machine without the Snowflake connector installed.
+
+    Args:
+        name (str): "snowflake" or "sqlite". Defaults to the DB_BACKEND
+            environment variable, then "snowflake".
+
+    Returns:
+        StorageBackend: The backend instance.
+
+    Raises:
+        ValueError: If the name does not match a known backend.
+    """
+    name = (name or os.getenv("DB_BACKEND", "snowflake")).strip().lower()
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown DB_BACKEND '{name}'. Expected one of: {', '.join(_BACKENDS)}")
+    module_name, class_name = _BACKENDS[name]
+    return getattr(importlib.import_module(module_name), class_name)()
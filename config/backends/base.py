@@ -0,0 +1,119 @@
+# Primary-key column of every table whose ids are generated by the store.
+ID_COLUMNS = {
+    "customers": "customer_id",
+    "payments": "payment_id",
+    "bookings": "booking_id",
+    "rate_plans": "rate_plan_id",
+}
+
+
+class StorageBackend:
+    """
+    StorageBackend Class
+
+    Interface every database driver implements. Modules never talk to a driver
+    directly: they borrow connections through ``config.db_config.get_connection()``,
+    which is backed by whichever backend the configuration selects.
+
+    Connections returned by ``connect()`` must be DB-API 2.0 compatible, accept
+    the ``%s`` parameter style used throughout the modules, and not autocommit:
+    writes become durable on ``conn.commit()`` and are undone by ``conn.rollback()``.
+    """
+    name = None
+    # True if the dialect can insert into several tables from one SELECT
+    # (Snowflake's INSERT ALL), letting a multi-table write be one statement.
+    supports_multi_table_insert = False
+
+    def connect(self):
+        """
+        Opens a new connection to the store.
+
+        Returns:
+            A DB-API 2.0 connection.
+        """
+        raise NotImplementedError
+
+    def initialize(self):
+        """
+        Prepares the store for use (e.g. creates the HOTEL schema).
+
+        Called once, before the first connection is handed out.
+        """
+        pass
+
+    def is_healthy(self, conn):
+        """
+        Checks whether a pooled connection can still be used.
+
+        Args:
+            conn: A connection previously returned by ``connect()``.
+
+        Returns:
+            bool: True if the connection is usable.
+        """
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            return True
+        finally:
+            cursor.close()
+
+    def statement_options(self, name):
+        """
+        Extra keyword arguments passed to the driver's ``cursor.execute``.
+
+        Args:
+            name (str): The metric name of the statement (see ``utils.instrumented_cursor``).
+
+        Returns:
+            dict: Driver-specific options; none by default.
+        """
+        return {}
+
+    def next_ids(self, cursor, *tables):
+        """
+        Draws fresh primary keys for rows that are about to be inserted.
+
+        Callers insert with explicit ids instead of re-querying for the id the
+        store generated, which is both a round trip and a race with concurrent
+        writers.
+
+        Args:
+            cursor: Cursor of the connection that will perform the inserts (an
+                ``InstrumentedCursor``, which accepts ``name=``).
+            *tables (str): Table names from ``ID_COLUMNS``, e.g. "payments".
+
+        Returns:
+            tuple: One new id per table, in argument order.
+        """
+        raise NotImplementedError
+
+    def reserve_ids(self, cursor, table, count):
+        """
+        Draws ``count`` fresh primary keys of one table for a bulk insert.
+
+        Args:
+            cursor: Cursor of the connection that will perform the inserts.
+            table (str): Table name from ``ID_COLUMNS``.
+            count (int): Number of ids needed.
+
+        Returns:
+            list: ``count`` distinct new ids, ascending.
+        """
+        raise NotImplementedError
+
+    def add_to_counters(self, cursor, table, keys, columns, rows, name):
+        """
+        Adds amounts to counter rows, creating the rows that do not exist yet.
+
+        Args:
+            cursor: Cursor of the caller's connection; the caller commits.
+            table (str): Table holding the counters.
+            keys (tuple): Key column names.
+            columns (tuple): Counter column names.
+            rows (list): Tuples of key values followed by the amounts to add.
+                Keys must be unique within ``rows``.
+            name (str): Metric name of the statement.
+        """
+        raise NotImplementedError
@@ -0,0 +1,91 @@
+import os
+import snowflake.connector
+from config.backends.base import ID_COLUMNS, StorageBackend
+
+
+class SnowflakeBackend(StorageBackend):
+    """
+    SnowflakeBackend Class
+
+    Production driver. Connects to the HOTEL database described in
+    ``snowflakeSript.sql`` using the SNOWFLAKE_* environment variables.
+    """
+    name = "snowflake"
+    supports_multi_table_insert = True
+
+    def __init__(self):
+        # Prefix of the QUERY_TAG attached to every statement, so QUERY_HISTORY
+        # rows can be joined to the per-query metrics ("hotel:book.payment").
+        self.query_tag = os.getenv("SNOWFLAKE_QUERY_TAG", "hotel")
+
+    def connect(self):
+        """
+        Opens a new Snowflake connection.
+
+        Autocommit is off, as it is on the SQLite driver: statements run in
+        a transaction that only ``conn.commit()`` makes durable, so a
+        multi-statement write (a booking's room claim, inserts and rollups)
+        commits or rolls back as a whole.
+
+        Returns:
+            snowflake.connector.SnowflakeConnection: The new connection.
+        """
+        return snowflake.connector.connect(
+            user=os.getenv("SNOWFLAKE_USER"),
+            password=os.getenv("SNOWFLAKE_PASSWORD"),
+            account=os.getenv("SNOWFLAKE_ACCOUNT"),
+            warehouse=os.getenv("SNOWFLAKE_WAREHOUSE"),
+            database=os.getenv("SNOWFLAKE_DATABASE"),
+            schema=os.getenv("SNOWFLAKE_SCHEMA"),
+            autocommit=False,
+            session_parameters={"QUERY_TAG": self.query_tag},
+        )
+
+    def is_healthy(self, conn):
+        """Uses the connector's local ``is_closed()`` flag to avoid a round trip."""
+        return not conn.is_closed()
+
+    def statement_options(self, name):
+        """Tags the statement with the query's metric name (statement-level QUERY_TAG)."""
+        return {"_statement_params": {"QUERY_TAG": f"{self.query_tag}:{name}"}}
+
+    def next_ids(self, cursor, *tables):
+        """
+        Draws ids from the <TABLE>_SEQ sequences (see ``snowflakeSript.sql``).
+
+        All ids are fetched with a single SELECT, i.e. one round trip.
+        """
+        for table in tables:
+            if table not in ID_COLUMNS:
+                raise ValueError(f"No id sequence for table '{table}'")
+        cursor.execute("SELECT " + ", ".join(f"{table.upper()}_SEQ.NEXTVAL" for table in tables), name="next_ids")
+        return tuple(cursor.fetchone())
+
+    def reserve_ids(self, cursor, table, count):
+        """Draws ``count`` values of the table's sequence with one generator SELECT."""
+        if table not in ID_COLUMNS:
+            raise ValueError(f"No id sequence for table '{table}'")
+        cursor.execute(
+            # GENERATOR needs a constant row count, so it is formatted in rather than bound.
+            f"SELECT {table.upper()}_SEQ.NEXTVAL FROM TABLE(GENERATOR(ROWCOUNT => {int(count)}))",
+            name="reserve_ids"
+        )
+        return sorted(row[0] for row in cursor.fetchall())
+
+    def add_to_counters(self, cursor, table, keys, columns, rows, name):
+        """A single MERGE over a VALUES list, so every row is applied in one round trip."""
+        if not rows:
+            return
+        width = len(keys) + len(columns)
+        source = ", ".join(f"column{i + 1} AS {column}" for i, column in enumerate(keys + columns))
+        cursor.execute(
+            f"MERGE INTO {table} t USING ("
+            f"SELECT {source} FROM VALUES {', '.join(['(' + ', '.join(['%s'] * width) + ')'] * len(rows))}"
+            f") s ON {' AND '.join(f't.{key} = s.{key}' for key in keys)} "
+            f"WHEN MATCHED THEN UPDATE SET {', '.join(f't.{column} = t.{column} + s.{column}' for column in columns)} "
+            f"WHEN NOT MATCHED THEN INSERT ({', '.join(keys + columns)}) "
+            f"VALUES ({', '.join(f's.{column}' for column in keys + columns)})",
+            [value for row in rows for value in row],
+            name=name
+        )
+
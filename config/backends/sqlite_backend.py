@@ -0,0 +1,259 @@
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+from config.backends.base import ID_COLUMNS, StorageBackend
+
+
+# Same tables and columns as snowflakeSript.sql. Declared types DATE, TIMESTAMP
+# and BOOLEAN are matched by the converters below so rows come back with the
+# same Python types the Snowflake connector returns.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS CUSTOMERS (
+    CUSTOMER_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    FIRST_NAME VARCHAR(50) NOT NULL,
+    LAST_NAME VARCHAR(50) NOT NULL,
+    EMAIL VARCHAR(100) NOT NULL UNIQUE,
+    PASSWORD VARCHAR(100) NOT NULL UNIQUE,
+    PHONE_NUMBER VARCHAR(15),
+    CREATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS ROOMS (
+    ROOM_ID INTEGER PRIMARY KEY,
+    ROOM_TYPE TEXT,
+    PRICE REAL,
+    IS_AVAILABLE BOOLEAN,
+    VERSION INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS PAYMENTS (
+    PAYMENT_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    ROOM_ID INTEGER,
+    PAYMENT_DATE TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    AMOUNT REAL NOT NULL,
+    ISREFUND BOOLEAN DEFAULT FALSE,
+    REFUNDED_AMOUNT REAL DEFAULT 0,
+    SETTLED_REFUND_ID INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS BOOKINGS (
+    BOOKING_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    PAYMENT_ID INTEGER REFERENCES PAYMENTS(PAYMENT_ID),
+    ROOM_ID INTEGER REFERENCES ROOMS(ROOM_ID),
+    CUSTOMER_ID INTEGER REFERENCES CUSTOMERS(CUSTOMER_ID),
+    CHECK_IN DATE,
+    CHECK_OUT DATE,
+    STATUS TEXT DEFAULT 'CONFIRMED',
+    CREATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    TOTAL_AMOUNT REAL NOT NULL DEFAULT 0,
+    CANCELLATION_STATUS TEXT DEFAULT 'NOT_CANCELLED',
+    CANCELLATION_TIMESTAMP TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS REFUNDS (
+    REFUND_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    PAYMENT_ID INTEGER NOT NULL REFERENCES PAYMENTS(PAYMENT_ID),
+    BOOKING_ID INTEGER REFERENCES BOOKINGS(BOOKING_ID),
+    AMOUNT REAL NOT NULL,
+    REASON TEXT,
+    CREATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS RATE_PLANS (
+    RATE_PLAN_ID INTEGER PRIMARY KEY,
+    NAME TEXT NOT NULL,
+    ROOM_TYPE TEXT,
+    START_DATE DATE,
+    END_DATE DATE,
+    WEEKDAYS TEXT,
+    MIN_NIGHTS INTEGER DEFAULT 1,
+    MULTIPLIER REAL NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS DAILY_ROLLUPS (
+    STAY_DATE DATE NOT NULL,
+    ROOM_TYPE TEXT NOT NULL,
+    ROOM_NIGHTS INTEGER NOT NULL DEFAULT 0,
+    REVENUE REAL NOT NULL DEFAULT 0,
+    REFUNDS REAL NOT NULL DEFAULT 0,
+    CANCELLATIONS INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (STAY_DATE, ROOM_TYPE)
+);
+
+CREATE INDEX IF NOT EXISTS IDX_ROOMS_AVAILABLE ON ROOMS (IS_AVAILABLE, ROOM_ID);
+CREATE INDEX IF NOT EXISTS IDX_PAYMENTS_DATE ON PAYMENTS (PAYMENT_DATE);
+CREATE INDEX IF NOT EXISTS IDX_BOOKINGS_CUSTOMER ON BOOKINGS (CUSTOMER_ID, BOOKING_ID);
+CREATE INDEX IF NOT EXISTS IDX_BOOKINGS_ROOM_DATES ON BOOKINGS (ROOM_ID, CHECK_IN, CHECK_OUT);
+CREATE INDEX IF NOT EXISTS IDX_BOOKINGS_PAYMENT ON BOOKINGS (PAYMENT_ID);
+CREATE INDEX IF NOT EXISTS IDX_REFUNDS_PAYMENT ON REFUNDS (PAYMENT_ID, REFUND_ID);
+"""
+
+_PLACEHOLDER = re.compile(r"'(?:[^']|'')*'|%s|%%")
+
+
+@lru_cache(maxsize=512)
+def to_qmark(sql):
+    """
+    Rewrites a ``%s``-style statement to SQLite's ``?`` placeholders.
+
+    Placeholders inside quoted string literals are left untouched.
+
+    Args:
+        sql (str): Statement written for the Snowflake connector.
+
+    Returns:
+        str: The equivalent statement for sqlite3.
+    """
+    def replace(match):
+        token = match.group(0)
+        if token == "%s":
+            return "?"
+        if token == "%%":
+            return "%"
+        return token
+    return _PLACEHOLDER.sub(replace, sql)
+
+
+def _convert_date(value):
+    return date.fromisoformat(value.decode())
+
+
+def _convert_timestamp(value):
+    return datetime.fromisoformat(value.decode())
+
+
+def _convert_boolean(value):
+    return value not in (b"0", b"", b"FALSE", b"false")
+
+
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("TIMESTAMP", _convert_timestamp)
+sqlite3.register_converter("BOOLEAN", _convert_boolean)
+
+
+class SQLiteCursor(sqlite3.Cursor):
+    """sqlite3 cursor that accepts the modules' ``%s`` parameter style."""
+    def execute(self, sql, parameters=()):
+        return super().execute(to_qmark(sql), parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return super().executemany(to_qmark(sql), seq_of_parameters)
+
+
+class SQLiteConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors speak the ``%s`` parameter style."""
+    def cursor(self, factory=SQLiteCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    SQLiteBackend Class
+
+    Embedded driver for local development, load tests and profiling. Creates the
+    same CUSTOMERS/ROOMS/PAYMENTS/BOOKINGS/REFUNDS/RATE_PLANS tables as the
+    Snowflake schema in a single database file running in WAL mode.
+    """
+    name = "sqlite"
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): Database file. Defaults to the SQLITE_PATH environment
+                variable, then ``hotel.db`` in the working directory.
+        """
+        self.path = path or os.getenv("SQLITE_PATH", "hotel.db")
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def connect(self):
+        """
+        Opens a new connection to the database file.
+
+        Connections are created with ``check_same_thread=False`` because the pool
+        hands them to whichever thread borrows them next; the pool guarantees a
+        connection is only used by one thread at a time.
+
+        Returns:
+            SQLiteConnection: The new connection.
+        """
+        conn = sqlite3.connect(
+            self.path,
+            timeout=30,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,
+            factory=SQLiteConnection,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def initialize(self):
+        """Creates the HOTEL tables and indexes if they do not exist yet."""
+        with self._init_lock:
+            if self._initialized:
+                return
+            conn = self.connect()
+            try:
+                conn.executescript(SCHEMA)
+                # Databases created before the refund ledger lack the settlement watermark.
+                columns = {row[1].upper() for row in conn.execute("PRAGMA table_info(PAYMENTS)")}
+                if "SETTLED_REFUND_ID" not in columns:
+                    conn.execute("ALTER TABLE PAYMENTS ADD COLUMN SETTLED_REFUND_ID INTEGER DEFAULT 0")
+                # ... and before booking claims, the room version.
+                columns = {row[1].upper() for row in conn.execute("PRAGMA table_info(ROOMS)")}
+                if "VERSION" not in columns:
+                    conn.execute("ALTER TABLE ROOMS ADD COLUMN VERSION INTEGER NOT NULL DEFAULT 0")
+                conn.commit()
+            finally:
+                conn.close()
+            self._initialized = True
+
+    def next_ids(self, cursor, *tables):
+        """
+        Allocates the next INTEGER PRIMARY KEY of each table.
+
+        Opens the connection's write transaction first (``BEGIN IMMEDIATE``) if
+        none is active, so no other writer can take the same ids before the
+        caller's inserts commit. MAX() over the primary key is an index lookup.
+        """
+        if not cursor.connection.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE", name="begin_immediate")
+        cursor.execute("SELECT " + ", ".join(
+            f"COALESCE((SELECT MAX({ID_COLUMNS[table]}) FROM {table}), 0) + 1" for table in tables
+        ), name="next_ids")
+        return tuple(cursor.fetchone())
+
+    def reserve_ids(self, cursor, table, count):
+        """
+        Takes the ``count`` ids after the table's current MAX, inside the write
+        transaction that ``next_ids`` opens, so the block stays contiguous.
+        """
+        (first_id,) = self.next_ids(cursor, table)
+        return list(range(first_id, first_id + count))
+
+    def add_to_counters(self, cursor, table, keys, columns, rows, name):
+        """One INSERT ... ON CONFLICT DO UPDATE, executed for every row."""
+        if not rows:
+            return
+        cursor.executemany(
+            f"INSERT INTO {table} ({', '.join(keys + columns)}) "
+            f"VALUES ({', '.join(['%s'] * (len(keys) + len(columns)))}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET "
+            + ", ".join(f"{column} = {column} + excluded.{column}" for column in columns),
+            rows,
+            name=name
+        )
+
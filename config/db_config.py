@@ -1,16 +1,157 @@
-import snowflake.connector
 import os
+import threading
+import time
 from dotenv import load_dotenv
+from config.backends import create_backend
+from utils.connection_pool import ConnectionPool
+from utils.instrumented_cursor import InstrumentedCursor
+from utils.metrics import metrics
+from utils.query_cache import QueryCache
 
 load_dotenv()  # Load environment variables from a .env file
 
+_backend = None
+_pool = None
+_pool_lock = threading.Lock()
+_query_cache = None
+
+
+def get_backend():
+    """
+    Returns the configured storage backend, creating it on first use.
+
+    The backend is chosen with the DB_BACKEND environment variable
+    ("snowflake" by default, or "sqlite" for the embedded engine).
+    """
+    global _backend
+    if _backend is None:
+        with _pool_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def use_backend(backend):
+    """
+    Switches the process to another storage backend.
+
+    Closes the current pool and empties the query cache, so later
+    ``get_connection()`` calls are served by the new backend. Intended for
+    load tests, profiling and local tooling.
+
+    Args:
+        backend (StorageBackend | str): A backend instance or its name.
+    """
+    global _backend, _pool
+    if isinstance(backend, str):
+        backend = create_backend(backend)
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _backend = backend
+        _pool = None
+    get_query_cache().clear()
+
+
+def create_connection():
+    """Opens a brand-new connection on the configured backend. Prefer ``get_connection()``."""
+    return get_backend().connect()
+
+
+def get_query_cache():
+    """
+    Returns the process-wide query result cache, creating it on first use.
+
+    Sized by the environment: QUERY_CACHE_BYTES (default 16 MiB; 0 turns the
+    cache off) and QUERY_CACHE_TTL seconds (default 30). Only queries executed
+    with ``cache=True`` are cached; see ``utils.query_cache.QueryCache``.
+    """
+    global _query_cache
+    if _query_cache is None:
+        with _pool_lock:
+            if _query_cache is None:
+                _query_cache = QueryCache(
+                    max_bytes=int(os.getenv("QUERY_CACHE_BYTES", str(16 * 1024 * 1024))),
+                    ttl=float(os.getenv("QUERY_CACHE_TTL", "30")),
+                )
+    return _query_cache
+
+
+def get_pool():
+    """
+    Returns the process-wide connection pool, creating it on first use.
+
+    Pool sizing is read from the environment:
+        DB_POOL_MAX_SIZE (default 5), DB_POOL_IDLE_TIMEOUT seconds (default 300),
+        DB_POOL_ACQUIRE_TIMEOUT seconds (default 30).
+
+    Cursors opened on pooled connections are ``InstrumentedCursor`` objects, so
+    every statement is timed and counted in ``utils.metrics.metrics``, and
+    reads and writes go through the query cache.
+    """
+    global _pool
+    if _pool is None:
+        backend = get_backend()
+        query_cache = get_query_cache()
+        with _pool_lock:
+            if _pool is None:
+                backend.initialize()
+                _pool = ConnectionPool(
+                    backend.connect,
+                    max_size=int(os.getenv("DB_POOL_MAX_SIZE", "5")),
+                    idle_timeout=float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300")),
+                    acquire_timeout=float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "30")),
+                    health_check=backend.is_healthy,
+                    cursor_wrapper=lambda cursor, conn: InstrumentedCursor(
+                        cursor, backend.statement_options, query_cache, conn),
+                )
+    return _pool
+
+
+def warm_up(connections=None):
+    """
+    Prepares the database layer before the first query needs it.
+
+    Creates the backend (importing its driver), initializes it, and opens
+    and authenticates pooled connections, so the first real query does not
+    pay for the connect handshake.
+
+    Args:
+        connections (int): Connections to open. Defaults to the
+            DB_WARMUP_CONNECTIONS environment variable, then 1.
+
+    Returns:
+        int: Idle connections ready in the pool.
+    """
+    if connections is None:
+        connections = int(os.getenv("DB_WARMUP_CONNECTIONS", "1"))
+    start = time.perf_counter()
+    ready = get_pool().prefill(connections)
+    metrics.observe("db_warmup_seconds", time.perf_counter() - start)
+    return ready
+
+
 def get_connection():
-    conn = snowflake.connector.connect(
-        user=os.getenv("SNOWFLAKE_USER"),
-        password=os.getenv("SNOWFLAKE_PASSWORD"),
-        account=os.getenv("SNOWFLAKE_ACCOUNT"),
-        warehouse=os.getenv("SNOWFLAKE_WAREHOUSE"),
-        database=os.getenv("SNOWFLAKE_DATABASE"),
-        schema=os.getenv("SNOWFLAKE_SCHEMA")
-    )
-    return conn
+    """
+    Borrows a connection from the pool.
+
+    The returned connection can be used as a context manager; ``close()`` or
+    leaving the ``with`` block returns it to the pool instead of disconnecting.
+    The time spent waiting is recorded as ``db_pool_acquire_seconds``.
+    """
+    pool = get_pool()
+    start = time.perf_counter()
+    try:
+        return pool.acquire()
+    finally:
+        metrics.observe("db_pool_acquire_seconds", time.perf_counter() - start)
+
+
+def pool_stats():
+    """Returns acquire-wait and hit/miss counters for the connection pool."""
+    return get_pool().stats()
+
+
+def query_cache_stats():
+    """Returns hit/miss counters and the size of the query result cache."""
+    return get_query_cache().stats()
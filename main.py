@@ -1,12 +1,8 @@
 import logging
-from modules.customer import Customer
-from modules.room import Room
-from modules.history import History
-from modules.booking import Booking
-from utils.logger import setup_logger
-from modules.payment import Payment
-from modules.checkin import CheckIn
-from modules.menu import Menu
+import os
+import threading
+from utils.logger import log_context, setup_logger
+from utils.metrics import metrics, start_file_exporter
 """
 Hotel Booking System
 
@@ -23,9 +19,18 @@ Modules:
 - Payment: Processes payments for room bookings.
 - CheckIn: Handles stay duration details (check-in and check-out).
 - Menu: Displays the menu for user interaction.
-- setup_logger: Initializes logging configurations.
+- HotelService: Non-interactive service layer; this menu is a thin terminal client over it.
+- setup_logger: Configures the queued JSON logging pipeline once for the process.
+- event_log: Restores the room and availability caches from the event journal at startup.
+
+Startup:
+- Only the logger and metrics are imported before the first prompt. The service layer
+  (NumPy rate engine, caches, database driver) is imported by a background thread that also
+  opens and authenticates a database connection and restores the caches while the guest types
+  at the registration/login prompt (see ``start_warm_up``; DB_WARMUP=0 turns it off).
 
 Functions:
+- start_warm_up(): Starts the background warm-up thread.
 - main(): Entry point of the application. Manages user flow, including registration, login, room selection, 
   booking, payment, and viewing history through a menu system.
 
@@ -33,7 +38,9 @@ Usage:
 1. User chooses between registration and login.
 2. Upon login, the user can:
    - View available rooms.
-   - Book a room by selecting a valid room ID and processing payment.
+   - Book a room by selecting a valid room ID and processing payment. Everything the quote needs
+     is prefetched in the background while the dates are typed. The room is held for the chosen
+     dates while payment is collected, and the hold is released if checkout is abandoned.
    - Cancel an existing booking using a booking ID.
    - View booking history.
    - Exit the system.
@@ -46,44 +53,147 @@ Entry Point:
 - The `main()` function is executed when the script is run directly.
 """
 
+def warm_up():
+    """
+    Loads what the first database call needs, ahead of it.
+
+    Opens and authenticates pooled connections (importing the database
+    driver on the way), imports the service layer, and restores the caches
+    from the event journal. Failures are only logged: everything is loaded
+    again on first use.
+    """
+    try:
+        from config.db_config import warm_up as open_connections
+        ready = open_connections()
+        # The menu's modules pull in the whole service layer (rate engine, caches).
+        import modules.booking
+        import modules.customer
+        import modules.history
+        import modules.payment
+        import modules.room
+        from modules.events import event_log
+        event_log.warm_start()
+        logging.info(f"Warm-up done: {ready} database connection(s) ready.")
+    except Exception as e:
+        logging.warning(f"Warm-up failed; connecting on first use instead: {e}")
+
+
+def start_warm_up():
+    """
+    Runs ``warm_up`` on a daemon thread, unless DB_WARMUP is "0".
+
+    Returns:
+        threading.Thread: The warm-up thread, or None if warm-up is disabled.
+    """
+    if os.getenv("DB_WARMUP", "1") == "0":
+        return None
+    thread = threading.Thread(target=warm_up, name="startup-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
 def main():
     setup_logger()
+    start_file_exporter()
+    warm_up_thread = start_warm_up()
     logging.info("Starting the Hotel Booking System...")
     try:
-        user=None 
+        token=None 
         while True:
             ch=input('\n 1.registration   2. login \n\n')
+            # Usually imported by the warm-up thread while the guest was typing.
+            from modules.customer import Customer
             if ch =='1':
                 Customer.register()
             else: 
-                user = Customer.login()
+                token = Customer.login()
                 break
        
 
-        if user:
-            while True:
-                Menu.display_menu()
-                choice = input("Select an option: ")
-                if choice == '1':
-                    Room.fetch_rooms_from_db()
-                elif choice == '2':
-                    room_id = Booking.is_Valid_room()
-                    days, check_in, check_out=CheckIn.get_stay_duration()
-                    if check_in == check_out:
-                        days=1
-                    payment_id = Payment.process_payment(days,room_id)
-                    Booking.create_booking( payment_id,days,room_id, user[0], check_in, check_out)
-                elif choice == '3':
-                    booking_id = input("Enter your Booking ID for Cancelation : ")
-                    Booking.cancel_booking(booking_id)
-                elif choice == '4':
-                    customer_id = user[0]
-                    History.view_history(customer_id)
-                elif choice == '7':
-                    logging.info("Exiting the Hotel Booking System.")
-                    break
-                else:
-                    print("Invalid option. Please try again.")
+        if token:
+            if warm_up_thread is not None:
+                warm_up_thread.join()  # The caches must be restored before the menu uses them
+            else:
+                from modules.events import event_log
+                event_log.warm_start()
+            from config.db_config import pool_stats, query_cache_stats
+            from modules.booking import Booking
+            from modules.checkin import CheckIn
+            from modules.email import Email
+            from modules.history import History
+            from modules.menu import Menu
+            from modules.payment import Payment
+            from modules.prefetch import prefetcher
+            from modules.room import Room
+            from modules.service import BookRequest, HoldRequest, HotelService
+            from utils.exceptions import BookingConflictError, BookingError, InvalidSessionError
+            with log_context(customer_id=HotelService.current_customer(token).customer_id):
+                while True:
+                    # Identity comes from the in-memory session, not the database.
+                    try:
+                        user = HotelService.current_customer(token).as_tuple()
+                    except InvalidSessionError as e:
+                        print(e)
+                        token = Customer.login()
+                        continue
+                    Menu.display_menu()
+                    choice = input("Select an option: ")
+                    if choice == '1':
+                        room_type, max_price = Room.prompt_filters()
+                        Room.fetch_rooms_from_db(room_type=room_type, max_price=max_price)
+                    elif choice == '2':
+                        room_id = Booking.is_Valid_room()
+                        # Load the room's price, rate plans and bookings while the guest types the dates.
+                        prefetcher.room(room_id)
+                        hold = None
+                        while hold is None:
+                            days, check_in, check_out=CheckIn.get_stay_duration()
+                            try:
+                                # Keep the room for these dates while the guest pays.
+                                hold = HotelService.hold_room(HoldRequest(user[0], room_id, check_in, check_out))
+                            except BookingError as e:
+                                print(f"{e} Please choose other dates.")
+                        print(f"Room ID {room_id} is held for you for {hold.expires_in / 60:.0f} minutes.")
+                        if check_in == check_out:
+                            days=1
+                        try:
+                            paid_amount = Payment.collect_payment(days, room_id, check_in, check_out)
+                            if paid_amount is None:
+                                continue
+                            confirmation = HotelService.book(
+                                BookRequest(user[0], room_id, check_in, check_out, paid_amount, hold.token))
+                        except BookingConflictError as e:
+                            logging.warning(str(e))
+                            print(f"{e} Nothing was charged.")
+                            continue
+                        except BookingError as e:
+                            logging.warning(str(e))
+                            print(e)
+                            continue
+                        finally:
+                            # A booked hold is already gone; otherwise free the room for others.
+                            HotelService.release_hold(hold.token)
+                        print("Payment successful! Thank you.")
+                        print(f"\n\nBooking {confirmation.booking_id} created successfully for Customer ID {user[0]} "
+                              f"with total amount ${confirmation.total_amount}.")
+                    elif choice == '3':
+                        booking_id = input("Enter your Booking ID for Cancelation : ")
+                        Booking.cancel_booking(booking_id)
+                    elif choice == '4':
+                        customer_id = user[0]
+                        History.view_history(customer_id)
+                    elif choice == '7':
+                        logging.info("Exiting the Hotel Booking System.")
+                        HotelService.logout(token)
+                        logging.info(f"Connection pool stats: {pool_stats()}")
+                        logging.info(f"Query cache stats: {query_cache_stats()}")
+                        if os.getenv("METRICS_FILE"):
+                            metrics.write(os.getenv("METRICS_FILE"))
+                        if not Email.flush(timeout=5):
+                            logging.warning("Some emails are still queued; they will be sent on the next start.")
+                        break
+                    else:
+                        print("Invalid option. Please try again.")
         else:
             logging.error("Login failed.")
     except Exception as e:
@@ -0,0 +1,327 @@
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from config.db_config import get_connection
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bookings that still hold nights: confirmed stays, and partially cancelled
+# stays which keep the room until their new check-out date.
+ACTIVE_BOOKINGS_SQL = """
+    SELECT booking_id, room_id, check_in, check_out
+    FROM bookings
+    WHERE status = 'CONFIRMED' OR cancellation_status = 'PARTIAL CANCELLED'
+"""
+
+ROOM_BOOKINGS_SQL = """
+    SELECT booking_id, room_id, check_in, check_out
+    FROM bookings
+    WHERE room_id = %s AND (status = 'CONFIRMED' OR cancellation_status = 'PARTIAL CANCELLED')
+"""
+
+
+def to_date(value):
+    """Accepts a date, datetime or 'YYYY-MM-DD' string and returns a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    value = str(value)
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        return date.fromisoformat(value)  # The stored form; much faster than strptime
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def normalize_id(value):
+    """Normalizes an id typed by a user ('101') to the stored form (101)."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def stay_range(check_in, check_out):
+    """
+    Normalizes a stay to the half-open night range [check_in, check_out).
+
+    A same-day stay is billed as one night (see ``main.main``), so it occupies
+    the night of ``check_in``.
+
+    Returns:
+        tuple: (check_in, check_out) as dates.
+    """
+    check_in, check_out = to_date(check_in), to_date(check_out)
+    if check_out <= check_in:
+        check_out = check_in + timedelta(days=1)
+    return check_in, check_out
+
+
+class RoomCalendar:
+    """
+    Sorted-array calendar of the booked nights of one room.
+
+    Intervals are half-open [check_in, check_out) and never overlap, so both
+    ``starts`` and ``ends`` are sorted and a free-range test is a single bisect.
+    """
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.booking_ids = []
+
+    def is_free(self, check_in, check_out):
+        """Returns True if no booked night falls inside [check_in, check_out)."""
+        i = bisect_right(self.starts, check_in)
+        if i > 0 and self.ends[i - 1] > check_in:
+            return False
+        return i == len(self.starts) or self.starts[i] >= check_out
+
+    def add(self, booking_id, check_in, check_out):
+        i = bisect_left(self.starts, check_in)
+        self.starts.insert(i, check_in)
+        self.ends.insert(i, check_out)
+        self.booking_ids.insert(i, booking_id)
+
+    def remove(self, booking_id, check_in):
+        i = bisect_left(self.starts, check_in)
+        while i < len(self.starts) and self.starts[i] == check_in:
+            if self.booking_ids[i] == booking_id:
+                del self.starts[i], self.ends[i], self.booking_ids[i]
+                return True
+            i += 1
+        return False
+
+    def overlapping(self, check_in, check_out):
+        """Returns (booking_id, check_in, check_out) for every stay overlapping the range."""
+        i = max(bisect_right(self.starts, check_in) - 1, 0)
+        stays = []
+        while i < len(self.starts) and self.starts[i] < check_out:
+            if self.ends[i] > check_in:
+                stays.append((self.booking_ids[i], self.starts[i], self.ends[i]))
+            i += 1
+        return stays
+
+
+class AvailabilityIndex:
+    """
+    AvailabilityIndex Class
+
+    Per-room interval index built from BOOKINGS check_in/check_out. Answers
+    "is room R free for [in, out)" in O(log n) and "which rooms are free for
+    [in, out)" in O(R log n) without touching the database. It is loaded once
+    (and again after ``ttl`` seconds, to pick up other processes' bookings) and
+    kept current by Booking on creation, full cancellation and partial
+    cancellation.
+
+    ROOMS.IS_AVAILABLE no longer tracks occupancy; it only says whether a room
+    is in service and may be sold at all.
+    """
+    def __init__(self, ttl=None):
+        """
+        Args:
+            ttl (float): Seconds before the index is rebuilt from BOOKINGS.
+                Defaults to the AVAILABILITY_TTL environment variable, then 60.
+        """
+        self.ttl = float(os.getenv("AVAILABILITY_TTL", "60")) if ttl is None else ttl
+        self._calendars = {}
+        self._bookings = {}  # booking_id -> (room_id, check_in, check_out)
+        self._loaded_at = None
+        self._lock = threading.RLock()
+
+    def is_free(self, room_id, check_in, check_out):
+        """
+        Checks whether a room has no booking overlapping a stay.
+
+        Args:
+            room_id (int | str): ID of the room.
+            check_in (date | str): First night of the stay.
+            check_out (date | str): Departure date (exclusive).
+
+        Returns:
+            bool: True if every night in [check_in, check_out) is free.
+        """
+        check_in, check_out = stay_range(check_in, check_out)
+        with self._lock:
+            self._ensure_fresh()
+            calendar = self._calendars.get(normalize_id(room_id))
+            return calendar is None or calendar.is_free(check_in, check_out)
+
+    def free_rooms(self, room_ids, check_in, check_out):
+        """
+        Filters rooms down to those free for a whole stay.
+
+        Args:
+            room_ids (iterable): Candidate room IDs.
+            check_in (date | str): First night of the stay.
+            check_out (date | str): Departure date (exclusive).
+
+        Returns:
+            list: The candidate IDs that are free, in input order.
+        """
+        check_in, check_out = stay_range(check_in, check_out)
+        with self._lock:
+            self._ensure_fresh()
+            free = []
+            for room_id in room_ids:
+                calendar = self._calendars.get(normalize_id(room_id))
+                if calendar is None or calendar.is_free(check_in, check_out):
+                    free.append(room_id)
+            return free
+
+    def conflicts(self, room_id, check_in, check_out):
+        """
+        Lists the bookings that overlap a stay in a room.
+
+        Returns:
+            list: (booking_id, check_in, check_out) tuples.
+        """
+        check_in, check_out = stay_range(check_in, check_out)
+        with self._lock:
+            self._ensure_fresh()
+            calendar = self._calendars.get(normalize_id(room_id))
+            return calendar.overlapping(check_in, check_out) if calendar else []
+
+    def add_booking(self, booking_id, room_id, check_in, check_out):
+        """Records a newly created booking."""
+        check_in, check_out = stay_range(check_in, check_out)
+        booking_id, room_id = normalize_id(booking_id), normalize_id(room_id)
+        with self._lock:
+            if self._loaded_at is None:
+                return  # The next load will read it from BOOKINGS.
+            self._remove_locked(booking_id)
+            self._calendars.setdefault(room_id, RoomCalendar()).add(booking_id, check_in, check_out)
+            self._bookings[booking_id] = (room_id, check_in, check_out)
+
+    def cancel_booking(self, booking_id):
+        """Releases every night of a fully cancelled booking."""
+        with self._lock:
+            self._remove_locked(normalize_id(booking_id))
+
+    def shorten_booking(self, booking_id, new_check_out):
+        """
+        Applies a partial cancellation by moving a booking's check-out date.
+
+        Args:
+            booking_id (int): ID of the booking.
+            new_check_out (date | str): The new departure date.
+        """
+        booking_id = normalize_id(booking_id)
+        new_check_out = to_date(new_check_out)
+        with self._lock:
+            stay = self._bookings.get(booking_id)
+            if stay is None:
+                return
+            room_id, check_in, _ = stay
+            self._remove_locked(booking_id)
+            if new_check_out > check_in:
+                self._calendars.setdefault(room_id, RoomCalendar()).add(booking_id, check_in, new_check_out)
+                self._bookings[booking_id] = (room_id, check_in, new_check_out)
+
+    def reload_room(self, room_id):
+        """
+        Re-reads the active bookings of one room from BOOKINGS.
+
+        Used when the database has shown the index to be stale for that room
+        (another process booked it), without rebuilding the whole index.
+        """
+        room_id = normalize_id(room_id)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(ROOM_BOOKINGS_SQL, (room_id,), name="availability.reload_room")
+            rows = cursor.fetchall()
+            cursor.close()
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            calendar = self._calendars.pop(room_id, None)
+            for booking_id in calendar.booking_ids if calendar else ():
+                self._bookings.pop(booking_id, None)
+            calendar = RoomCalendar()
+            for booking_id, _, check_in, check_out in sorted(rows, key=lambda row: to_date(row[2])):
+                check_in, check_out = stay_range(check_in, check_out)
+                calendar.add(booking_id, check_in, check_out)
+                self._bookings[booking_id] = (room_id, check_in, check_out)
+            self._calendars[room_id] = calendar
+
+    def snapshot(self):
+        """
+        Returns the index as JSON-serializable state for ``restore``.
+
+        Returns:
+            dict: {"bookings": [[booking_id, room_id, check_in, check_out], ...]} with ISO dates.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            return {"bookings": [[booking_id, room_id, check_in.isoformat(), check_out.isoformat()]
+                                 for booking_id, (room_id, check_in, check_out) in self._bookings.items()]}
+
+    def restore(self, state):
+        """
+        Replaces the index with a ``snapshot`` instead of reading BOOKINGS.
+
+        The restored index counts as freshly loaded, so it is next rebuilt from
+        the database when ``ttl`` runs out.
+        """
+        with self._lock:
+            self._build([tuple(stay) for stay in state["bookings"]], time.monotonic())
+
+    def apply_event(self, event):
+        """
+        Applies a journalled booking event (see ``modules.events``).
+
+        Every event is idempotent, so replaying one the index already reflects
+        changes nothing.
+        """
+        kind = event.get("type")
+        if kind == "booking_created":
+            self.add_booking(event["booking_id"], event["room_id"], event["check_in"], event["check_out"])
+        elif kind == "booking_cancelled":
+            self.cancel_booking(event["booking_id"])
+        elif kind == "booking_shortened":
+            self.shorten_booking(event["booking_id"], event["check_out"])
+
+    def invalidate(self):
+        """Forces the next query to rebuild the index from BOOKINGS."""
+        with self._lock:
+            self._loaded_at = None
+
+    def _remove_locked(self, booking_id):
+        stay = self._bookings.pop(booking_id, None)
+        if stay is not None:
+            room_id, check_in, _ = stay
+            self._calendars[room_id].remove(booking_id, check_in)
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if self._loaded_at is not None and now - self._loaded_at < self.ttl:
+            return
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(ACTIVE_BOOKINGS_SQL, name="availability.load")
+            rows = cursor.fetchall()
+            cursor.close()
+        self._build(rows, now)
+        logger.info(f"Availability index loaded {len(self._bookings)} active bookings.")
+
+    def _build(self, rows, now):
+        calendars = {}
+        bookings = {}
+        stays = [(room_id, *stay_range(check_in, check_out), booking_id)
+                 for booking_id, room_id, check_in, check_out in rows]
+        stays.sort(key=lambda stay: (stay[0], stay[1]))
+        for room_id, check_in, check_out, booking_id in stays:
+            calendar = calendars.setdefault(room_id, RoomCalendar())
+            if not calendar.is_free(check_in, check_out):
+                logger.warning(f"Booking {booking_id} overlaps another booking of room {room_id}.")
+            calendar.starts.append(check_in)
+            calendar.ends.append(check_out)
+            calendar.booking_ids.append(booking_id)
+            bookings[booking_id] = (room_id, check_in, check_out)
+        self._calendars = calendars
+        self._bookings = bookings
+        self._loaded_at = now
+
+
+availability_index = AvailabilityIndex()
@@ -1,16 +1,23 @@
-from config.db_config import get_connection
-from datetime import datetime
-from modules.payment import Payment
-from utils.logger import setup_logger
+from modules.availability import availability_index
+from modules.holds import hold_table
+from modules.service import (
+    BookRequest,
+    CancelFullRequest,
+    CancelPartialRequest,
+    HotelService,
+)
+from utils.exceptions import BookingError, NotFoundError, ValidationError
+from utils.logger import get_logger
 
 # Set up the logger
-logger = setup_logger()
+logger = get_logger(__name__)
+
 class Booking:
     """
     Booking Class
 
     Manages hotel bookings, including room validation, booking creation, and cancellations (full or partial).
-    Uses database connections to fetch and update booking-related data.
+    The interactive methods prompt on the terminal and delegate the work to ``HotelService``.
     """
     def __init__(self, booking_id, payment_id,room_id, customer_id, check_in, check_out):
         self.booking_id = booking_id
@@ -22,80 +29,82 @@ class Booking:
 
 
     @staticmethod
-    def is_Valid_room( ):
+    def is_Valid_room(check_in=None, check_out=None):
         """
             Validates if a room is available for booking.
 
-            Prompts the user to enter a room ID and checks its availability in the database.
+            Prompts the user to enter a room ID and checks that the room exists and is in
+            service. When stay dates are given, also checks the availability index that the
+            room is free for every night in [check_in, check_out).
             If the room is not available or does not exist, the user is prompted to enter a valid ID.
 
+            Args:
+                check_in (date, optional): First night of the stay.
+                check_out (date, optional): Departure date of the stay.
+
             Returns:
                 str: The valid room ID if available.
         """
-        conn = get_connection()
-        cursor = conn.cursor()
         while True:
             room_id = input("Enter room ID to book: ")
-            # Check if the room exists and is available
-            cursor.execute("SELECT is_available FROM rooms WHERE room_id = %s", (room_id,))
-            room = cursor.fetchone()
+            # Check if the room exists and is in service
+            try:
+                room = HotelService.get_room(room_id)
+            except NotFoundError:
+                room = None
 
             if room is None:
                 logger.warning(f"Room ID {room_id} does not exist.")
                 print(f"Room ID {room_id} does not exist. Please enter a valid room ID.")
-            elif not room[0]:  # If is_available is False
+            elif not room.is_available:  # If is_available is False the room is out of service
                 print(f"Room ID {room_id} is not available. Please choose another room.")
+            elif check_in is not None and not Booking.is_room_free(room_id, check_in, check_out):
+                print(f"Room ID {room_id} is already booked for those dates. Please choose another room.")
             else:
                 logger.info(f"Room ID {room_id} is available for booking.")
                 return room_id
-                  
-
-
-
 
     @staticmethod
-    def create_booking( payment_id,days,room_id, customer_id, check_in, check_out):
+    def is_room_free(room_id, check_in, check_out, hold_token=None):
         """
-        Creates a new booking in the database.
-
-        Fetches room price from the database to calculate the total amount for the stay.
-        Updates the room status to unavailable after booking.
+        Checks the availability index and the hold table for a stay, without touching the database.
 
         Args:
-            payment_id (str): ID of the payment made for the booking.
-            days (int): Number of days for the stay.
-            room_id (str): ID of the booked room.
-            customer_id (str): ID of the customer making the booking.
-            check_in (str): Check-in date in 'YYYY-MM-DD' format.
-            check_out (str): Check-out date in 'YYYY-MM-DD' format.
+            room_id (str): ID of the room.
+            check_in (date): First night of the stay.
+            check_out (date): Departure date (a same-day stay counts as one night).
+            hold_token (str, optional): The caller's own hold, which does not count.
 
-        Logs:
-            Info: Logs successful booking creation and the total amount.
-
-        Prints:
-            Success message with the total amount charged for the stay.
+        Returns:
+            bool: True if no booking or other guest's hold overlaps [check_in, check_out).
         """
-        conn = get_connection()
-       
-        cursor = conn.cursor()
-        cursor.execute("SELECT price FROM rooms WHERE room_id = %s", (room_id,))
-        price = cursor.fetchone()
-        total_amount =price[0]*days
-        cursor.execute(
-            """
-            INSERT INTO bookings (payment_id,room_id, customer_id, check_in, check_out, total_amount) 
-            VALUES (%s,%s, %s, %s, %s, %s)
-            """,
-            (payment_id,room_id, customer_id, check_in, check_out, total_amount)
-        )
-        
-        cursor.execute(f"UPDATE rooms SET is_available=False WHERE room_id={room_id}")
-        conn.commit()
-        logger.info(f"Creating booking for Customer ID {customer_id} with total amount ${total_amount}.")
-        print(f"\n\nBooking created successfully for Customer ID {customer_id} with total amount ${total_amount}.")
+        return (availability_index.is_free(room_id, check_in, check_out)
+                and not hold_table.conflicts(room_id, check_in, check_out, hold_token))
 
+    @staticmethod
+    def book_and_pay(room_id, customer_id, check_in, check_out, days, paid_amount):
+        """
+        Records the payment and the booking for a stay as one atomic operation.
 
+        See ``HotelService.book``: ids are drawn up front, the room's service flag and
+        price are checked inside the insert statements, and both rows commit together.
 
+        Args:
+            room_id (str): ID of the room to book.
+            customer_id (int): ID of the customer making the booking.
+            check_in (date): Check-in date.
+            check_out (date): Check-out date.
+            days (int): Number of nights billed (kept for compatibility; derived from the dates).
+            paid_amount (float): Amount the customer paid.
+
+        Returns:
+            tuple: (booking_id, payment_id, total_amount).
+
+        Raises:
+            BookingError: If the room is taken, out of service or the amount does not cover the stay.
+        """
+        confirmation = HotelService.book(BookRequest(customer_id, room_id, check_in, check_out, paid_amount))
+        return confirmation.booking_id, confirmation.payment_id, confirmation.total_amount
 
     @staticmethod
     def cancel_booking(booking_id):
@@ -104,7 +113,7 @@ class Booking:
 
     Fetches booking details to determine eligibility for cancellation. Depending on the 
     user's choice, processes either a full or partial cancellation and updates the booking
-    and room status accordingly.
+    and the availability index accordingly.
 
     Args:
         booking_id (str): ID of the booking to be cancelled.
@@ -128,129 +137,29 @@ class Booking:
 
     Raises:
         Exception: If any error occurs during the cancellation process, it is logged and printed.
-
-    Finally:
-        Closes the database connection.
     """
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
+            choice = int(input("\n\n1. Full Cancellation OR 2. Partial Cancellation: "))
 
-        # Check if the booking exists and its status
-            cursor.execute(
-                "SELECT status, check_out FROM bookings WHERE booking_id = %s",
-                (booking_id,)
-            )
-            result = cursor.fetchone()
+            if choice == 1:
+                result = HotelService.cancel_full(CancelFullRequest(booking_id))
+                print(f"Half of the total amount will be refunded to this {result.customer_id} customer id. Refund: {result.refund_amount}")
 
-            if result:
-                status, check_out = result
+            elif choice == 2:
+                new_check_out = input('\nEnter new check-out date (YYYY-MM-DD): ')
+                result = HotelService.cancel_partial(CancelPartialRequest(booking_id, new_check_out))
+                print(f"Partial cancellation processed. New total amount: {result.new_total_amount} .Refund {result.refund_amount} to this {result.customer_id} customer id")
 
-             # Fetch room details and total amount
-                cursor.execute(
-                    "SELECT room_id, total_amount, check_in ,payment_id ,customer_id FROM bookings WHERE booking_id = %s",
-                    (booking_id,)
-                )
-                room = cursor.fetchone()
-                room_id = room[0]
-                total_amount = room[1]
-                check_in_date = room[2]
-                payment_id = room[3]
-                customer_id= room[4]
-
-                # Check if the booking is eligible for cancellation
-                if status == 'CONFIRMED':
-                    choice = int(input("\n\n1. Full Cancellation OR 2. Partial Cancellation: "))
-
-                    if choice == 1:
-                        # Full cancellation: Refund half of the total amount
-                        cursor.execute(
-                            """
-                            UPDATE bookings
-                            SET cancellation_status = 'CANCELLED',
-                                total_amount = total_amount / 2,
-                                cancellation_timestamp = CURRENT_TIMESTAMP,
-                                status = 'CANCELLED'
-                            WHERE booking_id = %s
-                            """,
-                            (booking_id,)
-                        )
-                        cursor.execute(
-                        """
-                        UPDATE rooms
-                        SET is_available = TRUE
-                        WHERE room_id = %s
-                        """,
-                        (room_id,)
-                        )
-                        Payment.isRefund(total_amount / 2,payment_id,total_amount / 2)
-                        logger.info(f"Full cancellation processed for Booking ID {booking_id}. Refund: {total_amount / 2} to this {customer_id} customer")
-
-                        print(f"Half of the total amount will be refunded to this {customer_id} customer id. Refund: {total_amount / 2}")
-
-                    elif choice == 2:
-                        new_check_out = input('\nEnter new check-out date (YYYY-MM-DD): ')
-                        new_check_out_date = datetime.strptime(new_check_out, "%Y-%m-%d").date()
-                        new_check_in_date= datetime.strptime(str(check_in_date), "%Y-%m-%d").date()
-
-                        # Ensure that 'check_in_date' is used as a date object directly
-                        diff = (new_check_out_date - new_check_in_date).days
-                        print(f'room_id {room_id}')
-                        cursor.execute("SELECT price FROM rooms WHERE room_id = %s", (room_id,))
-                        price = cursor.fetchone()
-                        print(f'price {price[0]}')
-
-                        # Calculate new total amount based on the shortened stay
-                        new_total_amount = price * diff
-                        print(f'new_total_amount {new_total_amount}')
-                       
-
-                        cursor.execute(
-                            """
-                            UPDATE bookings
-                            SET cancellation_status = 'PARTIAL CANCELLED',
-                                total_amount = %s,
-                                check_out = %s,
-                                cancellation_timestamp = CURRENT_TIMESTAMP,
-                                status = 'CANCELLED'
-                            WHERE booking_id = %s
-                            """,
-                            (new_total_amount, new_check_out, booking_id)
-                        )
-                        cursor.execute(
-                        """
-                        UPDATE rooms
-                        SET is_available = TRUE
-                        WHERE room_id = %s
-                        """,
-                        (room_id,)
-                         )
-                        refund_amount = float(total_amount) - float(new_total_amount[0])
-                        print(f'refund_amount {refund_amount}')
-                        Payment.isRefund(new_total_amount,payment_id,refund_amount)
-                       
-                        logger.info(f"Partial cancellation processed. New total amount: ${new_total_amount}..Refund {refund_amount} to this {customer_id} customer id")
-                        print(f"Partial cancellation processed. New total amount: {new_total_amount} .Refund {refund_amount} to this {customer_id} customer id")
-
-                    else:
-                        print("Invalid choice. Please select 1 or 2.")
-
-                   
+            else:
+                print("Invalid choice. Please select 1 or 2.")
+                return
 
-                    conn.commit()
-                    logger.info(f"Booking ID {booking_id} has been cancelled successfully.")
-                   
+            logger.info(f"Booking ID {booking_id} has been cancelled successfully.")
 
-                else:
-                    print("Booking cannot be cancelled as it is already cancelled or does not exist.")
-            else:
-                print("No booking found with the provided ID.")
+        except (NotFoundError, BookingError, ValidationError) as e:
+            logger.warning(f"Booking ID {booking_id} was not cancelled: {e}")
+            print(e)
 
         except Exception as e:
             logger.error(f"An error occurred while cancelling Booking ID {booking_id}: {e}")
             print(f"An error occurred while cancelling Booking ID {booking_id}: {e}")
-
-        finally:
-            # Close the connection
-            if conn:
-                conn.close()
@@ -1,9 +1,7 @@
 import logging
-import re
-from config.db_config import get_connection
-from modules.email import Email
-from modules.room import Room
-from utils.exceptions import RegistrationError, LoginError
+from modules.service import AuthenticateRequest, HotelService, RegisterRequest
+from utils import validators
+from utils.exceptions import InvalidCredentialsError, RegistrationError, LoginError
 
 
 class Customer:
@@ -11,7 +9,7 @@ class Customer:
     Customer Class
 
     Handles customer operations such as registration, validation, and login. 
-    Also manages interactions with the database and sends registration confirmation emails.
+    Prompts on the terminal and delegates storage and confirmation emails to ``HotelService``.
     """
     def __init__(self, first_name, last_name, email, phone_number):
         """
@@ -84,38 +82,19 @@ class Customer:
                     print("Invalid phone number format. It should contain 10 digits and may include spaces, dashes, parentheses, and a country code.")
 
             
-            conn = get_connection()
-            cursor = conn.cursor()
-        
-            cursor.execute(
-                """
-                INSERT INTO customers (first_name, last_name, email, password, phone_number)
-                VALUES (%s, %s, %s, %s, %s)
-                """,
-                (first_name, last_name, email, password, phone_number)
+            profile = HotelService.register(
+                RegisterRequest(first_name, last_name, email, password, phone_number)
             )
-            conn.commit()
             print(f"\nCustomer {first_name} {last_name} registered successfully.")
+            print(f"A confirmation email has been sent to {email}.")
+            return Customer(profile.first_name, profile.last_name, profile.email, profile.phone_number)
 
-            # Fetch available rooms and send a confirmation email
-            available_rooms = Room.fetch_rooms()
-            msg = (
-                f"Thanks {first_name} {last_name} for registering with us.\n"
-                f"Available Rooms: {available_rooms}"
-            )
-            Email.send_email(email, msg)
-
-            logging.info(f"Customer {first_name} {last_name} registered successfully.")
-            return Customer(first_name, last_name, email, phone_number)
-
+        except RegistrationError:
+            raise
         except Exception as e:
             logging.error(f"Registration failed: {e}")
             raise RegistrationError("Registration failed.") from e
 
-        finally:
-            if conn:
-                conn.close()
-
     @staticmethod
     def is_email_registered(email):
         """
@@ -128,13 +107,7 @@ class Customer:
             bool: True if the email is registered, False otherwise.
         """
         
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM customers WHERE email = %s", (email,))
-        count = cursor.fetchone()[0]
-        cursor.close()
-        conn.close()
-        return count > 0
+        return HotelService.is_email_registered(email)
 
     
     @staticmethod
@@ -148,8 +121,7 @@ class Customer:
         Returns:
             bool: True if valid, False otherwise.
         """
-        regex = r'^[A-Za-z\s]{2,52}$'
-        return re.match(regex, name) is not None
+        return validators.is_valid_name(name)
 
     @staticmethod
     def is_valid_email(email):
@@ -162,9 +134,7 @@ class Customer:
         Returns:
             bool: True if valid, False otherwise.
         """
-        """Validate email format using regex."""
-        regex = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-        return re.match(regex, email) is not None
+        return validators.is_valid_email(email)
 
     @staticmethod
     def is_valid_password(password):
@@ -177,9 +147,7 @@ class Customer:
         Returns:
             bool: True if valid, False otherwise.
         """
-        """Validate password: 8 characters long, at least 1 uppercase, 1 lowercase, 1 digit, 1 special character, no spaces."""
-        regex = r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@#$%^&+=])[^\s]{8,}$'
-        return re.match(regex, password) is not None
+        return validators.is_valid_password(password)
 
     @staticmethod
     def is_valid_phone(phone_number):
@@ -193,14 +161,7 @@ class Customer:
         Returns:
             bool: True if valid, False otherwise.
         """
-        """Validate phone number format (10 digits, allows spaces, dashes, parentheses, and country code)."""
-        # +1-800-555-1234
-        # +44 20 1234 5678
-        # 1(800)555-1234
-        # 800.555.1234
-        # +91 1234567890
-        regex = r'^\+?\d{1,3}?[-.\s]?(\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}$'
-        return re.match(regex, phone_number) is not None and len(re.sub(r'\D', '', phone_number)) == 10
+        return validators.is_valid_phone(phone_number)
 
     @staticmethod
     def login():
@@ -208,7 +169,8 @@ class Customer:
         Handles customer login by validating email and password against the database.
 
         Returns:
-            tuple: A tuple containing user information if login is successful.
+            str: An opaque session token. Resolve it with ``HotelService.current_customer``
+                to get the customer's profile without another database query.
 
         Raises:
             LoginError: If an error occurs during the login process.
@@ -217,72 +179,11 @@ class Customer:
             try:
                 email = input("Enter your email: ")
                 password = input("Enter your password: ")
-                conn = get_connection()
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT customer_id, first_name, last_name, email, phone_number FROM customers WHERE email = %s AND password = %s", 
-                    (email, password)
-                )
-
-                # Validate the user credentials with the Snowflake database
-                result = cursor.fetchone()
-                if result:
-                    logging.info(f"User {email} logged in successfully.")
-                    return result  # Return user information upon successful login
-                else:
-                    print("\nInvalid credentials or user not found. please enter valid email and password")
-                    logging.warning(f"Failed login attempt for email: {email}")
+                session = HotelService.login(AuthenticateRequest(email, password))
+                return session.token  # Return the session token upon successful login
 
+            except InvalidCredentialsError:
+                print("\nInvalid credentials or user not found. please enter valid email and password")
             except Exception as e:
                 logging.error("An error occurred during login", exc_info=True)
                 raise LoginError("Login failed. Please check your credentials.") from e
-            finally:
-                # Close the cursor and connection
-                if cursor:
-                    cursor.close()
-                if conn:
-                    conn.close()
-    
-      
-       
-    
-    
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
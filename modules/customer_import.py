@@ -0,0 +1,312 @@
+"""
+Bulk Customer Import
+
+Registers partner or loyalty lists from a CSV or JSONL file without going
+through ``HotelService.register`` row by row. The file is streamed in chunks,
+so memory stays bounded by ``--chunk-size`` however long the file is. For each
+chunk:
+
+- every row is validated with the precompiled patterns in ``utils.validators``
+- emails and passwords repeated within the chunk are rejected
+- rows whose email or password is already stored are found with one set-based
+  lookup (``IN`` lists) instead of a query per row
+- the remaining rows get a block of ids and are inserted with ``executemany``,
+  then committed
+
+Rejected rows are written to a CSV file (line, email, reason). No
+confirmation emails are sent for imported customers.
+
+Both files need the columns first_name, last_name, email, password and
+phone_number (CSV header or JSON keys).
+
+Usage:
+    python -m modules.customer_import partners.csv --rejects rejects.csv
+    python -m modules.customer_import loyalty.jsonl --chunk-size 10000
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from config.db_config import get_backend, get_connection
+from modules.email_filter import email_filter
+from utils import validators
+from utils.exceptions import RegistrationError
+from utils.logger import get_logger, setup_logger
+
+logger = get_logger(__name__)
+
+FIELDS = ("first_name", "last_name", "email", "password", "phone_number")
+CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+# Values per IN list; keeps each lookup well under driver parameter limits.
+LOOKUP_SIZE = 500
+
+INSERT_CUSTOMER = """
+    INSERT INTO customers (customer_id, first_name, last_name, email, password, phone_number)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+
+@dataclass
+class ImportReject:
+    line: int
+    email: str
+    reason: str
+
+
+@dataclass
+class ImportSummary:
+    read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    reasons: dict = field(default_factory=dict)  # reason -> rejected rows
+    seconds: float = 0.0
+
+
+class CustomerImport:
+    """
+    CustomerImport Class
+
+    Streams a customer file into CUSTOMERS in validated, deduplicated chunks.
+    """
+    @staticmethod
+    def read_rows(path, fmt=None):
+        """
+        Streams the rows of a CSV or JSONL file.
+
+        Args:
+            path (str): The file to read.
+            fmt (str): "csv" or "jsonl". Defaults to the file extension.
+
+        Yields:
+            tuple: (line number, dict of fields or None, error message or None).
+        """
+        fmt = fmt or ("jsonl" if path.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv")
+        with open(path, newline="", encoding="utf-8") as f:
+            if fmt == "jsonl":
+                for line, text in enumerate(f, start=1):
+                    if not text.strip():
+                        continue
+                    try:
+                        row = json.loads(text)
+                    except ValueError as e:
+                        yield line, None, f"invalid JSON: {e}"
+                        continue
+                    if not isinstance(row, dict):
+                        yield line, None, "invalid JSON: expected an object"
+                        continue
+                    yield line, row, None
+            else:
+                reader = csv.DictReader(f)
+                if reader.fieldnames:
+                    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+                for row in reader:
+                    yield reader.line_num, row, None
+
+    @staticmethod
+    def validate_batch(rows):
+        """
+        Validates a batch of parsed rows.
+
+        Args:
+            rows (list): (line, row, error) tuples from ``read_rows``.
+
+        Returns:
+            tuple: (valid, rejects). ``valid`` holds (line, (first_name,
+            last_name, email, password, phone_number)) with fields stripped;
+            ``rejects`` holds ``ImportReject`` entries.
+        """
+        # Bound once per batch; the loop below is the hot path of an import.
+        name_ok = validators.NAME_PATTERN.match
+        email_ok = validators.EMAIL_PATTERN.match
+        password_ok = validators.PASSWORD_PATTERN.match
+        phone_ok = validators.is_valid_phone
+        valid, rejects = [], []
+        seen_emails, seen_passwords = set(), set()
+        for line, row, error in rows:
+            if error:
+                rejects.append(ImportReject(line, "", error))
+                continue
+            values = [str(row.get(name) or "").strip() for name in FIELDS]
+            first_name, last_name, email, password, phone_number = values
+            missing = [name for name, value in zip(FIELDS, values) if not value]
+            if missing:
+                reason = f"missing {', '.join(missing)}"
+            elif not name_ok(first_name):
+                reason = "invalid first_name"
+            elif not name_ok(last_name):
+                reason = "invalid last_name"
+            elif not email_ok(email):
+                reason = "invalid email"
+            elif not password_ok(password):
+                reason = "invalid password"
+            elif not phone_ok(phone_number):
+                reason = "invalid phone_number"
+            elif email in seen_emails:
+                reason = "duplicate email in file"
+            elif password in seen_passwords:
+                reason = "duplicate password in file"
+            else:
+                seen_emails.add(email)
+                seen_passwords.add(password)
+                valid.append((line, tuple(values)))
+                continue
+            rejects.append(ImportReject(line, email, reason))
+        return valid, rejects
+
+    @staticmethod
+    def existing(cursor, emails, passwords):
+        """
+        Finds which of the given emails and passwords are already stored.
+
+        CUSTOMERS has unique constraints on both columns. One lookup is made
+        per ``LOOKUP_SIZE`` values, not one per row.
+
+        Returns:
+            tuple: (set of stored emails, set of stored passwords) among those given.
+        """
+        emails, passwords = list(emails), list(passwords)
+        taken_emails, taken_passwords = set(), set()
+        for start in range(0, max(len(emails), len(passwords)), LOOKUP_SIZE):
+            email_part = emails[start:start + LOOKUP_SIZE] or [None]
+            password_part = passwords[start:start + LOOKUP_SIZE] or [None]
+            cursor.execute(
+                f"""
+                SELECT email, password FROM customers
+                WHERE email IN ({", ".join(["%s"] * len(email_part))})
+                   OR password IN ({", ".join(["%s"] * len(password_part))})
+                """,
+                email_part + password_part,
+                name="import.existing"
+            )
+            for email, password in cursor.fetchall():
+                taken_emails.add(email)
+                taken_passwords.add(password)
+        return taken_emails & set(emails), taken_passwords & set(passwords)
+
+    @staticmethod
+    def load_chunk(valid):
+        """
+        Inserts one validated chunk in a single transaction.
+
+        Ids are reserved before the lookup: on SQLite that opens the write
+        transaction, so no other writer can register one of these emails
+        between the check and the insert. Unused ids are simply skipped.
+
+        Args:
+            valid (list): The ``valid`` part of ``validate_batch``.
+
+        Returns:
+            tuple: (number inserted, list of ``ImportReject``).
+
+        Raises:
+            RegistrationError: If the insert fails; the chunk is rolled back.
+        """
+        if not valid:
+            return 0, []
+        rejects, params = [], []
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                ids = get_backend().reserve_ids(cursor, "customers", len(valid))
+                taken_emails, taken_passwords = CustomerImport.existing(
+                    cursor, (values[2] for _, values in valid), (values[3] for _, values in valid)
+                )
+                for line, values in valid:
+                    if values[2] in taken_emails:
+                        rejects.append(ImportReject(line, values[2], "email already registered"))
+                    elif values[3] in taken_passwords:
+                        rejects.append(ImportReject(line, values[2], "password already in use"))
+                    else:
+                        params.append((ids[len(params)],) + values)
+                if params:
+                    cursor.executemany(INSERT_CUSTOMER, params, name="import.insert_customers")
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Customer import chunk starting at line {valid[0][0]} failed: {e}")
+                raise RegistrationError(f"Import failed in the chunk starting at line {valid[0][0]}.") from e
+            finally:
+                cursor.close()
+        if params:
+            email_filter.add_many((row[3], row[0]) for row in params)
+        return len(params), rejects
+
+    @staticmethod
+    def run(path, rejects_path=None, chunk_size=CHUNK_SIZE, fmt=None):
+        """
+        Imports a whole file, one committed chunk at a time.
+
+        Chunks committed before a failure stay imported; the error names the
+        first line of the failed chunk, so the file can be resumed from there.
+
+        Args:
+            path (str): CSV or JSONL file.
+            rejects_path (str): Where to write rejected rows as CSV (optional).
+            chunk_size (int): Rows per validation and insert batch.
+            fmt (str): "csv" or "jsonl"; defaults to the file extension.
+
+        Returns:
+            ImportSummary: Row counts and reject reasons.
+
+        Raises:
+            RegistrationError: If a chunk cannot be inserted.
+        """
+        summary = ImportSummary()
+        started = time.perf_counter()
+        rejects_file = open(rejects_path, "w", newline="", encoding="utf-8") if rejects_path else None
+        try:
+            writer = csv.writer(rejects_file) if rejects_file else None
+            if writer:
+                writer.writerow(("line", "email", "reason"))
+
+            def flush(batch):
+                valid, rejects = CustomerImport.validate_batch(batch)
+                imported, duplicates = CustomerImport.load_chunk(valid)
+                summary.imported += imported
+                for reject in rejects + duplicates:
+                    summary.rejected += 1
+                    summary.reasons[reject.reason] = summary.reasons.get(reject.reason, 0) + 1
+                    if writer:
+                        writer.writerow((reject.line, reject.email, reject.reason))
+                logger.info(f"Imported {summary.imported} of {summary.read} customer rows from {path}")
+
+            batch = []
+            for row in CustomerImport.read_rows(path, fmt):
+                summary.read += 1
+                batch.append(row)
+                if len(batch) >= chunk_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+        finally:
+            if rejects_file:
+                rejects_file.close()
+            summary.seconds = round(time.perf_counter() - started, 3)
+        return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-register customers from a CSV or JSONL file.")
+    parser.add_argument("path", help="CSV (with header) or JSONL file of customers.")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default=None, help="Defaults to the file extension.")
+    parser.add_argument("--rejects", default=None, help="Write rejected rows and reasons to this CSV file.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows per batch.")
+    args = parser.parse_args(argv)
+
+    setup_logger()
+    try:
+        summary = CustomerImport.run(args.path, args.rejects, args.chunk_size, args.format)
+    except RegistrationError as e:
+        print(e)
+        raise SystemExit(1)
+    print(f"Read {summary.read} rows: {summary.imported} imported, {summary.rejected} rejected "
+          f"in {summary.seconds}s.")
+    for reason, count in sorted(summary.reasons.items(), key=lambda item: -item[1]):
+        print(f"  {count:>8}  {reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,414 @@
+import os
+import random
 import smtplib
+import sqlite3
+import threading
+import time
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from utils.logger import setup_logger  # Assuming you have a logger setup
+from utils.logger import get_logger
 
 # Initialize logger
-logger = setup_logger()
+logger = get_logger(__name__)
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS OUTBOX (
+    MESSAGE_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+    RECIPIENT TEXT NOT NULL,
+    SUBJECT TEXT NOT NULL,
+    BODY TEXT NOT NULL,
+    STATUS TEXT NOT NULL DEFAULT 'PENDING',
+    ATTEMPTS INTEGER NOT NULL DEFAULT 0,
+    NEXT_ATTEMPT_AT REAL NOT NULL DEFAULT 0,
+    LAST_ERROR TEXT,
+    CREATED_AT REAL NOT NULL,
+    SENT_AT REAL
+);
+CREATE INDEX IF NOT EXISTS IDX_OUTBOX_DUE ON OUTBOX (STATUS, NEXT_ATTEMPT_AT);
+"""
+
+
+class SMTPSession:
+    """
+    A persistent, authenticated SMTP connection.
+
+    Connects (and does STARTTLS and login) lazily on the first send, then keeps
+    the session open for the following messages. A session that has been idle
+    for a while is probed with NOOP before use, and any connection error drops
+    it so the next send reconnects.
+    """
+    def __init__(self, host, port, user=None, password=None, starttls=True, timeout=30, idle_check=60):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_check = idle_check
+        self._server = None
+        self._last_used = 0.0
+
+    def send(self, sender, recipient, message):
+        """
+        Sends one message, connecting first if needed.
+
+        Raises:
+            smtplib.SMTPException: If the server rejects the message.
+            OSError: If the connection fails.
+        """
+        server = self._ensure_connected()
+        try:
+            server.sendmail(sender, recipient, message)
+        except smtplib.SMTPServerDisconnected:
+            self.close()
+            raise
+        except smtplib.SMTPException:
+            # The server rejected this message but the session is still usable.
+            raise
+        except OSError:
+            self.close()
+            raise
+        self._last_used = time.monotonic()
+
+    def close(self):
+        """Ends the session, quietly ignoring a connection that is already gone."""
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+            logger.info("SMTP server connection closed.")
+
+    def _ensure_connected(self):
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_check:
+            try:
+                if self._server.noop()[0] != 250:
+                    self.close()
+            except Exception:
+                self.close()
+        if self._server is None:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.starttls:
+                    server.starttls()
+                if self.user:
+                    server.login(self.user, self.password)
+            except Exception:
+                server.close()
+                raise
+            self._server = server
+            self._last_used = time.monotonic()
+            logger.info(f"SMTP session opened to {self.host}:{self.port}")
+        return self._server
+
+
+class EmailOutbox:
+    """
+    Durable email queue drained by background worker threads.
+
+    Messages are written to a local SQLite file before ``enqueue`` returns, so a
+    crash or restart never loses them. Each worker holds one ``SMTPSession``,
+    claims due messages in batches, sends the batch over that session and
+    records the outcome with one commit. Failed messages are retried with
+    exponential backoff until ``max_attempts``, after which they are marked
+    FAILED. Any other error (e.g. the outbox file being locked) is logged and
+    the worker retries after a backoff; a batch it had claimed goes back in
+    the queue.
+    """
+    def __init__(self, path=None, workers=None, batch_size=None, max_attempts=None,
+                 backoff_base=None, backoff_max=300, session_factory=None, sender=None):
+        """
+        Args:
+            path (str): Outbox database file (EMAIL_OUTBOX_PATH, default ``email_outbox.db``).
+            workers (int): Sender threads (EMAIL_WORKERS, default 1).
+            batch_size (int): Messages claimed per batch (EMAIL_BATCH_SIZE, default 20).
+            max_attempts (int): Tries before a message is FAILED (EMAIL_MAX_ATTEMPTS, default 5).
+            backoff_base (float): First retry delay in seconds (EMAIL_BACKOFF_BASE, default 2).
+            backoff_max (float): Longest retry delay in seconds.
+            session_factory (callable): Returns a new ``SMTPSession``; defaults to the SMTP_* settings.
+            sender (str): From address (EMAIL_SENDER, default SMTP_USER).
+        """
+        self.path = path or os.getenv("EMAIL_OUTBOX_PATH", "email_outbox.db")
+        self.workers = int(workers or os.getenv("EMAIL_WORKERS", "1"))
+        self.batch_size = int(batch_size or os.getenv("EMAIL_BATCH_SIZE", "20"))
+        self.max_attempts = int(max_attempts or os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+        self.backoff_base = float(backoff_base or os.getenv("EMAIL_BACKOFF_BASE", "2"))
+        self.backoff_max = backoff_max
+        self.session_factory = session_factory or EmailOutbox.default_session
+        self.sender = sender or os.getenv("EMAIL_SENDER") or os.getenv("SMTP_USER", "")
+        self._wakeup = threading.Condition()
+        self._stopping = False
+        self._threads = []
+        self._init_db()
+
+    @staticmethod
+    def default_session():
+        """Builds an SMTP session from the SMTP_* environment variables."""
+        return SMTPSession(
+            os.getenv("SMTP_HOST", "smtp.gmail.com"),
+            int(os.getenv("SMTP_PORT", "587")),
+            user=os.getenv("SMTP_USER"),
+            password=os.getenv("SMTP_PASSWORD"),
+            starttls=os.getenv("SMTP_STARTTLS", "1") not in ("0", "false", "False"),
+        )
+
+    def enqueue(self, recipient, subject, body):
+        """
+        Stores a message for delivery and wakes a worker.
+
+        Returns:
+            int: The outbox message id.
+        """
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "INSERT INTO OUTBOX (RECIPIENT, SUBJECT, BODY, CREATED_AT) VALUES (?, ?, ?, ?)",
+                (recipient, subject, body, time.time())
+            )
+            conn.commit()
+            message_id = cursor.lastrowid
+        finally:
+            conn.close()
+        with self._wakeup:
+            self._wakeup.notify()
+        return message_id
+
+    def start(self):
+        """Starts the worker threads (idempotent)."""
+        with self._wakeup:
+            if self._threads:
+                return
+            self._stopping = False
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"email-outbox-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout=5):
+        """Asks the workers to finish their current batch and exit."""
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def flush(self, timeout=10):
+        """
+        Waits until every queued message has been sent or has failed for good.
+
+        Returns:
+            bool: True if the outbox drained before the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.pending_count() == 0:
+                return True
+            with self._wakeup:
+                self._wakeup.notify_all()
+            time.sleep(0.05)
+        return False
+
+    def pending_count(self, due_only=False):
+        """Counts messages waiting to be sent (optionally only those due now)."""
+        conn = self._connect()
+        try:
+            if due_only:
+                row = conn.execute(
+                    "SELECT COUNT(*) FROM OUTBOX WHERE STATUS IN ('PENDING', 'SENDING') AND NEXT_ATTEMPT_AT <= ?",
+                    (time.time(),)
+                ).fetchone()
+            else:
+                row = conn.execute("SELECT COUNT(*) FROM OUTBOX WHERE STATUS IN ('PENDING', 'SENDING')").fetchone()
+            return row[0]
+        finally:
+            conn.close()
+
+    def stats(self):
+        """Returns message counts per status."""
+        conn = self._connect()
+        try:
+            return dict(conn.execute("SELECT STATUS, COUNT(*) FROM OUTBOX GROUP BY STATUS").fetchall())
+        finally:
+            conn.close()
+
+    def _init_db(self):
+        conn = self._connect()
+        try:
+            conn.executescript(OUTBOX_SCHEMA)
+            # Messages claimed by a process that died mid-batch go back in the queue.
+            conn.execute("UPDATE OUTBOX SET STATUS = 'PENDING' WHERE STATUS = 'SENDING'")
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _claim_batch(self, conn):
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(
+            """
+            SELECT MESSAGE_ID, RECIPIENT, SUBJECT, BODY, ATTEMPTS FROM OUTBOX
+            WHERE STATUS = 'PENDING' AND NEXT_ATTEMPT_AT <= ?
+            ORDER BY NEXT_ATTEMPT_AT, MESSAGE_ID LIMIT ?
+            """,
+            (time.time(), self.batch_size)
+        ).fetchall()
+        conn.executemany("UPDATE OUTBOX SET STATUS = 'SENDING' WHERE MESSAGE_ID = ?", [(row[0],) for row in rows])
+        conn.commit()
+        return rows
+
+    def _next_wait(self, conn):
+        row = conn.execute("SELECT MIN(NEXT_ATTEMPT_AT) FROM OUTBOX WHERE STATUS = 'PENDING'").fetchone()
+        if row[0] is None:
+            return None
+        return max(row[0] - time.time(), 0)
+
+    def _backoff(self, attempts):
+        delay = min(self.backoff_base * (2 ** (attempts - 1)), self.backoff_max)
+        return delay * random.uniform(0.8, 1.2)
+
+    def _run(self):
+        session = self.session_factory()
+        conn = self._connect()
+        failures = 0
+        claimed = []  # Ids of a batch whose outcome was not recorded because the worker hit an error
+        try:
+            while True:
+                with self._wakeup:
+                    if self._stopping:
+                        return
+                try:
+                    if claimed:
+                        self._requeue(conn, claimed)
+                        claimed = []
+                    batch = self._claim_batch(conn)
+                    failures = 0
+                    if not batch:
+                        wait = self._next_wait(conn)
+                        with self._wakeup:
+                            if not self._stopping:
+                                self._wakeup.wait(wait if wait is not None else 30)
+                        continue
+                    claimed = [row[0] for row in batch]
+                    self._send_batch(conn, session, batch)
+                    claimed = []
+                except Exception as e:
+                    # E.g. "database is locked": the worker must keep draining the outbox, so it
+                    # rolls back, waits and tries again rather than exiting.
+                    failures += 1
+                    if conn.in_transaction:
+                        conn.rollback()
+                    delay = self._backoff(failures)
+                    logger.error(f"Email outbox worker error, retrying in {delay:.1f}s: {e}", exc_info=True)
+                    with self._wakeup:
+                        if not self._stopping:
+                            self._wakeup.wait(delay)
+        finally:
+            session.close()
+            conn.close()
+
+    def _requeue(self, conn, message_ids):
+        # Puts claimed messages back in the queue. Some may already have been sent, so
+        # delivery is at least once, as after a crash mid-batch.
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("UPDATE OUTBOX SET STATUS = 'PENDING' WHERE MESSAGE_ID = ? AND STATUS = 'SENDING'",
+                         [(message_id,) for message_id in message_ids])
+        conn.commit()
+
+    def _send_batch(self, conn, session, batch):
+        sent, retry, failed = [], [], []
+        for message_id, recipient, subject, body, attempts in batch:
+            try:
+                session.send(self.sender, recipient, Email.format_message(self.sender, recipient, subject, body))
+                sent.append((time.time(), message_id))
+                logger.info(f"Email sent successfully to {recipient}")
+            except smtplib.SMTPAuthenticationError as e:
+                logger.error("Authentication failed. Please check your email or password.")
+                retry.append((attempts + 1, message_id, str(e)))
+            except (smtplib.SMTPException, OSError) as e:
+                logger.error(f"Failed to send email: {e}")
+                retry.append((attempts + 1, message_id, str(e)))
+
+        now = time.time()
+        retry_rows = []
+        for attempts, message_id, error in retry:
+            if attempts >= self.max_attempts:
+                failed.append((attempts, error, message_id))
+            else:
+                retry_rows.append((attempts, now + self._backoff(attempts), error, message_id))
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("UPDATE OUTBOX SET STATUS = 'SENT', SENT_AT = ? WHERE MESSAGE_ID = ?", sent)
+        conn.executemany(
+            "UPDATE OUTBOX SET STATUS = 'PENDING', ATTEMPTS = ?, NEXT_ATTEMPT_AT = ?, LAST_ERROR = ? WHERE MESSAGE_ID = ?",
+            retry_rows
+        )
+        conn.executemany(
+            "UPDATE OUTBOX SET STATUS = 'FAILED', ATTEMPTS = ?, LAST_ERROR = ? WHERE MESSAGE_ID = ?", failed
+        )
+        conn.commit()
+        for _, error, message_id in failed:
+            logger.error(f"Giving up on email {message_id}: {error}")
+
 
 class Email:
+    DEFAULT_SUBJECT = 'Taj Hotel : registered successfully.'
+    _outbox = None
+    _outbox_lock = threading.Lock()
+
     def __init__(self, smtp_server='smtp.gmail.com', smtp_port=587):
         """Initialize SMTP server details."""
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
+
+    @staticmethod
+    def outbox():
+        """Returns the process-wide outbox, starting its workers on first use."""
+        if Email._outbox is None:
+            with Email._outbox_lock:
+                if Email._outbox is None:
+                    outbox = EmailOutbox()
+                    outbox.start()
+                    Email._outbox = outbox
+        return Email._outbox
+
     @staticmethod
-    def send_email(  receiver_email,  message):
-        
+    def send_email(  receiver_email,  message, subject=DEFAULT_SUBJECT):
+
         """
-        Sends an email to the specified receiver.
+        Queues an email to the specified receiver and returns immediately.
+
+        The message is stored in the durable outbox and delivered by a background
+        worker over a persistent SMTP session, with retries on failure.
 
         Args:
             receiver_email (str): The email address of the recipient.
             message (str): The content of the email message to be sent.
+            subject (str): The subject line.
 
-        Raises:
-            SMTPAuthenticationError: If authentication with the SMTP server fails.
-            SMTPException: If there is an issue with sending the email.
+        Returns:
+            int: The outbox message id.
         """
-        try:
-            # Send the email
-            server = smtplib.SMTP('smtp.gmail.com',587)
-            server.starttls()
-            subject='Taj Hotel : registered successfully.'
-            msg = "Subject: " + subject + '\n' + message
-            server.login('mdshafiuddin935@gmail.com','ikqu unzb mnlt atik')
-            server.sendmail('mdshafiuddin935@gmail.com',receiver_email,msg) 
-            
-           
-            logger.info(f"Email sent successfully to {receiver_email}")
-            print(f"Email sent successfully to {receiver_email}")
-
-        except smtplib.SMTPAuthenticationError:
-            logger.error("Authentication failed. Please check your email or password.")
-            print("Authentication failed. Please check your email or password.")
-
-        except smtplib.SMTPException as e:
-            logger.error(f"Failed to send email: {e}")
-            print(f"An error occurred: {e}")
-
-        finally:
-            # Close the server connection
-            server.quit()
-            logger.info("SMTP server connection closed.")
+        message_id = Email.outbox().enqueue(receiver_email, subject, message)
+        logger.info(f"Email to {receiver_email} queued as message {message_id}")
+        return message_id
 
+    @staticmethod
+    def flush(timeout=10):
+        """Waits for queued emails to be delivered; used at shutdown."""
+        if Email._outbox is None:
+            return True
+        return Email._outbox.flush(timeout)
 
-    
-  
+    @staticmethod
+    def format_message(sender, recipient, subject, body):
+        """Builds the RFC 5322 text of a plain-text message."""
+        msg = MIMEText(body)
+        msg['Subject'] = subject
+        msg['From'] = sender
+        msg['To'] = recipient
+        return msg.as_string()
@@ -0,0 +1,216 @@
+import os
+import threading
+import time
+from config.db_config import get_connection
+from utils.bloom import BloomFilter
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RegisteredEmailFilter:
+    """
+    RegisteredEmailFilter Class
+
+    Bloom filter over every email in CUSTOMERS, used to skip the
+    "is this email taken?" query for emails that are certainly new. Only
+    probable hits are confirmed against the database.
+
+    The filter is loaded once from a compact file (EMAIL_BLOOM_PATH) and
+    extended in place on every registration. The file records a watermark:
+    the highest customer_id read from the database. Only database reads move
+    it, never a registration made here, whose id says nothing about lower
+    ids committed by other writers. On load, and then every ``refresh``
+    seconds, customers above the watermark are read with one primary-key
+    range query. This also picks up registrations made by other processes.
+    The range starts ``rescan`` ids below the watermark, because ids are
+    drawn before their transaction commits: a lower id may become visible
+    after a higher one has been read. If the file is missing, unreadable,
+    over capacity or ahead of the database, the filter is rebuilt by
+    streaming the emails.
+    """
+    def __init__(self, path=None, capacity=None, fp_rate=None, refresh=None, rescan=None):
+        """
+        Args:
+            path (str): Filter file. Defaults to EMAIL_BLOOM_PATH, then ``email_bloom.bin``.
+            capacity (int): Emails the filter is sized for. Defaults to
+                EMAIL_BLOOM_CAPACITY, then 1,000,000 (about 1.2 MB at 1%).
+            fp_rate (float): Target false-positive rate. Defaults to
+                EMAIL_BLOOM_FP_RATE, then 0.01.
+            refresh (float): Seconds between catch-up queries. Defaults to
+                EMAIL_BLOOM_REFRESH, then 60.
+            rescan (int): Ids below the watermark that each catch-up reads
+                again. Defaults to EMAIL_BLOOM_RESCAN, then 1000.
+        """
+        self.path = path or os.getenv("EMAIL_BLOOM_PATH", "email_bloom.bin")
+        self.capacity = int(capacity or os.getenv("EMAIL_BLOOM_CAPACITY", "1000000"))
+        self.fp_rate = float(fp_rate or os.getenv("EMAIL_BLOOM_FP_RATE", "0.01"))
+        self.refresh = float(os.getenv("EMAIL_BLOOM_REFRESH", "60") if refresh is None else refresh)
+        self.rescan = int(os.getenv("EMAIL_BLOOM_RESCAN", "1000") if rescan is None else rescan)
+        self._bloom = None
+        self._synced_at = 0.0
+        self._lock = threading.Lock()
+        self.skipped = 0
+        self.checked = 0
+
+    @staticmethod
+    def key(email):
+        """Emails are compared case-insensitively here; extra matches only cost a query."""
+        return email.strip().lower()
+
+    def might_be_registered(self, email):
+        """
+        Checks the filter.
+
+        Args:
+            email (str): The email address.
+
+        Returns:
+            bool: False if the email is certainly not registered; True if it may be.
+        """
+        bloom = self._ensure_loaded()
+        if RegisteredEmailFilter.key(email) in bloom:
+            self.checked += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def add(self, email, customer_id):
+        """
+        Records a newly inserted customer in memory and in the filter file.
+
+        The watermark is left alone; see the class docstring.
+
+        Args:
+            email (str): The customer's email.
+            customer_id (int): The customer's id.
+        """
+        bloom = self._ensure_loaded()
+        with self._lock:
+            changed = RegisteredEmailFilter._add_key(bloom, email)
+            if not changed:
+                return
+            try:
+                bloom.save_changes(self.path, changed)
+            except OSError as e:
+                # The in-memory filter is still correct; the next load catches up from the database.
+                logger.warning(f"Could not persist email filter to {self.path}: {e}")
+
+    def add_many(self, customers):
+        """
+        Records a batch of inserted customers with a single file write.
+
+        Like ``add``, every key is added and the watermark is left alone.
+
+        Args:
+            customers (iterable): (email, customer_id) pairs.
+        """
+        bloom = self._ensure_loaded()
+        with self._lock:
+            changed = set()
+            for email, _ in customers:
+                changed.update(RegisteredEmailFilter._add_key(bloom, email))
+            if not changed:
+                return
+            try:
+                bloom.save_changes(self.path, sorted(changed))
+            except OSError as e:
+                logger.warning(f"Could not persist email filter to {self.path}: {e}")
+
+    def invalidate(self):
+        """Forgets the in-memory filter so the next check reloads it."""
+        with self._lock:
+            self._bloom = None
+
+    def stats(self):
+        """Returns the filter's size, fill and how many lookups it answered alone."""
+        bloom = self._bloom
+        return {
+            "items": bloom.count if bloom else 0,
+            "size_bytes": bloom.size_bytes if bloom else 0,
+            "hashes": bloom.num_hashes if bloom else 0,
+            "expected_fp_rate": round(bloom.expected_fp_rate(), 6) if bloom else None,
+            "skipped_queries": self.skipped,
+            "confirmed_with_query": self.checked,
+        }
+
+    def _ensure_loaded(self):
+        bloom = self._bloom
+        if bloom is not None and time.monotonic() - self._synced_at < self.refresh:
+            return bloom
+        with self._lock:
+            if self._bloom is None:
+                bloom = BloomFilter.load(self.path)
+                if bloom is None or bloom.count > bloom.capacity or not self._matches_database(bloom):
+                    bloom = self._rebuild(max(self.capacity, 2 * (bloom.count if bloom else 0)))
+                    self._synced_at = time.monotonic()
+                self._bloom = bloom
+            if time.monotonic() - self._synced_at >= self.refresh:
+                self._catch_up(self._bloom)
+                self._synced_at = time.monotonic()
+            return self._bloom
+
+    def _matches_database(self, bloom):
+        # A file left over from another (or a recreated) database claims ids that do not exist here.
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(customer_id) FROM customers", name="email_filter.max_id")
+            max_id = cursor.fetchone()[0] or 0
+            cursor.close()
+        return bloom.watermark <= max_id
+
+    @staticmethod
+    def _add_key(bloom, email):
+        # Emails already present are skipped, so reading one twice does not inflate the item count.
+        key = RegisteredEmailFilter.key(email)
+        if key in bloom:
+            return []
+        return bloom.add(key)
+
+    def _catch_up(self, bloom):
+        changed = set()
+        watermark = bloom.watermark
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(
+                    "SELECT email, customer_id FROM customers WHERE customer_id > %s ORDER BY customer_id",
+                    (max(bloom.watermark - self.rescan, 0),),
+                    name="email_filter.catch_up"
+                )
+                for email, customer_id in cursor.fetchall():
+                    changed.update(RegisteredEmailFilter._add_key(bloom, email))
+                    watermark = max(watermark, int(customer_id))
+            finally:
+                cursor.close()
+        moved = watermark != bloom.watermark
+        bloom.watermark = watermark
+        if changed or moved:  # The header, rewritten on every save, carries the watermark
+            try:
+                bloom.save_changes(self.path, sorted(changed))
+            except OSError as e:
+                logger.warning(f"Could not persist email filter to {self.path}: {e}")
+
+    def _rebuild(self, capacity):
+        bloom = BloomFilter(capacity, self.fp_rate)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT email, customer_id FROM customers", name="email_filter.rebuild")
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                for email, customer_id in rows:
+                    bloom.add(RegisteredEmailFilter.key(email))
+                    bloom.watermark = max(bloom.watermark, int(customer_id))
+            cursor.close()
+        try:
+            bloom.save(self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist email filter to {self.path}: {e}")
+        logger.info(f"Rebuilt email filter: {bloom.count} emails, {bloom.size_bytes} bytes")
+        return bloom
+
+
+# Process-wide filter used by HotelService.
+email_filter = RegisteredEmailFilter()
@@ -0,0 +1,205 @@
+"""
+Booking Event Journal
+
+Every state change made through Booking and Payment (via HotelService) is
+appended to an on-disk journal (``utils.journal.Journal``) after its database
+transaction commits:
+
+- payment_recorded: payment_id, room_id, amount
+- booking_created: booking_id, payment_id, customer_id, room_id, check_in, check_out, total_amount
+- booking_cancelled: booking_id, room_id, previous_total, total_amount, refund
+- booking_shortened: booking_id, room_id, check_in, previous_check_out, check_out, previous_total,
+  total_amount, refund
+- refund_queued: payment_id, booking_id, amount
+- room_availability_changed: room_id, is_available
+
+Unlike BOOKINGS, where a cancellation overwrites TOTAL_AMOUNT and CHECK_OUT,
+the journal keeps the before and after of every change.
+
+The in-process caches are projections of these events. ``snapshot`` writes
+the room cache and availability index to the journal directory, tagged with
+the last sequence they include. ``warm_start`` restores a process from those
+snapshots and replays the journal tail, instead of querying the database at
+startup. Replayed events are idempotent. An event lost between the commit
+and the append (a crash in between) is picked up when the cache's TTL next
+reloads it from the database.
+
+Usage:
+    python -m modules.events snapshot            # write cache snapshots, drop segments they cover
+    python -m modules.events tail [--after N]    # print journalled events
+    python -m modules.events stats
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from modules.availability import availability_index
+from modules.room_cache import room_cache
+from utils.journal import Journal
+from utils.logger import get_logger, setup_logger
+
+logger = get_logger(__name__)
+
+PAYMENT_RECORDED = "payment_recorded"
+BOOKING_CREATED = "booking_created"
+BOOKING_CANCELLED = "booking_cancelled"
+BOOKING_SHORTENED = "booking_shortened"
+REFUND_QUEUED = "refund_queued"
+ROOM_AVAILABILITY_CHANGED = "room_availability_changed"
+
+# Caches restored by warm_start, by snapshot name.
+PROJECTIONS = {
+    "rooms": room_cache,
+    "availability": availability_index,
+}
+
+
+class EventLog:
+    """
+    EventLog Class
+
+    Records domain events to the journal in JOURNAL_DIR and rebuilds the
+    caches from it. An empty JOURNAL_DIR turns journalling off.
+    """
+    def __init__(self, directory=None):
+        """
+        Args:
+            directory (str): Journal directory. Defaults to the JOURNAL_DIR
+                environment variable, then "journal".
+        """
+        self.directory = os.getenv("JOURNAL_DIR", "journal") if directory is None else directory
+        self.segment_bytes = int(os.getenv("JOURNAL_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+        self.fsync = os.getenv("JOURNAL_FSYNC", "0") == "1"
+        self._journal = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    def journal(self):
+        """Returns the journal, opening it on first use."""
+        with self._lock:
+            if self._journal is None:
+                self._journal = Journal(self.directory, self.segment_bytes, self.fsync)
+            return self._journal
+
+    def record(self, event_type, **fields):
+        """
+        Appends an event.
+
+        Called after the change has committed, so a journal that cannot be
+        written is logged and never fails the booking or payment itself.
+
+        Args:
+            event_type (str): One of the event type constants of this module.
+            **fields: The event's data; dates are written as ISO strings.
+
+        Returns:
+            int: The event's sequence number, or None if it was not recorded.
+        """
+        if not self.enabled:
+            return None
+        try:
+            return self.journal().append({"type": event_type, "at": datetime.now().isoformat(), **fields})
+        except OSError as e:
+            logger.error(f"Could not journal {event_type} event: {e}")
+            return None
+
+    def events(self, after=0):
+        """Yields (sequence, event) for every event after ``after``."""
+        if not self.enabled:
+            return iter(())
+        return self.journal().read(after)
+
+    def snapshot(self):
+        """
+        Writes a snapshot of every projection, then drops the journal
+        segments that all snapshots already include.
+
+        The journal position is read before the caches are loaded, so events
+        appended meanwhile are replayed on top of the snapshot; that is safe
+        because replay is idempotent.
+
+        Returns:
+            dict: Sequence each snapshot includes, by name, and segments removed.
+        """
+        journal = self.journal()
+        seq = journal.last_seq()
+        for name, cache in PROJECTIONS.items():
+            cache.invalidate()
+            journal.save_snapshot(name, seq, cache.snapshot())
+        removed = journal.compact(seq)
+        logger.info(f"Wrote cache snapshots at journal sequence {seq}; removed {removed} segments.")
+        return {"seq": seq, "projections": list(PROJECTIONS), "segments_removed": removed}
+
+    def warm_start(self):
+        """
+        Restores every projection from its snapshot and the journal tail.
+
+        Projections without a snapshot are left alone and load from the
+        database on first use, as before.
+
+        Returns:
+            dict: Per projection, the snapshot sequence and events replayed, plus the seconds taken.
+        """
+        start = time.perf_counter()
+        restored = {}
+        if not self.enabled:
+            return {"projections": restored, "seconds": 0.0}
+        journal = self.journal()
+        snapshots = {}
+        for name, cache in PROJECTIONS.items():
+            seq, state = journal.load_snapshot(name)
+            if state is not None:
+                cache.restore(state)
+                snapshots[name] = seq
+                restored[name] = {"snapshot_seq": seq, "replayed": 0}
+        segments = journal.segments()
+        if snapshots and segments and segments[0] > min(snapshots.values()) + 1:
+            # The segments after the oldest snapshot were removed: the tail is incomplete.
+            logger.warning("Journal is missing events after a snapshot; caches will load from the database.")
+            for name in snapshots:
+                PROJECTIONS[name].invalidate()
+            return {"projections": {}, "seconds": time.perf_counter() - start}
+        if snapshots:
+            for seq, event in journal.read(min(snapshots.values())):
+                for name, snapshot_seq in snapshots.items():
+                    if seq > snapshot_seq:
+                        PROJECTIONS[name].apply_event(event)
+                        restored[name]["replayed"] += 1
+        seconds = time.perf_counter() - start
+        if restored:
+            logger.info(f"Warm start from the journal in {seconds:.3f}s: {restored}")
+        return {"projections": restored, "seconds": seconds}
+
+
+event_log = EventLog()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Booking event journal.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("snapshot", help="Snapshot the caches and drop the journal segments they cover.")
+    tail = commands.add_parser("tail", help="Print journalled events as JSON lines.")
+    tail.add_argument("--after", type=int, default=0, help="Only events after this sequence number.")
+    commands.add_parser("stats", help="Show journal size and position.")
+    args = parser.parse_args(argv)
+    setup_logger()
+    if not event_log.enabled:
+        print("Journalling is disabled (JOURNAL_DIR is empty).")
+        return
+
+    if args.command == "snapshot":
+        print(json.dumps(event_log.snapshot()))
+    elif args.command == "tail":
+        for seq, event in event_log.events(args.after):
+            print(json.dumps({"seq": seq, **event}))
+    else:
+        print(json.dumps(event_log.journal().stats()))
+
+
+if __name__ == "__main__":
+    main()
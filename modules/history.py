@@ -1,9 +1,8 @@
-from config.db_config import get_connection
-from datetime import datetime
-from utils.logger import setup_logger
+from modules.service import HistoryRequest, HotelService
+from utils.logger import get_logger
 
 # Set up the logger
-logger = setup_logger()
+logger = get_logger(__name__)
 
 class History:
     """
@@ -12,12 +11,15 @@ class History:
     This class provides methods to view booking history for a given customer ID.
     """
     @staticmethod
-    def view_history(customer_id):
+    def view_history(customer_id, status=None, from_date=None, to_date=None):
         """
         Fetches and displays the booking history for a specified customer.
 
         Args:
             customer_id (int): The ID of the customer whose booking history is to be retrieved.
+            status (str): Only show bookings with this status, e.g. 'CONFIRMED'.
+            from_date (date): Only show bookings checking in on or after this date.
+            to_date (date): Only show bookings checking in on or before this date.
 
         Returns:
             None
@@ -25,8 +27,8 @@ class History:
         Raises:
             Exception: If an error occurs while fetching booking history or executing the SQL query.
 
-        This method connects to the database, retrieves the bookings for the given customer ID,
-        and prints the booking details in a user-friendly format. The booking details include
+        This method streams the bookings for the given customer ID page by page through
+        ``HotelService.iter_history``, printing each one as it arrives, and prints the booking details in a user-friendly format. The booking details include
         the booking ID, room ID, nights booked, check-in and check-out dates, status of the booking,
         booking time, total amount, cancellation status, and cancellation timestamp.
 
@@ -35,57 +37,42 @@ class History:
             - Error messages if no bookings are found or if an error occurs.
         """
         try:
-            conn = get_connection()
-            cursor = conn.cursor()
-
-            # Fetch bookings for the given customer ID
-            cursor.execute("SELECT * FROM bookings WHERE customer_id = %s", (customer_id,))
-            data = cursor.fetchall()
-
-            # Check if there are any bookings for the customer
-            if data:
-                logger.info(f"Fetched booking history for Customer ID: {customer_id}")
-                print('\n')
-                print(f"\nBooking history for Customer ID: {customer_id}\n")
-                for booking in data:
-                    # Unpack values for better readability
-                    (booking_id, room_id, nights, customer_id, check_in, check_out, 
-                    status, booking_time, amount, cancellation_status, 
-                    cancellation_timestamp) = booking
-
-                    # Format dates to make them user-friendly
-                    check_in_str = check_in.strftime("%d-%b-%Y") 
-                    check_out_str = check_out.strftime("%d-%b-%Y")  
-                    booking_time_str = booking_time.strftime("%d-%b-%Y %H:%M:%S")
-                    cancellation_timestamp_str = (
-                        cancellation_timestamp.strftime("%d-%b-%Y %H:%M:%S") 
-                        if cancellation_timestamp else "N/A"
-                    )
-
-                    # Pretty print the booking details
-                    print(f"Booking ID: {booking_id}")
-                    print(f"Room ID: {room_id}")
-                    print(f"Nights: {nights}")
-                    print(f"Check-in: {check_in_str}")
-                    print(f"Check-out: {check_out_str}")
-                    print(f"Status: {status}")
-                    print(f"Booking Time: {booking_time_str}")
-                    print(f"Total Amount: ${amount}")
-                    print(f"Cancellation Status: {cancellation_status}")
-                    print(f"Cancellation Timestamp: {cancellation_timestamp_str}")
-                    print('-' * 40)
-
-            else:
-                logger.error(f"An error occurred while fetching booking history for Customer ID {customer_id}:")
+            # Stream bookings for the given customer ID
+            bookings = HotelService.iter_history(HistoryRequest(customer_id, status, from_date, to_date))
+
+            count = 0
+            for booking in bookings:
+                if count == 0:
+                    print('\n')
+                    print(f"\nBooking history for Customer ID: {customer_id}\n")
+                count += 1
+                # Format dates to make them user-friendly
+                check_in_str = booking.check_in.strftime("%d-%b-%Y") 
+                check_out_str = booking.check_out.strftime("%d-%b-%Y")  
+                booking_time_str = booking.created_at.strftime("%d-%b-%Y %H:%M:%S")
+                cancellation_timestamp_str = (
+                    booking.cancellation_timestamp.strftime("%d-%b-%Y %H:%M:%S") 
+                    if booking.cancellation_timestamp else "N/A"
+                )
+
+                # Pretty print the booking details
+                print(f"Booking ID: {booking.booking_id}")
+                print(f"Room ID: {booking.room_id}")
+                print(f"Nights: {booking.nights}")
+                print(f"Check-in: {check_in_str}")
+                print(f"Check-out: {check_out_str}")
+                print(f"Status: {booking.status}")
+                print(f"Booking Time: {booking_time_str}")
+                print(f"Total Amount: ${booking.total_amount}")
+                print(f"Cancellation Status: {booking.cancellation_status}")
+                print(f"Cancellation Timestamp: {cancellation_timestamp_str}")
+                print('-' * 40)
+
+            # Check if there were any bookings for the customer
+            if count == 0:
                 logger.info(f"No bookings found for Customer ID: {customer_id}")
                 print(f"\n\nNo bookings found for Customer ID: {customer_id}")
 
         except Exception as e:
             logger.error(f"An error occurred while fetching booking history for Customer ID {customer_id}: {e}")
             print(f"\n\nAn error occurred while fetching booking history: {e}")
-
-        finally:
-            if conn:
-                conn.close()
-
-
@@ -0,0 +1,207 @@
+import heapq
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+from modules.availability import normalize_id, stay_range
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Hold:
+    token: str
+    room_id: int
+    check_in: date               # First held night
+    check_out: date              # Exclusive; a same-day stay holds its check-in night
+    customer_id: Optional[int]
+    expires_at: float            # time.monotonic() deadline
+    ttl: float
+
+    def overlaps(self, check_in, check_out):
+        return self.check_in < check_out and check_in < self.check_out
+
+    @property
+    def seconds_left(self):
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+
+class HoldTable:
+    """
+    HoldTable Class
+
+    Short-lived, in-memory reservations of a room for a stay, taken while a
+    guest goes through checkout (dates, payment prompt) so nobody else can
+    book those nights in the meantime, without holding a database
+    transaction or lock open.
+
+    Holds are kept per room for overlap checks and in a min-heap ordered by
+    expiry. A daemon thread sleeps until the earliest expiry and releases
+    whatever has run out. Every read also drops expired holds first, so an
+    expired hold is never honoured even if the thread is late. Released or
+    extended holds leave stale heap entries behind. They are skipped when
+    they reach the top.
+
+    Holds live in this process only: they guard the guests this process
+    serves (all of them, for server.py).
+    """
+    def __init__(self, ttl=None):
+        """
+        Args:
+            ttl (float): Default seconds a hold lasts. Defaults to the HOLD_TTL
+                environment variable, then 600.
+        """
+        self.ttl = float(os.getenv("HOLD_TTL", "600")) if ttl is None else ttl
+        self._holds = {}      # token -> Hold
+        self._by_room = {}    # room_id -> {token: Hold}
+        self._heap = []       # (expires_at, token)
+        self._cond = threading.Condition()
+        self._expirer = None
+        self.placed = 0
+        self.expired = 0
+        self.released = 0
+
+    def place(self, room_id, check_in, check_out, customer_id=None, ttl=None):
+        """
+        Holds a room for a stay.
+
+        The caller checks that the room is free of bookings; this only checks
+        other holds. A customer's own overlapping holds on the room are
+        replaced, so going back to change dates does not block oneself.
+
+        Args:
+            room_id (int): ID of the room.
+            check_in (date): First night of the stay.
+            check_out (date): Departure date.
+            customer_id (int): Customer taking the hold, if known.
+            ttl (float): Seconds the hold lasts; defaults to ``self.ttl``.
+
+        Returns:
+            Hold: The new hold, or None if another customer holds an overlapping stay.
+        """
+        room_id = normalize_id(room_id)
+        check_in, check_out = stay_range(check_in, check_out)
+        ttl = self.ttl if ttl is None else float(ttl)
+        with self._cond:
+            self._expire_locked(time.monotonic())
+            for hold in list(self._by_room.get(room_id, {}).values()):
+                if hold.overlaps(check_in, check_out):
+                    if customer_id is None or hold.customer_id != customer_id:
+                        return None
+                    self._remove_locked(hold.token)
+            hold = Hold(secrets.token_urlsafe(16), room_id, check_in, check_out, customer_id,
+                        time.monotonic() + ttl, ttl)
+            self._holds[hold.token] = hold
+            self._by_room.setdefault(room_id, {})[hold.token] = hold
+            heapq.heappush(self._heap, (hold.expires_at, hold.token))
+            self.placed += 1
+            self._start_expirer_locked()
+            if self._heap[0][1] == hold.token:
+                self._cond.notify()
+        logger.info(f"Room {room_id} held from {check_in} to {check_out} for {ttl:.0f}s.",
+                    extra={"customer_id": customer_id})
+        return hold
+
+    def get(self, token):
+        """Returns the live hold for a token, or None if it expired or was released."""
+        with self._cond:
+            self._expire_locked(time.monotonic())
+            return self._holds.get(token)
+
+    def extend(self, token, ttl=None):
+        """
+        Pushes a live hold's expiry ``ttl`` seconds (default: its own ttl) from now.
+
+        Returns:
+            Hold: The extended hold, or None if it had already expired or been released.
+        """
+        with self._cond:
+            self._expire_locked(time.monotonic())
+            hold = self._holds.get(token)
+            if hold is None:
+                return None
+            hold.expires_at = time.monotonic() + (hold.ttl if ttl is None else float(ttl))
+            heapq.heappush(self._heap, (hold.expires_at, token))
+            return hold
+
+    def release(self, token):
+        """
+        Releases a hold (after booking, or when the guest gives up).
+
+        Returns:
+            bool: True if the hold was live.
+        """
+        with self._cond:
+            if self._remove_locked(token) is None:
+                return False
+            self.released += 1
+            return True
+
+    def conflicts(self, room_id, check_in, check_out, token=None):
+        """
+        Returns the live holds on a room overlapping a stay, other than ``token``.
+
+        Returns:
+            list: Hold objects.
+        """
+        room_id = normalize_id(room_id)
+        check_in, check_out = stay_range(check_in, check_out)
+        with self._cond:
+            self._expire_locked(time.monotonic())
+            return [hold for hold in self._by_room.get(room_id, {}).values()
+                    if hold.token != token and hold.overlaps(check_in, check_out)]
+
+    def held_rooms(self, check_in, check_out, token=None):
+        """Returns the IDs of rooms with a live hold overlapping a stay, other than ``token``."""
+        check_in, check_out = stay_range(check_in, check_out)
+        with self._cond:
+            self._expire_locked(time.monotonic())
+            return {room_id for room_id, holds in self._by_room.items()
+                    if any(hold.token != token and hold.overlaps(check_in, check_out) for hold in holds.values())}
+
+    def stats(self):
+        """Returns live holds and counters of holds placed, released and expired."""
+        with self._cond:
+            self._expire_locked(time.monotonic())
+            return {"live": len(self._holds), "placed": self.placed, "released": self.released,
+                    "expired": self.expired, "heap": len(self._heap)}
+
+    def _remove_locked(self, token):
+        hold = self._holds.pop(token, None)
+        if hold is not None:
+            holds = self._by_room.get(hold.room_id)
+            holds.pop(token, None)
+            if not holds:
+                del self._by_room[hold.room_id]
+        return hold
+
+    def _expire_locked(self, now):
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            expires_at, token = heapq.heappop(heap)
+            hold = self._holds.get(token)
+            if hold is not None and hold.expires_at == expires_at:
+                self._remove_locked(token)
+                self.expired += 1
+                logger.info(f"Hold on room {hold.room_id} from {hold.check_in} to {hold.check_out} expired.",
+                            extra={"customer_id": hold.customer_id})
+
+    def _start_expirer_locked(self):
+        if self._expirer is None:
+            self._expirer = threading.Thread(target=self._run_expirer, name="hold-expirer", daemon=True)
+            self._expirer.start()
+
+    def _run_expirer(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._expire_locked(now)
+                self._cond.wait(timeout=self._heap[0][0] - now if self._heap else None)
+
+
+# Process-wide hold table used by HotelService.
+hold_table = HoldTable()
@@ -1,7 +1,8 @@
-from config.db_config import get_connection
-from datetime import datetime
-from utils.logger import setup_logger
-logger = setup_logger()
+from datetime import date, timedelta
+from modules.service import HotelService, QuoteRequest
+from utils.exceptions import NotFoundError
+from utils.logger import get_logger
+logger = get_logger(__name__)
 
 class Payment:
     """
@@ -15,132 +16,72 @@ class Payment:
         self.amount = amount  
         self.total_amount = 0 
     @staticmethod
-    def process_payment(amount, room_id):
+    def collect_payment(amount, room_id, check_in=None, check_out=None):
         """
-        Processes the payment for a given room ID.
+        Quotes the stay and prompts the user until a sufficient amount is entered.
 
-        This method fetches the price of the specified room from the database,
-        prompts the user for payment, and records the payment in the database.
+        Nothing is written to the database; the caller records the payment, for
+        example together with the booking in ``Booking.book_and_pay``.
 
         Parameters:
-            amount (float): The base amount for the booking.
+            amount (float): The number of nights for the booking.
             room_id (int): The ID of the room to be booked.
+            check_in (date): First night; defaults to today.
+            check_out (date): Departure date; defaults to ``amount`` nights after check-in.
 
         Returns:
-            int: The payment ID if the payment is processed successfully.
-
-        Raises:
-            ValueError: If the user input for the payment amount is invalid.
+            float: The amount the user paid, or None if the room does not exist.
         """
-        conn = get_connection()
-        cursor = conn.cursor()
-
+        # Price the stay with the room's rate plans
+        check_in = check_in or date.today()
+        check_out = check_out or check_in + timedelta(days=int(amount))
         try:
-            # Fetch room price from the database
-            cursor.execute("SELECT price FROM rooms WHERE room_id = %s", (room_id,))
-            price = cursor.fetchone()
-
-            if price is None:
-                print(f"No room found with room_id: {room_id}")
-                return
-
-            total_amount = amount * price[0]  # Calculate the required payment
-            print(f"\n\nThe total amount for your stay is ${total_amount}.")
+            quote = HotelService.quote(QuoteRequest(room_id, check_in, check_out))
+        except NotFoundError:
+            print(f"No room found with room_id: {room_id}")
+            return
+
+        total_amount = quote.total_amount  # Calculate the required payment
+        print(f"\n\nThe total amount for your stay is ${total_amount}.")
+
+        while True:
+            try:
+                # Prompt user for payment; no connection is held while waiting
+                paid_amount = float(input(f"Enter payment amount (at least ${total_amount}): "))
+
+                # Check if the paid amount is sufficient
+                if paid_amount >= total_amount:
+                    print(f"\n\nProcessing payment of ${paid_amount}...")
+                    return paid_amount
+                else:
+                    print(f"Insufficient payment! You still need to pay at least ${total_amount}.")
+            except ValueError:
+                print("Invalid input! Please enter a valid amount.")
 
-            while True:
-                try:
-                    # Prompt user for payment
-                    paid_amount = float(input(f"Enter payment amount (at least ${total_amount}): "))
-
-                    # Check if the paid amount is sufficient
-                    if paid_amount >= total_amount:
-                        print(f"\n\nProcessing payment of ${paid_amount}...")
-                        print("Payment successful! Thank you.")
-
-                        # Insert payment record into the payments table
-                        cursor.execute(
-                            """
-                            INSERT INTO payments (room_id, amount, payment_date, isRefund)
-                            VALUES (%s, %s, %s, %s)
-                            """,
-                            (room_id, paid_amount, datetime.now(), False)
-                        )
-                        cursor.execute(
-                            """
-                            SELECT payment_id 
-                            FROM payments 
-                            ORDER BY payment_date DESC 
-                            LIMIT 1
-                            """
-                        )
-                        latest_payment_id = cursor.fetchone()[0]
-                        conn.commit()
-                        logger.info(f"Payment recorded successfully with ID: {latest_payment_id}")
-                        print("Payment recorded successfully.")
-                        return latest_payment_id 
-                    else:
-                        print(f"Insufficient payment! You still need to pay at least ${total_amount}.")
-                except ValueError:
-                    print("Invalid input! Please enter a valid amount.")
-
-        except Exception as e:
-            logger.error(f"An error occurred while processing payment: {e}")
-            print(f"An error occurred: {e}")
-
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
-
-
-
-
-                
     @staticmethod
     def isRefund(amount, payment_id,refunded_amount):
         """
         Processes a refund for a given payment ID.
 
-        This method updates the specified payment record in the database to indicate
-        that it has been refunded.
+        The refund is appended to the refund ledger; the payment keeps its
+        original amount until the settlement job records the refunded total.
 
         Parameters:
-            amount (float): The new amount to be recorded for the refund.
+            amount (float): The amount the payment stands at after the refund (informational).
             payment_id (int): The ID of the payment to be refunded.
-            refunded_amount (float): The total refunded amount.
+            refunded_amount (float): The amount refunded.
 
         Returns:
             None
 
         Raises:
-            Exception: If an error occurs while updating the payment record.
+            Exception: If an error occurs while queueing the refund.
         """
-        conn = get_connection()
-        cursor = conn.cursor()
-
         try:
-            # Update the amount and set isRefund to true
-            cursor.execute(
-                """
-                UPDATE payments
-                SET amount = %s, isRefund = TRUE,
-                REFUNDED_AMOUNT = %s
-                WHERE payment_id = %s
-                """,
-                (amount, refunded_amount,payment_id)
-            )
-            
-            # Check if any rows were affected
-            if cursor.rowcount > 0:
-                print(f"Payment ID {payment_id} updated successfully with new amount ${amount}.")
-                conn.commit()  
+            if HotelService.record_refund(payment_id, refunded_amount):
+                print(f"Refund of ${refunded_amount} queued for Payment ID {payment_id}; "
+                      f"it now stands at ${amount}.")
             else:
                 print(f"No payment found with ID {payment_id}.")
         except Exception as e:
             print(f"An error occurred: {e}")
-            conn.rollback() 
-        finally:
-            cursor.close()
-            conn.close()
-
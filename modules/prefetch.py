@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from modules.availability import availability_index, normalize_id
+from modules.rates import rate_engine
+from modules.room_cache import room_cache
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+metrics.describe("prefetch_seconds", "Time spent loading a room's quote inputs ahead of the quote.")
+
+
+class Prefetcher:
+    """
+    Prefetcher Class
+
+    Speculatively loads everything a quote for a room needs while the guest
+    is still typing the stay dates: the room's price and type (room cache),
+    the rate plans and the nightly price matrix (rate engine), and the
+    room's bookings (availability index, re-read for that room so that
+    bookings made by other processes count too).
+
+    Loads run on a small thread pool and fill the shared caches, so nothing
+    has to be handed over: when the dates are in, ``HotelService.quote``
+    finds everything in memory, or waits on the cache's lock for a load
+    still in flight instead of starting a second one. A failed prefetch is
+    only logged; the quote then loads what it needs itself.
+    """
+    def __init__(self, workers=None):
+        """
+        Args:
+            workers (int): Threads doing prefetches. Defaults to the
+                PREFETCH_WORKERS environment variable, then 2.
+        """
+        self.workers = int(os.getenv("PREFETCH_WORKERS", "2")) if workers is None else workers
+        self._executor = None
+        self._pending = {}  # room_id -> Future of a prefetch still running
+        self._lock = threading.Lock()
+        self.started = 0
+        self.joined = 0
+        self.failed = 0
+
+    def room(self, room_id):
+        """
+        Starts loading a room's quote inputs in the background.
+
+        A room already being prefetched is not loaded twice.
+
+        Args:
+            room_id (int | str): ID of the room.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the room's
+                (room_id, room_type, price, is_available) row, or None if the
+                room does not exist or the prefetch failed.
+        """
+        room_id = normalize_id(room_id)
+        with self._lock:
+            future = self._pending.get(room_id)
+            if future is not None:
+                self.joined += 1
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="prefetch")
+            future = self._pending[room_id] = self._executor.submit(self._load, room_id)
+            self.started += 1
+        future.add_done_callback(lambda _: self._done(room_id))
+        return future
+
+    def stats(self):
+        """Returns the prefetches started, joined while running, failed, and still running."""
+        with self._lock:
+            return {"started": self.started, "joined": self.joined, "failed": self.failed,
+                    "running": len(self._pending)}
+
+    def _load(self, room_id):
+        start = time.perf_counter()
+        try:
+            room = room_cache.get(room_id)
+            if room is None:
+                return None
+            today = date.today()
+            # Quoting one night loads the rate plans and the room type's row of the price matrix.
+            rate_engine.quote(room[1], room[2], today, today)
+            availability_index.is_free(room_id, today, today)
+            availability_index.reload_room(room_id)
+            return room
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            logger.warning(f"Prefetch of room {room_id} failed; the quote will load it instead: {e}")
+            return None
+        finally:
+            metrics.observe("prefetch_seconds", time.perf_counter() - start)
+
+    def _done(self, room_id):
+        with self._lock:
+            self._pending.pop(room_id, None)
+
+
+# Process-wide prefetcher used by the interactive booking dialog.
+prefetcher = Prefetcher()
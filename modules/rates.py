@@ -0,0 +1,368 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
+import numpy as np
+from config.db_config import get_backend, get_connection
+from modules.availability import stay_range, to_date
+from modules.room_cache import room_cache
+from utils.exceptions import NotFoundError, ValidationError
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RATE_PLAN_COLUMNS = "rate_plan_id, name, room_type, start_date, end_date, weekdays, min_nights, multiplier"
+
+
+@dataclass
+class RatePlan:
+    rate_plan_id: Optional[int]
+    name: str
+    room_type: Optional[str] = None    # None: every room type
+    start_date: Optional[date] = None  # First night covered; None: open-ended
+    end_date: Optional[date] = None    # First night no longer covered; None: open-ended
+    weekdays: Optional[str] = None     # Nights covered, e.g. "4,5" (Monday=0); None: every night
+    min_nights: int = 1                # Above 1: a length-of-stay rule on the whole stay
+    multiplier: float = 1.0            # Applied to ROOMS.PRICE
+
+    @property
+    def is_length_of_stay(self):
+        return int(self.min_nights or 1) > 1
+
+    def weekday_set(self):
+        return {int(day) for day in self.weekdays.split(",")} if self.weekdays else None
+
+
+class RateEngine:
+    """
+    RateEngine Class
+
+    Prices stays from ROOMS.PRICE and the rules in RATE_PLANS.
+
+    Nightly rules (weekend, seasonal, event rates) multiply the base price of
+    the nights they cover. They are folded into a room-type x date matrix of
+    nightly multipliers, kept with its row-wise prefix sums. The multiplier
+    sum of any stay is then ``prefix[type, out] - prefix[type, in]``, two
+    lookups however long the stay, and quoting N rooms is one vectorized
+    gather. Length-of-stay rules (``min_nights`` > 1) multiply the whole stay
+    once it is long enough; the longest matching rule wins.
+
+    The matrix spans RATE_HISTORY_DAYS before today to RATE_HORIZON_DAYS
+    after. Stays outside it are priced from the rules directly. Saving or
+    deleting a plan recomputes only the room types and dates it covers. The
+    plans are reloaded from the database every ``ttl`` seconds to pick up
+    changes made by other processes.
+    """
+    def __init__(self, horizon=None, history=None, ttl=None):
+        """
+        Args:
+            horizon (int): Days after today covered by the matrix. Defaults to
+                RATE_HORIZON_DAYS, then 730.
+            history (int): Days before today covered (for stays in progress).
+                Defaults to RATE_HISTORY_DAYS, then 90.
+            ttl (float): Seconds before the plans are reloaded. Defaults to
+                RATE_CACHE_TTL, then 300.
+        """
+        self.horizon = int(os.getenv("RATE_HORIZON_DAYS", "730") if horizon is None else horizon)
+        self.history = int(os.getenv("RATE_HISTORY_DAYS", "90") if history is None else history)
+        self.ttl = float(os.getenv("RATE_CACHE_TTL", "300") if ttl is None else ttl)
+        self.version = 0
+        self._plans = {}
+        self._types = {}         # room_type -> matrix row
+        self._origin = None      # date of matrix column 0
+        self._multipliers = None  # float64 [types, days]
+        self._prefix = None      # float64 [types, days + 1], prefix[:, 0] = 0
+        self._loaded_at = None
+        self._lock = threading.RLock()
+
+    def quote(self, room_type, base_price, check_in, check_out):
+        """
+        Prices one stay.
+
+        Args:
+            room_type (str): The room's type.
+            base_price (float): ROOMS.PRICE of the room.
+            check_in (date | str): First night.
+            check_out (date | str): Departure date; a same-day stay is one night.
+
+        Returns:
+            float: The total, rounded to cents.
+        """
+        check_in, check_out = stay_range(check_in, check_out)
+        with self._lock:
+            self._ensure_fresh()
+            factor = self._multiplier_sum(room_type, check_in, check_out)
+            factor *= self._length_of_stay(room_type, check_in, (check_out - check_in).days)
+        return round(float(base_price) * factor, 2)
+
+    def quote_rooms(self, rooms, check_in, check_out):
+        """
+        Prices one stay for many rooms at once.
+
+        Args:
+            rooms (list): (room_id, room_type, price, ...) rows, e.g. from the room cache.
+            check_in (date | str): First night.
+            check_out (date | str): Departure date.
+
+        Returns:
+            numpy.ndarray: The total for each room, in the order given, rounded to cents.
+        """
+        check_in, check_out = stay_range(check_in, check_out)
+        nights = (check_out - check_in).days
+        if not rooms:
+            return np.zeros(0)
+        with self._lock:
+            self._ensure_fresh()
+            for room in rooms:
+                self._row(room[1])
+            rows = np.fromiter((self._types[room[1]] for room in rooms), dtype=np.intp, count=len(rooms))
+            prices = np.fromiter((room[2] for room in rooms), dtype=np.float64, count=len(rooms))
+            first, last = self._column(check_in), self._column(check_out)
+            if 0 <= first and last < self._prefix.shape[1]:
+                factors = self._prefix[:, last] - self._prefix[:, first]
+            else:
+                factors = np.array([self._multiplier_sum(room_type, check_in, check_out)
+                                    for room_type in sorted(self._types, key=self._types.get)])
+            factors = factors * np.array([self._length_of_stay(room_type, check_in, nights)
+                                          for room_type in sorted(self._types, key=self._types.get)])
+        return np.round(prices * factors[rows], 2)
+
+    def plans(self):
+        """Returns every rate plan, ordered by id."""
+        with self._lock:
+            self._ensure_fresh()
+            return [self._plans[plan_id] for plan_id in sorted(self._plans)]
+
+    def save_plan(self, plan):
+        """
+        Inserts or updates a rate plan and reprices the nights it affects.
+
+        Args:
+            plan (RatePlan): The plan; ``rate_plan_id`` None inserts a new one.
+
+        Returns:
+            RatePlan: The stored plan, with its id.
+
+        Raises:
+            ValidationError: If a field is malformed.
+            NotFoundError: If an update targets a plan that does not exist.
+        """
+        plan = RateEngine._validated(plan)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                values = (plan.name, plan.room_type, plan.start_date, plan.end_date, plan.weekdays,
+                          plan.min_nights, plan.multiplier)
+                if plan.rate_plan_id is None:
+                    (plan.rate_plan_id,) = get_backend().next_ids(cursor, "rate_plans")
+                    cursor.execute(
+                        f"INSERT INTO rate_plans ({RATE_PLAN_COLUMNS}) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                        (plan.rate_plan_id,) + values,
+                        name="rates.insert_plan"
+                    )
+                else:
+                    cursor.execute(
+                        """
+                        UPDATE rate_plans
+                        SET name = %s, room_type = %s, start_date = %s, end_date = %s, weekdays = %s,
+                            min_nights = %s, multiplier = %s
+                        WHERE rate_plan_id = %s
+                        """,
+                        values + (plan.rate_plan_id,),
+                        name="rates.update_plan"
+                    )
+                    if cursor.rowcount != 1:
+                        raise NotFoundError(f"Rate plan {plan.rate_plan_id} does not exist.")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        with self._lock:
+            if self._loaded_at is not None:
+                old = self._plans.get(plan.rate_plan_id)
+                self._plans[plan.rate_plan_id] = plan
+                self._reprice(old, plan)
+        logger.info(f"Saved rate plan {plan.rate_plan_id} ({plan.name})")
+        return plan
+
+    def delete_plan(self, rate_plan_id):
+        """
+        Deletes a rate plan and reprices the nights it covered.
+
+        Returns:
+            bool: True if the plan existed.
+        """
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("DELETE FROM rate_plans WHERE rate_plan_id = %s", (rate_plan_id,),
+                               name="rates.delete_plan")
+                deleted = cursor.rowcount > 0
+                conn.commit()
+            finally:
+                cursor.close()
+        with self._lock:
+            if self._loaded_at is not None:
+                old = self._plans.pop(rate_plan_id, None)
+                self._reprice(old, None)
+        return deleted
+
+    def invalidate(self):
+        """Forces the next quote to reload the plans and rebuild the matrix."""
+        with self._lock:
+            self._loaded_at = None
+
+    def stats(self):
+        """Returns the matrix shape, its memory and the number of plans."""
+        with self._lock:
+            return {
+                "version": self.version,
+                "plans": len(self._plans),
+                "room_types": len(self._types),
+                "days": 0 if self._multipliers is None else self._multipliers.shape[1],
+                "origin": self._origin.isoformat() if self._origin else None,
+                "bytes": 0 if self._prefix is None else self._multipliers.nbytes + self._prefix.nbytes,
+            }
+
+    @staticmethod
+    def _validated(plan):
+        if not plan.name or not str(plan.name).strip():
+            raise ValidationError("name", "A rate plan needs a name.")
+        plan.start_date = to_date(plan.start_date) if plan.start_date else None
+        plan.end_date = to_date(plan.end_date) if plan.end_date else None
+        if plan.start_date and plan.end_date and plan.end_date <= plan.start_date:
+            raise ValidationError("end_date", "The end date must be after the start date.")
+        try:
+            plan.weekday_set()
+        except ValueError:
+            raise ValidationError("weekdays", "Weekdays are comma-separated numbers, Monday=0 to Sunday=6.")
+        if plan.weekdays and not plan.weekday_set() <= set(range(7)):
+            raise ValidationError("weekdays", "Weekdays are comma-separated numbers, Monday=0 to Sunday=6.")
+        plan.min_nights = int(plan.min_nights or 1)
+        plan.multiplier = float(plan.multiplier)
+        if plan.multiplier < 0:
+            raise ValidationError("multiplier", "The multiplier must not be negative.")
+        return plan
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if (self._loaded_at is not None and now - self._loaded_at < self.ttl
+                and self._origin == date.today() - timedelta(days=self.history)):
+            return
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {RATE_PLAN_COLUMNS} FROM rate_plans", name="rates.load_plans")
+            rows = cursor.fetchall()
+            cursor.close()
+        self._plans = {}
+        for row in rows:
+            plan = RatePlan(*row)
+            plan.start_date = to_date(plan.start_date) if plan.start_date else None
+            plan.end_date = to_date(plan.end_date) if plan.end_date else None
+            plan.min_nights = int(plan.min_nights or 1)
+            plan.multiplier = float(plan.multiplier)
+            self._plans[plan.rate_plan_id] = plan
+        self._build()
+        self._loaded_at = time.monotonic()
+
+    def _build(self):
+        self._origin = date.today() - timedelta(days=self.history)
+        types = sorted({room[1] for room in room_cache.all_rooms()} |
+                       {plan.room_type for plan in self._plans.values() if plan.room_type is not None}, key=str)
+        self._types = {room_type: row for row, room_type in enumerate(types)}
+        days = self.history + self.horizon
+        self._multipliers = np.ones((len(types), days))
+        self._prefix = np.zeros((len(types), days + 1))
+        for room_type, row in self._types.items():
+            self._multipliers[row] = self._nightly(room_type, self._origin, days)
+        np.cumsum(self._multipliers, axis=1, out=self._prefix[:, 1:])
+        self.version += 1
+        logger.info(f"Built rate matrix: {len(types)} room types x {days} days, {len(self._plans)} plans")
+
+    def _nightly(self, room_type, start, days):
+        """Nightly multipliers of ``days`` nights from ``start``, computed from the plans."""
+        multipliers = np.ones(days)
+        if days <= 0:
+            return multipliers
+        weekdays = (start.weekday() + np.arange(days)) % 7
+        for plan in self._plans.values():
+            if plan.is_length_of_stay or plan.room_type not in (None, room_type):
+                continue
+            first = 0 if plan.start_date is None else max((plan.start_date - start).days, 0)
+            last = days if plan.end_date is None else min((plan.end_date - start).days, days)
+            if first >= last:
+                continue
+            covered = slice(first, last)
+            allowed = plan.weekday_set()
+            if allowed is None:
+                multipliers[covered] *= plan.multiplier
+            else:
+                multipliers[covered] *= np.where(np.isin(weekdays[covered], list(allowed)), plan.multiplier, 1.0)
+        return multipliers
+
+    def _length_of_stay(self, room_type, check_in, nights):
+        best = None
+        for plan in self._plans.values():
+            if (not plan.is_length_of_stay or nights < plan.min_nights
+                    or plan.room_type not in (None, room_type)
+                    or (plan.start_date and check_in < plan.start_date)
+                    or (plan.end_date and check_in >= plan.end_date)):
+                continue
+            if best is None or (plan.min_nights, -plan.multiplier) > (best.min_nights, -best.multiplier):
+                best = plan
+        return 1.0 if best is None else best.multiplier
+
+    def _row(self, room_type):
+        row = self._types.get(room_type)
+        if row is None:
+            # A room type first seen after the build: append its row.
+            row = len(self._types)
+            self._types[room_type] = row
+            multipliers = self._nightly(room_type, self._origin, self._multipliers.shape[1])
+            self._multipliers = np.vstack([self._multipliers, multipliers])
+            self._prefix = np.vstack([self._prefix, np.concatenate(([0.0], np.cumsum(multipliers)))])
+        return row
+
+    def _column(self, day):
+        return (day - self._origin).days
+
+    def _multiplier_sum(self, room_type, check_in, check_out):
+        row = self._row(room_type)
+        first, last = self._column(check_in), self._column(check_out)
+        if 0 <= first and last < self._prefix.shape[1]:
+            return float(self._prefix[row, last] - self._prefix[row, first])
+        return float(self._nightly(room_type, check_in, (check_out - check_in).days).sum())
+
+    def _reprice(self, old, new):
+        """Recomputes the cells covered by a plan before and after a change, then their prefix sums."""
+        plans = [plan for plan in (old, new) if plan is not None and not plan.is_length_of_stay]
+        if not plans:
+            self.version += 1
+            return
+        for plan in plans:
+            if plan.room_type is not None:
+                self._row(plan.room_type)
+        days = self._multipliers.shape[1]
+        first = min(0 if plan.start_date is None else max(self._column(plan.start_date), 0) for plan in plans)
+        last = max(days if plan.end_date is None else min(self._column(plan.end_date), days) for plan in plans)
+        if first >= last:
+            self.version += 1
+            return
+        if any(plan.room_type is None for plan in plans):
+            rows = list(self._types.items())
+        else:
+            rows = [(plan.room_type, self._types[plan.room_type]) for plan in plans]
+        start = self._origin + timedelta(days=first)
+        for room_type, row in rows:
+            self._multipliers[row, first:last] = self._nightly(room_type, start, last - first)
+            np.cumsum(self._multipliers[row, first:], out=self._prefix[row, first + 1:])
+            self._prefix[row, first + 1:] += self._prefix[row, first]
+        self.version += 1
+
+
+# Process-wide rate engine used by HotelService.
+rate_engine = RateEngine()
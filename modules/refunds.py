@@ -0,0 +1,206 @@
+"""
+Refund Ledger and Settlement
+
+Cancellations no longer rewrite PAYMENTS. They append a row to the REFUNDS
+ledger inside the cancellation's own transaction, and PAYMENTS.AMOUNT keeps
+the original charge. The settlement job folds the ledger into PAYMENTS in
+batches:
+
+- one query picks the next ``batch_size`` payments with unsettled refunds
+  (refund_id above the payment's SETTLED_REFUND_ID)
+- one ``UPDATE ... FROM`` sets each payment's REFUNDED_AMOUNT to the sum of
+  its ledger rows and SETTLED_REFUND_ID to the highest refund_id summed
+- one commit per batch
+
+The totals are recomputed from the ledger, not added to, so running the job
+twice, or running two jobs at once, settles to the same amounts.
+
+Usage:
+    python -m modules.refunds                 # settle everything pending once
+    python -m modules.refunds --every 60      # keep settling every minute
+    python -m modules.refunds --pending       # show what is waiting
+"""
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from config.db_config import get_connection
+from utils.logger import get_logger, setup_logger
+
+logger = get_logger(__name__)
+
+REFUND_BATCH_SIZE = int(os.getenv("REFUND_BATCH_SIZE", "500"))
+
+PENDING_PAYMENTS = """
+    SELECT DISTINCT r.payment_id
+    FROM refunds r
+    JOIN payments p ON p.payment_id = r.payment_id
+    WHERE r.refund_id > COALESCE(p.settled_refund_id, 0) AND r.payment_id > %s
+    ORDER BY r.payment_id
+    LIMIT %s
+"""
+
+SETTLE_PAYMENTS = """
+    UPDATE payments
+    SET refunded_amount = t.total, settled_refund_id = t.last_refund_id, isRefund = TRUE
+    FROM (
+        SELECT payment_id, SUM(amount) AS total, MAX(refund_id) AS last_refund_id
+        FROM refunds
+        WHERE payment_id IN ({placeholders})
+        GROUP BY payment_id
+    ) t
+    WHERE payments.payment_id = t.payment_id
+      AND t.last_refund_id > COALESCE(payments.settled_refund_id, 0)
+"""
+
+
+@dataclass
+class SettlementResult:
+    batches: int = 0
+    payments: int = 0
+    seconds: float = 0.0
+
+
+class RefundLedger:
+    """
+    RefundLedger Class
+
+    Appends refunds to the REFUNDS ledger and settles them onto PAYMENTS.
+    """
+    @staticmethod
+    def enqueue(cursor, payment_id, amount, booking_id=None, reason="CANCELLED", created_at=None):
+        """
+        Appends a refund to the ledger on the caller's transaction.
+
+        The row is only inserted if the payment exists; this costs a single
+        statement and does not read or lock the payment row.
+
+        Args:
+            cursor: Cursor of the caller's connection; the caller commits.
+            payment_id (int): The refunded payment.
+            amount (float): The amount refunded.
+            booking_id (int): The booking the refund belongs to, if any.
+            reason (str): Why the refund was issued (the cancellation status).
+            created_at (datetime): When the refund was issued. Defaults to now.
+
+        Returns:
+            bool: True if the payment exists and the refund was recorded.
+        """
+        cursor.execute(
+            """
+            INSERT INTO refunds (payment_id, booking_id, amount, reason, created_at)
+            SELECT payment_id, %s, %s, %s, %s FROM payments WHERE payment_id = %s
+            """,
+            (booking_id, amount, reason, created_at or datetime.now(), payment_id),
+            name="refund.enqueue"
+        )
+        return cursor.rowcount > 0
+
+    @staticmethod
+    def settle_batch(after_payment_id=0, batch_size=REFUND_BATCH_SIZE):
+        """
+        Settles the next batch of payments that have unsettled refunds.
+
+        Args:
+            after_payment_id (int): Only payments with a higher id are considered.
+            batch_size (int): Most payments settled in this batch.
+
+        Returns:
+            tuple: (payments settled, highest payment id seen, or None if nothing was pending).
+        """
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(PENDING_PAYMENTS, (after_payment_id, batch_size), name="refund.pending_payments")
+                payment_ids = [row[0] for row in cursor.fetchall()]
+                if not payment_ids:
+                    return 0, None
+                cursor.execute(
+                    SETTLE_PAYMENTS.format(placeholders=", ".join(["%s"] * len(payment_ids))),
+                    payment_ids,
+                    name="refund.settle"
+                )
+                settled = cursor.rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        return settled, payment_ids[-1]
+
+    @staticmethod
+    def settle(batch_size=REFUND_BATCH_SIZE):
+        """
+        Settles every refund pending when the run started, batch by batch.
+
+        Payments are walked in id order, so refunds appended during the run
+        are settled by the next run rather than extending this one.
+
+        Args:
+            batch_size (int): Payments per batch (and per commit).
+
+        Returns:
+            SettlementResult: Batches committed and payments settled.
+        """
+        result = SettlementResult()
+        started = time.perf_counter()
+        after = 0
+        while True:
+            settled, after = RefundLedger.settle_batch(after, batch_size)
+            if after is None:
+                break
+            result.batches += 1
+            result.payments += settled
+        result.seconds = round(time.perf_counter() - started, 3)
+        if result.payments:
+            logger.info(f"Settled refunds for {result.payments} payments in {result.batches} batches")
+        return result
+
+    @staticmethod
+    def pending():
+        """
+        Summarizes the unsettled part of the ledger.
+
+        Returns:
+            dict: Unsettled refund rows, the payments they touch and their total amount.
+        """
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT COUNT(*), COUNT(DISTINCT r.payment_id), COALESCE(SUM(r.amount), 0)
+                FROM refunds r
+                JOIN payments p ON p.payment_id = r.payment_id
+                WHERE r.refund_id > COALESCE(p.settled_refund_id, 0)
+                """,
+                name="refund.pending_summary"
+            )
+            refunds, payments, amount = cursor.fetchone()
+            cursor.close()
+        return {"refunds": refunds, "payments": payments, "amount": round(float(amount), 2)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Settle queued refunds onto their payments.")
+    parser.add_argument("--batch-size", type=int, default=REFUND_BATCH_SIZE, help="Payments per batch and commit.")
+    parser.add_argument("--every", type=float, default=None, help="Keep running, settling every N seconds.")
+    parser.add_argument("--pending", action="store_true", help="Only show the unsettled refunds.")
+    args = parser.parse_args(argv)
+
+    setup_logger()
+    if args.pending:
+        pending = RefundLedger.pending()
+        print(f"{pending['refunds']} refunds pending on {pending['payments']} payments, total ${pending['amount']}.")
+        return
+    while True:
+        result = RefundLedger.settle(args.batch_size)
+        print(f"Settled {result.payments} payments in {result.batches} batches ({result.seconds}s).")
+        if args.every is None:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,426 @@
+"""
+Daily Revenue and Occupancy Rollups
+
+DAILY_ROLLUPS keeps one row per (day, room type) with four counters:
+
+- ROOM_NIGHTS: nights of that day held by bookings (confirmed, or partially
+  cancelled up to their new check-out), as in the availability index
+- REVENUE: each booking's TOTAL_AMOUNT spread evenly over its nights; a fully
+  cancelled booking keeps its retained half on its original nights
+- REFUNDS: refunds appended to the REFUNDS ledger that day
+- CANCELLATIONS: full and partial cancellations made that day
+
+Room nights and revenue are keyed by the night of the stay. Refunds and
+cancellations are keyed by the day they happened.
+
+Bookings, cancellations and refunds add their changes to the rows they touch
+in their own transaction (one statement per event, see
+``StorageBackend.add_to_counters``). A report therefore reads one row per day
+and room type, however many bookings there are. ADR, RevPAR and occupancy
+are derived from the counters and the rooms in service when the report is
+read.
+
+``reconcile`` rebuilds the counters from BOOKINGS and REFUNDS and lists (or
+corrects) every row that differs.
+
+Usage:
+    python -m modules.rollups report --from 2026-10-01 --to 2026-10-31 [--type Deluxe]
+    python -m modules.rollups reconcile [--from 2026-10-01 --to 2026-10-31] [--fix]
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Optional
+from config.db_config import get_backend, get_connection
+from modules.availability import stay_range, to_date
+from modules.room_cache import room_cache
+from utils.logger import get_logger, setup_logger
+
+logger = get_logger(__name__)
+
+ROLLUP_KEYS = ("stay_date", "room_type")
+ROLLUP_COLUMNS = ("room_nights", "revenue", "refunds", "cancellations")
+UNKNOWN_ROOM_TYPE = "UNKNOWN"
+# Revenue is spread over nights as floats; smaller differences are rounding.
+RECONCILE_TOLERANCE = 0.005
+RECONCILE_FETCH_SIZE = 5000
+
+RECONCILE_BOOKINGS = """
+    SELECT room_id, check_in, check_out, total_amount, status, cancellation_status, cancellation_timestamp
+    FROM bookings
+"""
+
+RECONCILE_REFUNDS = """
+    SELECT p.room_id, r.amount, r.created_at
+    FROM refunds r
+    JOIN payments p ON p.payment_id = r.payment_id
+"""
+
+
+@dataclass
+class DailyRollup:
+    day: Optional[date]
+    room_type: str
+    rooms: int
+    room_nights: int
+    revenue: float
+    refunds: float
+    cancellations: int
+
+    @property
+    def occupancy(self):
+        """Percentage of the rooms in service that were sold."""
+        return round(100.0 * self.room_nights / self.rooms, 2) if self.rooms else 0.0
+
+    @property
+    def adr(self):
+        """Average daily rate: revenue per room night sold."""
+        return round(self.revenue / self.room_nights, 2) if self.room_nights else 0.0
+
+    @property
+    def revpar(self):
+        """Revenue per available room (rooms in service, per night)."""
+        return round(self.revenue / self.rooms, 2) if self.rooms else 0.0
+
+
+@dataclass
+class ReconcileResult:
+    rows: int = 0
+    mismatches: list = field(default_factory=list)
+    fixed: bool = False
+    seconds: float = 0.0
+
+
+def day_of(value):
+    """Returns the date of a DATE or TIMESTAMP value (SQLite returns both as text)."""
+    if isinstance(value, (date, datetime)):
+        return to_date(value)
+    return to_date(str(value)[:10])
+
+
+class RollupDelta:
+    """
+    Changes to DAILY_ROLLUPS, summed per (day, room type) before they are written.
+
+    The incremental updates and ``reconcile`` both go through this class, so
+    a booking is attributed to days the same way on both paths.
+    """
+    def __init__(self):
+        self.rows = {}
+
+    def stay(self, room_type, check_in, check_out, total_amount, holds_nights=True, sign=1):
+        """
+        Spreads a booking over the nights of [check_in, check_out).
+
+        Args:
+            room_type (str): Type of the booked room.
+            check_in (date): First night.
+            check_out (date): Departure date; a same-day stay is one night.
+            total_amount (float): The booking's total, split evenly over its nights.
+            holds_nights (bool): Whether the booking still holds its nights.
+            sign (int): 1 to add the booking, -1 to take it back out.
+        """
+        check_in, check_out = stay_range(check_in, check_out)
+        nights = (check_out - check_in).days
+        per_night = float(total_amount) / nights
+        for offset in range(nights):
+            row = self.counters(check_in + timedelta(days=offset), room_type)
+            if holds_nights:
+                row[0] += sign
+            row[1] += sign * per_night
+
+    def cancellation(self, room_type, at):
+        """Counts a cancellation made at ``at``."""
+        self.counters(day_of(at), room_type)[3] += 1
+
+    def refund(self, room_type, amount, at):
+        """Adds a refund issued at ``at``."""
+        self.counters(day_of(at), room_type)[2] += float(amount)
+
+    def as_rows(self):
+        """Returns (day, room_type, room_nights, revenue, refunds, cancellations) tuples, skipping no-ops."""
+        return [(day, room_type, *values) for (day, room_type), values in sorted(self.rows.items(), key=str)
+                if any(abs(value) > 1e-9 for value in values)]
+
+    def counters(self, day, room_type):
+        """Returns the mutable [room_nights, revenue, refunds, cancellations] of a day and room type."""
+        key = (day, room_type or UNKNOWN_ROOM_TYPE)
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = [0, 0.0, 0.0, 0]
+        return row
+
+
+class Rollups:
+    """
+    Rollups Class
+
+    Applies booking events to DAILY_ROLLUPS and reads reports back from it.
+    """
+    @staticmethod
+    def room_type(room_id):
+        """
+        Returns the type of a room, or UNKNOWN_ROOM_TYPE if it no longer exists.
+
+        Reads the room cache, whose reload borrows a pooled connection, so
+        callers resolve the type before opening the transaction they pass to
+        ``booked`` or ``cancelled``.
+        """
+        room = room_cache.get(room_id)
+        return room[1] if room and room[1] else UNKNOWN_ROOM_TYPE
+
+    @staticmethod
+    def apply(cursor, delta):
+        """
+        Adds a delta to DAILY_ROLLUPS on the caller's transaction.
+
+        Args:
+            cursor: Cursor of the caller's connection; the caller commits.
+            delta (RollupDelta): The changes to add.
+        """
+        get_backend().add_to_counters(
+            cursor, "daily_rollups", ROLLUP_KEYS, ROLLUP_COLUMNS, delta.as_rows(), name="rollups.apply"
+        )
+
+    @staticmethod
+    def booked(cursor, room_type, check_in, check_out, total_amount):
+        """Records a new booking of a room of type ``room_type``."""
+        delta = RollupDelta()
+        delta.stay(room_type, check_in, check_out, total_amount)
+        Rollups.apply(cursor, delta)
+
+    @staticmethod
+    def cancelled(cursor, booking, room_type, new_total_amount, refund_amount, at, new_check_out=None):
+        """
+        Records a full or partial cancellation and its refund.
+
+        Args:
+            cursor: Cursor of the caller's connection; the caller commits.
+            booking (BookingRecord): The booking as it was before the cancellation.
+            room_type (str): Type of the booked room (see ``room_type``).
+            new_total_amount (float): The total the booking keeps.
+            refund_amount (float): The refund appended to the ledger.
+            at (datetime): When the cancellation was made.
+            new_check_out (date): The new check-out of a partial cancellation;
+                None for a full cancellation.
+        """
+        delta = RollupDelta()
+        delta.stay(room_type, booking.check_in, booking.check_out, booking.total_amount, sign=-1)
+        if new_check_out is None:
+            delta.stay(room_type, booking.check_in, booking.check_out, new_total_amount, holds_nights=False)
+        else:
+            delta.stay(room_type, booking.check_in, new_check_out, new_total_amount)
+        delta.cancellation(room_type, at)
+        delta.refund(room_type, refund_amount, at)
+        Rollups.apply(cursor, delta)
+
+    @staticmethod
+    def refunded(cursor, payment_id, amount, at):
+        """Records a refund of a payment that is not tied to a cancellation."""
+        # The room type is read on the caller's transaction, not from the room cache.
+        cursor.execute(
+            "SELECT r.room_type FROM payments p LEFT JOIN rooms r ON r.room_id = p.room_id "
+            "WHERE p.payment_id = %s",
+            (payment_id,), name="rollups.payment_room"
+        )
+        row = cursor.fetchone()
+        delta = RollupDelta()
+        delta.refund(row[0] if row and row[0] else UNKNOWN_ROOM_TYPE, amount, at)
+        Rollups.apply(cursor, delta)
+
+    @staticmethod
+    def report(first_day, last_day, room_type=None):
+        """
+        Reads the daily rollups of a date range.
+
+        Reads one row per day and room type, through the query cache; missing
+        rows are days with no activity and are reported as zeros for every
+        room type in service.
+
+        Args:
+            first_day (date): First day, inclusive.
+            last_day (date): Last day, inclusive.
+            room_type (str): Only this room type; None for all.
+
+        Returns:
+            list: DailyRollup per day and room type, ordered by day then type.
+        """
+        rooms = {}
+        for room in room_cache.available_rooms():
+            rooms[room[1] or UNKNOWN_ROOM_TYPE] = rooms.get(room[1] or UNKNOWN_ROOM_TYPE, 0) + 1
+        sql = f"SELECT {', '.join(ROLLUP_KEYS + ROLLUP_COLUMNS)} FROM daily_rollups WHERE stay_date BETWEEN %s AND %s"
+        params = [first_day, last_day]
+        if room_type is not None:
+            sql += " AND room_type = %s"
+            params.append(room_type)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params, name="rollups.report", cache=True)
+            stored = {(day_of(row[0]), row[1]): row[2:] for row in cursor.fetchall()}
+            cursor.close()
+
+        types = {room_type} if room_type is not None else set(rooms) | {key[1] for key in stored}
+        rollups = []
+        day = first_day
+        while day <= last_day:
+            for name in sorted(types, key=str):
+                nights, revenue, refunds, cancellations = stored.get((day, name), (0, 0.0, 0.0, 0))
+                rollups.append(DailyRollup(day, name, rooms.get(name, 0), int(nights), round(float(revenue), 2),
+                                           round(float(refunds), 2), int(cancellations)))
+            day += timedelta(days=1)
+        return rollups
+
+    @staticmethod
+    def total(rollups, room_type="ALL"):
+        """
+        Sums daily rollups into one period figure.
+
+        Rooms are summed too, so occupancy and RevPAR are per available room-night.
+
+        Returns:
+            DailyRollup: The totals, with ``day`` set to None.
+        """
+        return DailyRollup(
+            None, room_type,
+            sum(r.rooms for r in rollups), sum(r.room_nights for r in rollups),
+            round(sum(r.revenue for r in rollups), 2), round(sum(r.refunds for r in rollups), 2),
+            sum(r.cancellations for r in rollups)
+        )
+
+    @staticmethod
+    def rebuild():
+        """
+        Recomputes every rollup from BOOKINGS and REFUNDS.
+
+        Both tables are streamed; only the per-day totals are kept in memory.
+
+        Returns:
+            RollupDelta: The expected contents of DAILY_ROLLUPS.
+        """
+        rooms = {room[0]: room[1] for room in room_cache.all_rooms()}
+        delta = RollupDelta()
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(RECONCILE_BOOKINGS, name="rollups.reconcile_bookings")
+            while True:
+                rows = cursor.fetchmany(RECONCILE_FETCH_SIZE)
+                if not rows:
+                    break
+                for room_id, check_in, check_out, total, status, cancellation_status, cancelled_at in rows:
+                    room_type = rooms.get(room_id)
+                    holds_nights = status == 'CONFIRMED' or cancellation_status == 'PARTIAL CANCELLED'
+                    delta.stay(room_type, day_of(check_in), day_of(check_out), total or 0, holds_nights)
+                    if status != 'CONFIRMED' and cancelled_at is not None:
+                        delta.cancellation(room_type, cancelled_at)
+            cursor.execute(RECONCILE_REFUNDS, name="rollups.reconcile_refunds")
+            while True:
+                rows = cursor.fetchmany(RECONCILE_FETCH_SIZE)
+                if not rows:
+                    break
+                for room_id, amount, created_at in rows:
+                    delta.refund(rooms.get(room_id), amount, created_at)
+            cursor.close()
+        return delta
+
+    @staticmethod
+    def reconcile(first_day=None, last_day=None, fix=False):
+        """
+        Compares DAILY_ROLLUPS with a rebuild from the base tables.
+
+        Args:
+            first_day (date): First day checked; None for no lower bound.
+            last_day (date): Last day checked; None for no upper bound.
+            fix (bool): Add the difference to every mismatched row, in one transaction.
+
+        Returns:
+            ReconcileResult: Rows compared and (day, room_type, column, stored, expected) mismatches.
+        """
+        start = time.perf_counter()
+        expected = Rollups.rebuild().rows
+
+        def in_range(day):
+            return (first_day is None or day >= first_day) and (last_day is None or day <= last_day)
+
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {', '.join(ROLLUP_KEYS + ROLLUP_COLUMNS)} FROM daily_rollups",
+                           name="rollups.reconcile_stored")
+            stored = {}
+            for row in cursor.fetchall():
+                key = (day_of(row[0]), row[1])
+                stored[key] = [float(value or 0) for value in row[2:]]
+            cursor.close()
+
+        result = ReconcileResult()
+        correction = RollupDelta()
+        for key in sorted(set(expected) | set(stored), key=str):
+            if not in_range(key[0]):
+                continue
+            result.rows += 1
+            want = expected.get(key, [0, 0.0, 0.0, 0])
+            have = stored.get(key, [0, 0.0, 0.0, 0])
+            for index, column in enumerate(ROLLUP_COLUMNS):
+                if abs(want[index] - have[index]) > RECONCILE_TOLERANCE:
+                    result.mismatches.append((key[0], key[1], column, round(have[index], 2), round(want[index], 2)))
+                    correction.counters(*key)[index] = want[index] - have[index]
+
+        if fix and result.mismatches:
+            with get_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    Rollups.apply(cursor, correction)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            result.fixed = True
+        result.seconds = time.perf_counter() - start
+        logger.info(f"Reconciled {result.rows} rollup rows: {len(result.mismatches)} mismatches"
+                    f"{', fixed' if result.fixed else ''}.")
+        return result
+
+
+def print_report(rollups, total):
+    print(f"{'day':<10} {'room_type':<12} {'rooms':>5} {'nights':>6} {'occ%':>6} {'revenue':>11} "
+          f"{'ADR':>8} {'RevPAR':>8} {'refunds':>10} {'cancels':>7}")
+    for r in rollups + [total]:
+        print(f"{str(r.day or 'TOTAL'):<10} {str(r.room_type):<12} {r.rooms:>5} {r.room_nights:>6} "
+              f"{r.occupancy:>6.1f} {r.revenue:>11.2f} {r.adr:>8.2f} {r.revpar:>8.2f} {r.refunds:>10.2f} "
+              f"{r.cancellations:>7}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily revenue and occupancy rollups.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    report = commands.add_parser("report", help="Show ADR, RevPAR and occupancy per day and room type.")
+    report.add_argument("--from", dest="from_date", type=to_date, default=None, help="First day (default: today).")
+    report.add_argument("--to", dest="to_date", type=to_date, default=None, help="Last day (default: --from + 6).")
+    report.add_argument("--type", dest="room_type", default=None, help="Only this room type.")
+    reconcile = commands.add_parser("reconcile", help="Rebuild the rollups from the base tables and compare.")
+    reconcile.add_argument("--from", dest="from_date", type=to_date, default=None, help="First day checked.")
+    reconcile.add_argument("--to", dest="to_date", type=to_date, default=None, help="Last day checked.")
+    reconcile.add_argument("--fix", action="store_true", help="Correct the mismatched rows.")
+    args = parser.parse_args(argv)
+    setup_logger()
+
+    if args.command == "report":
+        from_date = args.from_date or date.today()
+        last_day = args.to_date or from_date + timedelta(days=6)
+        rollups = Rollups.report(from_date, last_day, args.room_type)
+        print_report(rollups, Rollups.total(rollups, args.room_type or "ALL"))
+        return 0
+
+    result = Rollups.reconcile(args.from_date, args.to_date, args.fix)
+    for day, room_type, column, stored, expected in result.mismatches:
+        print(f"{day} {room_type}: {column} is {stored}, expected {expected}")
+    print(f"{result.rows} rows checked, {len(result.mismatches)} mismatches"
+          f"{' (fixed)' if result.fixed else ''} in {result.seconds:.2f}s")
+    return 1 if result.mismatches and not result.fixed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
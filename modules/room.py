@@ -1,6 +1,9 @@
-from config.db_config import get_connection
-from utils.logger import setup_logger
-logger = setup_logger()
+from datetime import date, timedelta
+from modules.room_index import room_index
+from modules.service import HotelService, SearchRequest
+from utils.exceptions import ValidationError
+from utils.logger import get_logger
+logger = get_logger(__name__)
 
 
 class Room:
@@ -11,42 +14,71 @@ class Room:
         self.is_available = is_available
 
     @staticmethod
-    def fetch_rooms_from_db():
+    def fetch_rooms_from_db(check_in=None, check_out=None, room_type=None, max_price=None):
         """
-        Fetches and displays available rooms from the database.
+        Fetches and displays rooms that are free for a stay.
 
-        This method connects to the database, retrieves all available rooms,
-        and prints their details.
+        Rooms come from ``HotelService.search_rooms``, which serves them from the
+        room search index filtered through the availability index, so no database
+        query is needed.
+
+        Args:
+            check_in (date, optional): First night of the stay. Defaults to today.
+            check_out (date, optional): Departure date. Defaults to the day after check-in.
+            room_type (str, optional): Only show rooms of this type.
+            max_price (float, optional): Only show rooms up to this price per night.
 
         Returns:
             None
         """
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM rooms WHERE is_available = True")
-        logger.info("Fetched available rooms from the database.")
+        check_in = check_in or date.today()
+        check_out = check_out or check_in + timedelta(days=1)
+        try:
+            rooms = HotelService.search_rooms(SearchRequest(room_type, check_in, check_out, max_price))
+        except ValidationError as e:
+            print(e)
+            return
+        logger.info(f"Fetched {len(rooms)} rooms free from {check_in} to {check_out}.")
         print('\n')
+        print(f"Rooms free from {check_in} to {check_out}, cheapest first")
         print("room_id roomType price Availability")
-        data= cursor.fetchall()
-        for i in data:
-            print(i)
+        for room in rooms:
+            print((room.room_id, room.room_type, room.price, room.is_available))
+
+    @staticmethod
+    def prompt_filters():
+        """
+        Asks for an optional room type and nightly price ceiling.
+
+        Returns:
+            tuple: (room_type or None, max_price or None).
+        """
+        types = room_index.room_types()
+        room_type = input(f"Room type ({', '.join(map(str, types))}; blank for any): ").strip() or None
+        while room_type is not None and room_type not in types:
+            print("Unknown room type.")
+            room_type = input("Room type (blank for any): ").strip() or None
+        while True:
+            max_price = input("Maximum price per night (blank for no limit): ").strip()
+            if not max_price:
+                return room_type, None
+            try:
+                return room_type, float(max_price)
+            except ValueError:
+                print("Invalid input! Please enter a valid amount.")
 
 
     @staticmethod
-    def fetch_rooms():
+    def fetch_rooms(check_in=None, check_out=None):
         """
-        Fetches available rooms from the database.
+        Fetches rooms that are free for a stay.
 
-        This method connects to the database and returns a list of all available rooms.
+        Args:
+            check_in (date, optional): First night of the stay. Defaults to today.
+            check_out (date, optional): Departure date. Defaults to the day after check-in.
 
         Returns:
-            list: A list of tuples, each representing an available room.
+            list: A list of tuples, each representing a free room.
         """
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM rooms WHERE is_available = True")
-        l=[]
-        data= cursor.fetchall()
-        for i in data:
-            l.append(i)
-        return l
+        rooms = HotelService.list_rooms(check_in, check_out)
+        return [(room.room_id, room.room_type, room.price, room.is_available) for room in rooms]
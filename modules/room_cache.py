@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from config.db_config import get_connection
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RoomCache:
+    """
+    RoomCache Class
+
+    In-process copy of the ROOMS table keyed by room_id. The table is small and
+    changes rarely, so it is loaded with a single query and then served from
+    memory until its TTL runs out. Writes made by this process to
+    ``is_available`` (whether a room is in service) are applied to the cache
+    right after they commit, and every change bumps ``version`` so callers can
+    tell whether what they read earlier is still current.
+    """
+    def __init__(self, ttl=None):
+        """
+        Args:
+            ttl (float): Seconds before the cache is reloaded from the database.
+                Defaults to the ROOM_CACHE_TTL environment variable, then 300.
+        """
+        self.ttl = float(os.getenv("ROOM_CACHE_TTL", "300")) if ttl is None else ttl
+        self.version = 0
+        self._rooms = {}
+        self._loaded_at = None
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.loads = 0
+
+    @staticmethod
+    def key(room_id):
+        """Normalizes a room id typed by a user ('101') to the stored form (101)."""
+        try:
+            return int(room_id)
+        except (TypeError, ValueError):
+            return room_id
+
+    def get(self, room_id):
+        """
+        Returns the cached ROOMS row for a room.
+
+        Args:
+            room_id (int | str): ID of the room.
+
+        Returns:
+            tuple: (room_id, room_type, price, is_available), or None if the room does not exist.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            return self._rooms.get(RoomCache.key(room_id))
+
+    def price(self, room_id):
+        """
+        Returns the nightly price of a room.
+
+        Args:
+            room_id (int | str): ID of the room.
+
+        Returns:
+            float: The price, or None if the room does not exist.
+        """
+        room = self.get(room_id)
+        return room[2] if room else None
+
+    def available_rooms(self):
+        """
+        Returns every room currently flagged as available, ordered by room_id.
+
+        Returns:
+            list: A list of (room_id, room_type, price, is_available) tuples.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            return [room for _, room in sorted(self._rooms.items()) if room[3]]
+
+    def all_rooms(self):
+        """Returns every cached room row, ordered by room_id."""
+        with self._lock:
+            self._ensure_fresh()
+            return [room for _, room in sorted(self._rooms.items())]
+
+    def current_version(self):
+        """Returns ``version`` after reloading the cache if its TTL ran out."""
+        with self._lock:
+            self._ensure_fresh()
+            return self.version
+
+    def set_availability(self, room_id, is_available):
+        """
+        Write-through update after ``rooms.is_available`` has been committed.
+
+        Args:
+            room_id (int | str): ID of the room that changed.
+            is_available (bool): The committed availability flag.
+        """
+        with self._lock:
+            key = RoomCache.key(room_id)
+            room = self._rooms.get(key)
+            if room is None:
+                # Unknown to us: drop everything rather than guess the row.
+                self.invalidate()
+                return
+            self._rooms[key] = (room[0], room[1], room[2], bool(is_available))
+            self.version += 1
+
+    def snapshot(self):
+        """Returns the cached rows as JSON-serializable state for ``restore``."""
+        with self._lock:
+            self._ensure_fresh()
+            return {"rooms": [list(room) for _, room in sorted(self._rooms.items())]}
+
+    def restore(self, state):
+        """
+        Replaces the cache with a ``snapshot`` instead of querying ROOMS.
+
+        The restored rows count as freshly loaded until ``ttl`` runs out.
+        """
+        with self._lock:
+            self._rooms = {row[0]: (row[0], row[1], row[2], bool(row[3])) for row in state["rooms"]}
+            self._loaded_at = time.monotonic()
+            self.version += 1
+
+    def apply_event(self, event):
+        """Applies a journalled ``room_availability_changed`` event (see ``modules.events``)."""
+        if event.get("type") == "room_availability_changed":
+            self.set_availability(event["room_id"], event["is_available"])
+
+    def invalidate(self):
+        """Forces the next read to reload ROOMS from the database."""
+        with self._lock:
+            self._loaded_at = None
+            self.version += 1
+
+    def stats(self):
+        """Returns cache counters: version, rooms, hits, loads."""
+        with self._lock:
+            return {"version": self.version, "rooms": len(self._rooms), "hits": self.hits, "loads": self.loads}
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if self._loaded_at is not None and now - self._loaded_at < self.ttl:
+            self.hits += 1
+            return
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT room_id, room_type, price, is_available FROM rooms", name="room_cache.load")
+            rows = cursor.fetchall()
+            cursor.close()
+        self._rooms = {row[0]: (row[0], row[1], row[2], bool(row[3])) for row in rows}
+        self._loaded_at = now
+        self.loads += 1
+        self.version += 1
+        logger.info(f"Room cache loaded {len(rows)} rooms (version {self.version}).")
+
+
+room_cache = RoomCache()
@@ -0,0 +1,178 @@
+import threading
+from datetime import date
+import numpy as np
+from config.db_config import get_connection
+from modules.availability import availability_index, stay_range
+from modules.room_cache import room_cache
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bookings that hold a night of [check_in, check_out): active rows as in
+# availability.ACTIVE_BOOKINGS_SQL, with a same-day booking holding its check-in night.
+SEARCH_SQL = """
+    SELECT r.room_id, r.room_type, r.price, r.is_available
+    FROM rooms r
+    WHERE r.is_available = TRUE {filters}
+      AND NOT EXISTS (
+          SELECT 1 FROM bookings b
+          WHERE b.room_id = r.room_id
+            AND (b.status = 'CONFIRMED' OR b.cancellation_status = 'PARTIAL CANCELLED')
+            AND b.check_in < %s
+            AND (b.check_out > %s OR (b.check_out = b.check_in AND b.check_in >= %s))
+      )
+    ORDER BY r.price, r.room_id
+"""
+
+
+class RoomColumns:
+    """Room ids and prices of one slice of the index, both sorted by (price, room_id)."""
+    def __init__(self, room_ids, prices):
+        self.room_ids = room_ids
+        self.prices = prices
+
+
+class RoomSearchIndex:
+    """
+    RoomSearchIndex Class
+
+    Columnar, in-memory copy of the rooms in service, for searches such as
+    "Deluxe rooms free from the 3rd to the 6th under $250, cheapest first".
+
+    Room ids and prices are kept as NumPy arrays sorted by (price, room_id),
+    once for all rooms and once per room type. A price ceiling is then a
+    binary search giving a prefix of the arrays. Everything in that prefix
+    already matches type and price and is in price order. Only those
+    candidates are checked against the availability index, in price order
+    and in blocks, so a search with a ``limit`` stops as soon as it has
+    enough free rooms.
+
+    The columns are rebuilt whenever the room cache's ``version`` changes,
+    i.e. on a reload or a room taken in or out of service.
+    """
+    def __init__(self):
+        self.version = None
+        self._all = RoomColumns(np.zeros(0, dtype=np.int64), np.zeros(0))
+        self._by_type = {}   # room_type -> RoomColumns
+        self._names = {}     # room_id -> room_type
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def search(self, room_type=None, check_in=None, check_out=None, max_price=None, limit=None, exclude=None):
+        """
+        Finds rooms free for a stay, cheapest first.
+
+        Args:
+            room_type (str): Only rooms of this type; None for any type.
+            check_in (date): First night of the stay. Defaults to today.
+            check_out (date): Departure date. Defaults to check-in (one night).
+            max_price (float): Highest nightly ROOMS.PRICE; None for no ceiling.
+            limit (int): Most rooms returned; None for all.
+            exclude (set): Room IDs to leave out, such as rooms held during checkout.
+
+        Returns:
+            list: (room_id, room_type, price, is_available) tuples ordered by price, then room_id.
+        """
+        columns, names = self._columns(room_type)
+        if columns is None or columns.room_ids.size == 0:
+            return []
+        end = len(columns.prices) if max_price is None else int(
+            np.searchsorted(columns.prices, float(max_price), side="right"))
+        room_ids = columns.room_ids[:end]
+        prices = columns.prices[:end]
+
+        check_in = check_in or date.today()
+        check_in, check_out = stay_range(check_in, check_out or check_in)
+        wanted = len(room_ids) if limit is None else int(limit)
+        block = len(room_ids) if limit is None else max(4 * wanted, 256)
+        found = []
+        for start in range(0, len(room_ids), max(block, 1)):
+            candidates = room_ids[start:start + block].tolist()
+            free = set(availability_index.free_rooms(candidates, check_in, check_out))
+            for offset, room_id in enumerate(candidates):
+                if room_id in free and not (exclude and room_id in exclude):
+                    found.append((room_id, names[room_id], float(prices[start + offset]), True))
+                    if len(found) >= wanted:
+                        return found
+        return found
+
+    @staticmethod
+    def search_sql(room_type=None, check_in=None, check_out=None, max_price=None, limit=None):
+        """
+        The same search answered by the database, without the index.
+
+        Used as the reference (and fallback) the index is benchmarked against.
+
+        Returns:
+            list: Rows in the same shape and order as ``search``.
+        """
+        check_in = check_in or date.today()
+        check_in, check_out = stay_range(check_in, check_out or check_in)
+        filters, params = [], []
+        if room_type is not None:
+            filters.append("AND r.room_type = %s")
+            params.append(room_type)
+        if max_price is not None:
+            filters.append("AND r.price <= %s")
+            params.append(float(max_price))
+        sql = SEARCH_SQL.format(filters=" ".join(filters))
+        params += [check_out, check_in, check_in]
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(int(limit))
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params, name="room_search.sql")
+            rows = cursor.fetchall()
+            cursor.close()
+        return [(row[0], row[1], float(row[2]), bool(row[3])) for row in rows]
+
+    def room_types(self):
+        """Returns the room types in service, sorted."""
+        self._columns(None)
+        return sorted(self._by_type, key=str)
+
+    def stats(self):
+        """Returns the indexed room count, types, column memory and build count."""
+        with self._lock:
+            arrays = [self._all] + list(self._by_type.values())
+            return {
+                "version": self.version,
+                "rooms": len(self._all.room_ids),
+                "room_types": len(self._by_type),
+                "bytes": sum(c.room_ids.nbytes + c.prices.nbytes for c in arrays),
+                "builds": self.builds,
+            }
+
+    def _columns(self, room_type):
+        version = room_cache.current_version()
+        with self._lock:
+            if version != self.version:
+                self._build(room_cache.available_rooms(), version)
+            columns = self._all if room_type is None else self._by_type.get(room_type)
+            return columns, self._names
+
+    def _build(self, rooms, version):
+        room_ids = np.fromiter((room[0] for room in rooms), dtype=np.int64, count=len(rooms))
+        prices = np.fromiter((room[2] for room in rooms), dtype=np.float64, count=len(rooms))
+        types = [room[1] for room in rooms]
+        order = np.lexsort((room_ids, prices))
+        room_ids, prices = room_ids[order], prices[order]
+        types = [types[i] for i in order.tolist()]
+        self._names = {room[0]: room[1] for room in rooms}
+        self._all = RoomColumns(room_ids, prices)
+        positions_by_type = {}
+        for position, room_type in enumerate(types):
+            positions_by_type.setdefault(room_type, []).append(position)
+        # Positions are taken in price order, so each type's columns stay sorted.
+        self._by_type = {}
+        for room_type, positions in positions_by_type.items():
+            positions = np.array(positions, dtype=np.intp)
+            self._by_type[room_type] = RoomColumns(room_ids[positions], prices[positions])
+        self.version = version
+        self.builds += 1
+        logger.info(f"Built room search index: {len(rooms)} rooms, {len(self._by_type)} types")
+
+
+# Process-wide index used by HotelService.
+room_index = RoomSearchIndex()
@@ -0,0 +1,1121 @@
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+from config.db_config import get_backend, get_connection
+from modules.availability import availability_index, normalize_id, stay_range, to_date
+from modules.email import Email
+from modules.email_filter import email_filter
+from modules.events import (
+    BOOKING_CANCELLED,
+    BOOKING_CREATED,
+    BOOKING_SHORTENED,
+    PAYMENT_RECORDED,
+    REFUND_QUEUED,
+    ROOM_AVAILABILITY_CHANGED,
+    event_log,
+)
+from modules.holds import hold_table
+from modules.rates import rate_engine
+from modules.refunds import RefundLedger
+from modules.rollups import Rollups
+from modules.room_cache import room_cache
+from modules.room_index import room_index
+from modules.session import session_store
+from utils import validators
+from utils.exceptions import (
+    BookingConflictError,
+    BookingError,
+    InvalidCredentialsError,
+    InvalidSessionError,
+    NotFoundError,
+    RegistrationError,
+    ValidationError,
+)
+from utils.locks import LockTimeout, StripedLock
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Payment and booking rows are both produced from the room row, so the in-service
+# check and the base price the quote was computed from are checked inside the
+# insert itself. Snowflake writes both tables with one atomic INSERT ALL statement.
+BOOK_AND_PAY_INSERT_ALL = """
+    INSERT ALL
+        INTO payments (payment_id, room_id, amount, payment_date, isRefund)
+            VALUES (new_payment_id, room_id, paid_amount, paid_at, is_refund)
+        INTO bookings (booking_id, payment_id, room_id, customer_id, check_in, check_out, total_amount)
+            VALUES (new_booking_id, new_payment_id, room_id, new_customer_id, new_check_in, new_check_out, new_total_amount)
+    SELECT %s AS new_payment_id, %s AS new_booking_id, room_id, %s AS paid_amount, %s AS paid_at,
+           FALSE AS is_refund, %s AS new_customer_id, %s AS new_check_in, %s AS new_check_out,
+           %s AS new_total_amount
+    FROM rooms
+    WHERE room_id = %s AND is_available = TRUE AND price = %s
+"""
+
+BOOK_AND_PAY_PAYMENT = """
+    INSERT INTO payments (payment_id, room_id, amount, payment_date, isRefund)
+    SELECT %s, room_id, %s, %s, FALSE
+    FROM rooms
+    WHERE room_id = %s AND is_available = TRUE AND price = %s
+"""
+
+# Optimistic claim on the room, the first write of every booking. It only
+# matches while the room is in service, still at the quoted price and has no
+# active booking holding a night of the stay (the same rule as the room
+# search), and it bumps ROOMS.VERSION. A concurrent booking of the same room
+# must write the same row, so it either waits for this transaction and then
+# sees its booking, or already won, and the claim matches no row.
+CLAIM_ROOM = """
+    UPDATE rooms
+    SET version = version + 1
+    WHERE room_id = %s AND is_available = TRUE AND price = %s
+      AND NOT EXISTS (
+          SELECT 1 FROM bookings b
+          WHERE b.room_id = %s
+            AND (b.status = 'CONFIRMED' OR b.cancellation_status = 'PARTIAL CANCELLED')
+            AND b.check_in < %s
+            AND (b.check_out > %s OR (b.check_out = b.check_in AND b.check_in >= %s))
+      )
+"""
+
+BOOK_AND_PAY_BOOKING = """
+    INSERT INTO bookings (booking_id, payment_id, room_id, customer_id, check_in, check_out, total_amount)
+    SELECT %s, %s, room_id, %s, %s, %s, %s
+    FROM rooms
+    WHERE room_id = %s
+"""
+
+# In-process locks per room: bookings of one room by threads of this process
+# run one at a time; bookings of different rooms do not wait for each other.
+room_locks = StripedLock(int(os.getenv("ROOM_LOCK_STRIPES", "256")))
+ROOM_LOCK_TIMEOUT = float(os.getenv("ROOM_LOCK_TIMEOUT", "2"))
+
+# Longest date range a daily report may cover.
+REPORT_MAX_DAYS = 366
+
+BOOKING_COLUMNS = (
+    "booking_id, payment_id, room_id, customer_id, check_in, check_out, status, "
+    "created_at, total_amount, cancellation_status, cancellation_timestamp"
+)
+
+
+@dataclass
+class RegisterRequest:
+    first_name: str
+    last_name: str
+    email: str
+    password: str
+    phone_number: str
+
+
+@dataclass
+class AuthenticateRequest:
+    email: str
+    password: str
+
+
+@dataclass
+class QuoteRequest:
+    room_id: int
+    check_in: date
+    check_out: date
+    hold_token: Optional[str] = None  # The caller's own hold does not make the room unavailable
+
+
+@dataclass
+class HoldRequest:
+    customer_id: int
+    room_id: int
+    check_in: date
+    check_out: date
+
+
+@dataclass
+class SearchRequest:
+    room_type: Optional[str] = None
+    check_in: Optional[date] = None     # Defaults to today
+    check_out: Optional[date] = None    # Defaults to the day after check-in
+    max_price: Optional[float] = None   # Highest nightly ROOMS.PRICE
+    limit: Optional[int] = None
+
+
+@dataclass
+class BookRequest:
+    customer_id: int
+    room_id: int
+    check_in: date
+    check_out: date
+    paid_amount: Optional[float] = None  # Defaults to the quoted total
+    hold_token: Optional[str] = None     # From ``hold_room``; released once the booking is made
+
+
+@dataclass
+class CancelFullRequest:
+    booking_id: int
+    customer_id: Optional[int] = None  # When set, the booking must belong to this customer
+
+
+@dataclass
+class CancelPartialRequest:
+    booking_id: int
+    new_check_out: date
+    customer_id: Optional[int] = None
+
+
+@dataclass
+class ReportRequest:
+    from_date: date
+    to_date: date
+    room_type: Optional[str] = None
+
+
+@dataclass
+class HistoryRequest:
+    customer_id: int
+    status: Optional[str] = None
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    after_booking_id: int = 0
+    page_size: int = 100
+
+
+@dataclass
+class CustomerProfile:
+    customer_id: int
+    first_name: str
+    last_name: str
+    email: str
+    phone_number: str
+
+    def as_tuple(self):
+        """Returns the row shape ``Customer.login`` has always returned."""
+        return (self.customer_id, self.first_name, self.last_name, self.email, self.phone_number)
+
+
+@dataclass
+class LoginSession:
+    token: str
+    customer: CustomerProfile
+
+
+@dataclass
+class RoomInfo:
+    room_id: int
+    room_type: str
+    price: float
+    is_available: bool
+
+
+@dataclass
+class Quote:
+    room_id: int
+    room_type: str
+    check_in: date
+    check_out: date
+    nights: int
+    nightly_price: float  # Average over the stay, after rate plans
+    total_amount: float
+    available: bool
+    base_price: float     # ROOMS.PRICE the total was computed from
+
+
+@dataclass
+class HoldConfirmation:
+    token: str
+    room_id: int
+    check_in: date
+    check_out: date
+    expires_in: float  # Seconds
+
+
+@dataclass
+class BookingConfirmation:
+    booking_id: int
+    payment_id: int
+    customer_id: int
+    room_id: int
+    check_in: date
+    check_out: date
+    nights: int
+    total_amount: float
+    paid_amount: float
+
+
+@dataclass
+class CancellationResult:
+    booking_id: int
+    customer_id: int
+    cancellation_status: str
+    new_total_amount: float
+    refund_amount: float
+
+
+@dataclass
+class BookingRecord:
+    booking_id: int
+    payment_id: int
+    room_id: int
+    customer_id: int
+    check_in: date
+    check_out: date
+    status: str
+    created_at: datetime
+    total_amount: float
+    cancellation_status: str
+    cancellation_timestamp: Optional[datetime]
+
+    @property
+    def nights(self):
+        return max((self.check_out - self.check_in).days, 1)
+
+
+@dataclass
+class HistoryPage:
+    records: list
+    next_after_booking_id: Optional[int]
+
+
+class HotelService:
+    """
+    HotelService Class
+
+    Non-interactive API over the booking system. Every operation takes a typed
+    request object, returns a typed response and reports failures by raising
+    the exceptions in ``utils.exceptions``; nothing here reads stdin or prints,
+    so the same calls serve the terminal menu, load tests and other front ends.
+    """
+    @staticmethod
+    def register(request):
+        """
+        Validates and stores a new customer, then sends the confirmation email.
+
+        Args:
+            request (RegisterRequest): The customer's details.
+
+        Returns:
+            CustomerProfile: The stored customer.
+
+        Raises:
+            ValidationError: If a field is malformed.
+            RegistrationError: If the email is already registered or the insert fails.
+        """
+        first_name = request.first_name.strip()
+        last_name = request.last_name.strip()
+        email = request.email.strip()
+        password = request.password.strip()
+        phone_number = request.phone_number.strip()
+        HotelService.validate_registration(first_name, last_name, email, password, phone_number)
+
+        if HotelService.is_email_registered(email):
+            raise RegistrationError("Email is already registered. Please try logging in.")
+
+        try:
+            with get_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    (customer_id,) = get_backend().next_ids(cursor, "customers")
+                    cursor.execute(
+                        """
+                        INSERT INTO customers (customer_id, first_name, last_name, email, password, phone_number)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                        """,
+                        (customer_id, first_name, last_name, email, password, phone_number),
+                        name="register.insert_customer"
+                    )
+                    conn.commit()
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.error(f"Registration failed: {e}")
+            raise RegistrationError("Registration failed.") from e
+        email_filter.add(email, customer_id)
+
+        logger.info(f"Customer {first_name} {last_name} registered successfully.")
+        # Queued to the background outbox; registration does not wait on SMTP.
+        try:
+            available_rooms = [(r.room_id, r.room_type, r.price, r.is_available) for r in HotelService.list_rooms()]
+            Email.send_email(email, (
+                f"Thanks {first_name} {last_name} for registering with us.\n"
+                f"Available Rooms: {available_rooms}"
+            ))
+        except Exception as e:
+            # The account exists; a failed email must not undo the registration.
+            logger.error(f"Could not queue registration email to {email}: {e}")
+        return CustomerProfile(customer_id, first_name, last_name, email, phone_number)
+
+    @staticmethod
+    def validate_registration(first_name, last_name, email, password, phone_number):
+        """
+        Checks every registration field.
+
+        Raises:
+            ValidationError: For the first field that is malformed.
+        """
+        if not validators.is_valid_name(first_name):
+            raise ValidationError("first_name", validators.NAME_RULE)
+        if not validators.is_valid_name(last_name):
+            raise ValidationError("last_name", validators.NAME_RULE)
+        if not validators.is_valid_email(email):
+            raise ValidationError("email", validators.EMAIL_RULE)
+        if not validators.is_valid_password(password):
+            raise ValidationError("password", validators.PASSWORD_RULE)
+        if not validators.is_valid_phone(phone_number):
+            raise ValidationError("phone_number", validators.PHONE_RULE)
+
+    @staticmethod
+    def is_email_registered(email):
+        """
+        Checks if an email is already registered.
+
+        Emails the Bloom filter has never seen are answered without a query;
+        only probable matches are confirmed against CUSTOMERS.
+
+        Args:
+            email (str): The email address to check.
+
+        Returns:
+            bool: True if the email is registered, False otherwise.
+        """
+        if not email_filter.might_be_registered(email):
+            return False
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM customers WHERE email = %s", (email,), name="register.email_exists")
+            count = cursor.fetchone()[0]
+            cursor.close()
+        return count > 0
+
+    @staticmethod
+    def authenticate(request):
+        """
+        Validates an email and password.
+
+        Args:
+            request (AuthenticateRequest): The credentials.
+
+        Returns:
+            CustomerProfile: The matching customer.
+
+        Raises:
+            InvalidCredentialsError: If no customer matches.
+        """
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT customer_id, first_name, last_name, email, phone_number FROM customers WHERE email = %s AND password = %s",
+                (request.email, request.password),
+                name="authenticate.customer"
+            )
+            result = cursor.fetchone()
+            cursor.close()
+        if not result:
+            logger.warning(f"Failed login attempt for email: {request.email}")
+            raise InvalidCredentialsError("Invalid credentials or user not found.")
+        logger.info(f"User {request.email} logged in successfully.")
+        return CustomerProfile(*result)
+
+    @staticmethod
+    def login(request):
+        """
+        Authenticates a customer and opens a session.
+
+        Args:
+            request (AuthenticateRequest): The credentials.
+
+        Returns:
+            LoginSession: The opaque session token and the customer's profile.
+
+        Raises:
+            InvalidCredentialsError: If no customer matches.
+        """
+        profile = HotelService.authenticate(request)
+        return LoginSession(session_store.create(profile), profile)
+
+    @staticmethod
+    def current_customer(token):
+        """
+        Resolves a session token to its customer from memory (no database access).
+
+        Args:
+            token (str): A token returned by ``login``.
+
+        Returns:
+            CustomerProfile: The logged-in customer.
+
+        Raises:
+            InvalidSessionError: If the token is unknown or has expired.
+        """
+        profile = session_store.get(token) if token else None
+        if profile is None:
+            raise InvalidSessionError("Session expired or invalid. Please log in again.")
+        return profile
+
+    @staticmethod
+    def logout(token):
+        """Ends a session. Returns True if it existed."""
+        return session_store.invalidate(token)
+
+    @staticmethod
+    def get_room(room_id):
+        """
+        Looks up a room in the room cache.
+
+        Raises:
+            NotFoundError: If the room does not exist.
+        """
+        room = room_cache.get(room_id)
+        if room is None:
+            raise NotFoundError(f"Room ID {room_id} does not exist.")
+        return RoomInfo(*room)
+
+    @staticmethod
+    def list_rooms(check_in=None, check_out=None):
+        """
+        Lists rooms in service that are free and not held for a stay.
+
+        Args:
+            check_in (date | str, optional): First night. Defaults to today.
+            check_out (date | str, optional): Departure date. Defaults to the day after check-in.
+
+        Returns:
+            list: RoomInfo objects ordered by room_id.
+        """
+        check_in = HotelService._parse_date("check_in", check_in) if check_in else date.today()
+        check_out = HotelService._parse_date("check_out", check_out) if check_out else None
+        if check_out is not None and check_out < check_in:
+            raise ValidationError("check_out", "Check-out date must not be before the check-in date.")
+        rooms = room_cache.available_rooms()
+        free = set(availability_index.free_rooms([room[0] for room in rooms], check_in, check_out or check_in))
+        free -= hold_table.held_rooms(check_in, check_out or check_in)
+        return [RoomInfo(*room) for room in rooms if room[0] in free]
+
+    @staticmethod
+    def search_rooms(request):
+        """
+        Finds rooms in service that are free and not held for a stay, cheapest first.
+
+        Answered from the columnar room index and the availability index,
+        without a database query.
+
+        Args:
+            request (SearchRequest): Optional room type, dates, nightly price
+                ceiling and result limit.
+
+        Returns:
+            list: RoomInfo objects ordered by price, then room_id.
+
+        Raises:
+            ValidationError: If the dates, price or limit are malformed.
+        """
+        check_in = HotelService._parse_date("check_in", request.check_in) if request.check_in else date.today()
+        check_out = HotelService._parse_date("check_out", request.check_out) if request.check_out else None
+        if check_out is not None and check_out < check_in:
+            raise ValidationError("check_out", "Check-out date must not be before the check-in date.")
+        try:
+            max_price = None if request.max_price in (None, "") else float(request.max_price)
+            limit = None if request.limit in (None, "") else int(request.limit)
+        except (TypeError, ValueError):
+            raise ValidationError("max_price", "The price ceiling and limit must be numbers.")
+        if limit is not None and limit < 1:
+            raise ValidationError("limit", "The limit must be at least 1.")
+        held = hold_table.held_rooms(check_in, check_out or check_in)
+        rooms = room_index.search(request.room_type or None, check_in, check_out or check_in, max_price, limit,
+                                  exclude=held)
+        return [RoomInfo(*room) for room in rooms]
+
+    @staticmethod
+    def quote(request):
+        """
+        Prices a stay and reports whether the room is free for it.
+
+        A room held for the stay by another checkout (see ``hold_room``) is
+        not available.
+
+        Args:
+            request (QuoteRequest): Room, dates and the caller's hold, if any.
+
+        Returns:
+            Quote: Nights, nightly price, total and availability.
+
+        Raises:
+            ValidationError: If the dates are malformed or out of order.
+            NotFoundError: If the room does not exist.
+        """
+        check_in, check_out, nights = HotelService._stay(request.check_in, request.check_out)
+        room = HotelService.get_room(request.room_id)
+        available = (room.is_available and availability_index.is_free(room.room_id, check_in, check_out)
+                     and not hold_table.conflicts(room.room_id, check_in, check_out, request.hold_token))
+        total_amount = rate_engine.quote(room.room_type, room.price, check_in, check_out)
+        return Quote(room.room_id, room.room_type, check_in, check_out, nights,
+                     round(total_amount / nights, 2), total_amount, available, room.price)
+
+    @staticmethod
+    def quote_rooms(check_in, check_out):
+        """
+        Prices a stay in every room that is in service, free and not held for it.
+
+        All rooms are priced with one vectorized call to the rate engine.
+
+        Args:
+            check_in (date | str): First night.
+            check_out (date | str): Departure date.
+
+        Returns:
+            list: Quote objects, cheapest first.
+
+        Raises:
+            ValidationError: If the dates are malformed or out of order.
+        """
+        check_in, check_out, nights = HotelService._stay(check_in, check_out)
+        rooms = room_cache.available_rooms()
+        free = set(availability_index.free_rooms([room[0] for room in rooms], check_in, check_out))
+        free -= hold_table.held_rooms(check_in, check_out)
+        rooms = [room for room in rooms if room[0] in free]
+        totals = rate_engine.quote_rooms(rooms, check_in, check_out).tolist()
+        quotes = [Quote(room[0], room[1], check_in, check_out, nights, round(total / nights, 2), total, True, room[2])
+                  for room, total in zip(rooms, totals)]
+        quotes.sort(key=lambda quote: (quote.total_amount, quote.room_id))
+        return quotes
+
+    @staticmethod
+    def hold_room(request):
+        """
+        Holds a free room for a stay while the customer finishes checkout.
+
+        The hold lives in memory for HOLD_TTL seconds (see ``modules.holds``).
+        Until it expires or is released, quotes, searches and bookings by
+        anyone without its token treat the room as taken for those nights,
+        so no database transaction or lock stays open during checkout.
+        Holding again replaces the customer's own overlapping hold.
+
+        Args:
+            request (HoldRequest): Customer, room and dates.
+
+        Returns:
+            HoldConfirmation: The hold token and its lifetime.
+
+        Raises:
+            ValidationError: If the dates are malformed or out of order.
+            NotFoundError: If the room does not exist.
+            BookingError: If the room is out of service, booked or held by someone else.
+        """
+        check_in, check_out, _ = HotelService._stay(request.check_in, request.check_out)
+        room = HotelService.get_room(request.room_id)
+        if not room.is_available:
+            raise BookingError(f"Room ID {room.room_id} is out of service.")
+        try:
+            # Same lock as ``book``, so a booking cannot slip in between the check and the hold.
+            with room_locks.hold(room_cache.key(room.room_id), ROOM_LOCK_TIMEOUT):
+                if not availability_index.is_free(room.room_id, check_in, check_out):
+                    raise BookingError(f"Room ID {room.room_id} is not available for those dates.")
+                hold = hold_table.place(room.room_id, check_in, check_out, normalize_id(request.customer_id))
+        except LockTimeout:
+            raise BookingConflictError(f"Room ID {room.room_id} is being booked by another request; please retry.")
+        if hold is None:
+            raise BookingError(f"Room ID {room.room_id} is being held by another guest for those dates.")
+        return HoldConfirmation(hold.token, room.room_id, check_in, check_out, round(hold.seconds_left, 1))
+
+    @staticmethod
+    def release_hold(token, customer_id=None):
+        """
+        Releases a hold before it expires, e.g. when checkout is abandoned.
+
+        Args:
+            token (str): A token returned by ``hold_room``.
+            customer_id (int, optional): When set, the hold must belong to this customer.
+
+        Returns:
+            bool: True if a live hold was released.
+        """
+        hold = hold_table.get(token) if token else None
+        if hold is None or (customer_id is not None and hold.customer_id != normalize_id(customer_id)):
+            return False
+        return hold_table.release(token)
+
+    @staticmethod
+    def book(request):
+        """
+        Takes the payment and creates the booking in one atomic write.
+
+        The room must not be held by another checkout; the request's own hold
+        is released once the booking is made. Bookings of the same room by
+        this process are serialized by a per-room lock; across processes the booking's first write is a conditional
+        claim on the room row (see CLAIM_ROOM), whose row count says whether
+        the room was still free.
+
+        Args:
+            request (BookRequest): Customer, room, dates, amount paid and hold token.
+
+        Returns:
+            BookingConfirmation: The new booking and payment ids and the total.
+
+        Raises:
+            ValidationError: If the dates are malformed.
+            NotFoundError: If the room does not exist.
+            BookingConflictError: If a concurrent booking of the room got there
+                first or held its lock too long; the request may be retried.
+            BookingError: If the room is taken, held, out of service, or underpaid.
+        """
+        room_key = room_cache.key(request.room_id)
+        try:
+            with room_locks.hold(room_key, ROOM_LOCK_TIMEOUT):
+                return HotelService._book(request)
+        except LockTimeout:
+            raise BookingConflictError(f"Room ID {room_key} is being booked by another request; please retry.")
+
+    @staticmethod
+    def _book(request):
+        quote = HotelService.quote(
+            QuoteRequest(request.room_id, request.check_in, request.check_out, request.hold_token))
+        if not quote.available:
+            raise BookingError(f"Room ID {quote.room_id} is not available for those dates.")
+        paid_amount = quote.total_amount if request.paid_amount is None else float(request.paid_amount)
+        if paid_amount < quote.total_amount:
+            raise BookingError(f"Insufficient payment! You need to pay at least ${quote.total_amount}.")
+
+        backend = get_backend()
+        room_id = quote.room_id
+        stay_in, stay_out = stay_range(quote.check_in, quote.check_out)
+        try:
+            with get_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    payment_id, booking_id = backend.next_ids(cursor, "payments", "bookings")
+                    cursor.execute(
+                        CLAIM_ROOM, (room_id, quote.base_price, room_id, stay_out, stay_in, stay_in),
+                        name="book.claim_room"
+                    )
+                    if cursor.rowcount != 1:
+                        HotelService._claim_failed(cursor, quote)
+                    if backend.supports_multi_table_insert:
+                        cursor.execute(
+                            BOOK_AND_PAY_INSERT_ALL,
+                            (payment_id, booking_id, paid_amount, datetime.now(), request.customer_id,
+                             quote.check_in, quote.check_out, quote.total_amount, room_id, quote.base_price),
+                            name="book.insert_all"
+                        )
+                        booked = cursor.rowcount == 2
+                    else:
+                        cursor.execute(
+                            BOOK_AND_PAY_PAYMENT,
+                            (payment_id, paid_amount, datetime.now(), room_id, quote.base_price),
+                            name="book.payment"
+                        )
+                        booked = cursor.rowcount == 1
+                        if booked:
+                            cursor.execute(
+                                BOOK_AND_PAY_BOOKING,
+                                (booking_id, payment_id, request.customer_id, quote.check_in, quote.check_out,
+                                 quote.total_amount, room_id),
+                                name="book.booking"
+                            )
+                    if not booked:
+                        raise BookingError(
+                            f"Room ID {room_id} cannot be booked: it is out of service or its price has just changed."
+                        )
+                    Rollups.booked(cursor, quote.room_type, quote.check_in, quote.check_out, quote.total_amount)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+        except BookingConflictError:
+            # Our availability index missed a booking made elsewhere; re-read the room.
+            availability_index.reload_room(room_id)
+            raise
+
+        availability_index.add_booking(booking_id, room_id, quote.check_in, quote.check_out)
+        if request.hold_token:
+            hold_table.release(request.hold_token)
+        event_log.record(PAYMENT_RECORDED, payment_id=payment_id, room_id=room_id, amount=paid_amount)
+        event_log.record(BOOKING_CREATED, booking_id=booking_id, payment_id=payment_id,
+                         customer_id=request.customer_id, room_id=room_id, check_in=quote.check_in,
+                         check_out=quote.check_out, total_amount=quote.total_amount)
+        logger.info(f"Booked room {room_id} for Customer ID {request.customer_id}: booking {booking_id}, "
+                    f"payment {payment_id}, total ${quote.total_amount}.",
+                    extra={"booking_id": booking_id, "customer_id": request.customer_id})
+        return BookingConfirmation(booking_id, payment_id, request.customer_id, room_id, quote.check_in,
+                                   quote.check_out, quote.nights, quote.total_amount, paid_amount)
+
+    @staticmethod
+    def cancel_full(request):
+        """
+        Cancels a confirmed booking and refunds half of its total.
+
+        The refund is appended to the REFUNDS ledger in the same transaction
+        as the booking update; the payment itself is settled later, in batches.
+
+        Args:
+            request (CancelFullRequest): The booking (and optionally its owner).
+
+        Returns:
+            CancellationResult: The new total and the refund.
+
+        Raises:
+            NotFoundError: If the booking does not exist (or belongs to someone else).
+            BookingError: If the booking is already cancelled.
+        """
+        booking_id = normalize_id(request.booking_id)
+        booking = HotelService._load_confirmed_booking(booking_id, request.customer_id)
+        # Resolved before a connection is borrowed: reloading the room cache borrows its own.
+        room_type = Rollups.room_type(booking.room_id)
+        refund_amount = round(booking.total_amount / 2, 2)
+        new_total_amount = round(booking.total_amount - refund_amount, 2)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cancelled_at = datetime.now()
+                cursor.execute(
+                    """
+                    UPDATE bookings
+                    SET cancellation_status = 'CANCELLED',
+                        total_amount = %s,
+                        cancellation_timestamp = %s,
+                        status = 'CANCELLED'
+                    WHERE booking_id = %s AND status = 'CONFIRMED'
+                    """,
+                    (new_total_amount, cancelled_at, booking_id),
+                    name="cancel_full.booking"
+                )
+                if cursor.rowcount != 1:
+                    raise BookingError(f"Booking ID {booking_id} was cancelled concurrently.")
+                RefundLedger.enqueue(cursor, booking.payment_id, refund_amount, booking_id, "CANCELLED", cancelled_at)
+                Rollups.cancelled(cursor, booking, room_type, new_total_amount, refund_amount, cancelled_at)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+        availability_index.cancel_booking(booking_id)
+        event_log.record(BOOKING_CANCELLED, booking_id=booking_id, room_id=booking.room_id,
+                         previous_total=booking.total_amount, total_amount=new_total_amount, refund=refund_amount)
+        event_log.record(REFUND_QUEUED, payment_id=booking.payment_id, booking_id=booking_id, amount=refund_amount)
+        logger.info(f"Full cancellation processed for Booking ID {booking_id}. Refund: {refund_amount} "
+                    f"to this {booking.customer_id} customer",
+                    extra={"booking_id": booking_id, "customer_id": booking.customer_id})
+        return CancellationResult(booking_id, booking.customer_id, "CANCELLED", new_total_amount, refund_amount)
+
+    @staticmethod
+    def cancel_partial(request):
+        """
+        Shortens a confirmed booking to a new check-out date and refunds the difference.
+
+        Like ``cancel_full``, the refund is only queued on the ledger. The
+        booking is read, then repriced from the caches with no connection
+        held, then updated in one transaction.
+
+        Args:
+            request (CancelPartialRequest): The booking and its new check-out date.
+
+        Returns:
+            CancellationResult: The new total and the refund.
+
+        Raises:
+            ValidationError: If the new check-out is not strictly inside the stay.
+            NotFoundError: If the booking does not exist (or belongs to someone else).
+            BookingError: If the booking is already cancelled.
+        """
+        booking_id = normalize_id(request.booking_id)
+        new_check_out = HotelService._parse_date("new_check_out", request.new_check_out)
+        booking = HotelService._load_confirmed_booking(booking_id, request.customer_id)
+        if not booking.check_in < new_check_out < booking.check_out:
+            raise ValidationError(
+                "new_check_out",
+                f"The new check-out date must fall after {booking.check_in} and before {booking.check_out}."
+            )
+        # Priced before a connection is borrowed: reloading the room or rate cache borrows its own.
+        room = HotelService.get_room(booking.room_id)
+        # Repriced with today's rates, but never above what was charged.
+        new_total_amount = min(
+            rate_engine.quote(room.room_type, room.price, booking.check_in, new_check_out),
+            booking.total_amount
+        )
+        refund_amount = round(booking.total_amount - new_total_amount, 2)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cancelled_at = datetime.now()
+                cursor.execute(
+                    """
+                    UPDATE bookings
+                    SET cancellation_status = 'PARTIAL CANCELLED',
+                        total_amount = %s,
+                        check_out = %s,
+                        cancellation_timestamp = %s,
+                        status = 'CANCELLED'
+                    WHERE booking_id = %s AND status = 'CONFIRMED'
+                    """,
+                    (new_total_amount, new_check_out, cancelled_at, booking_id),
+                    name="cancel_partial.booking"
+                )
+                if cursor.rowcount != 1:
+                    raise BookingError(f"Booking ID {booking_id} was cancelled concurrently.")
+                RefundLedger.enqueue(cursor, booking.payment_id, refund_amount, booking_id, "PARTIAL CANCELLED",
+                                     cancelled_at)
+                Rollups.cancelled(cursor, booking, room.room_type, new_total_amount, refund_amount, cancelled_at,
+                                  new_check_out)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+        availability_index.shorten_booking(booking_id, new_check_out)
+        event_log.record(BOOKING_SHORTENED, booking_id=booking_id, room_id=booking.room_id,
+                         check_in=booking.check_in, previous_check_out=booking.check_out, check_out=new_check_out,
+                         previous_total=booking.total_amount, total_amount=new_total_amount, refund=refund_amount)
+        event_log.record(REFUND_QUEUED, payment_id=booking.payment_id, booking_id=booking_id, amount=refund_amount)
+        logger.info(f"Partial cancellation processed. New total amount: ${new_total_amount}..Refund {refund_amount} "
+                    f"to this {booking.customer_id} customer id",
+                    extra={"booking_id": booking_id, "customer_id": booking.customer_id})
+        return CancellationResult(booking_id, booking.customer_id, "PARTIAL CANCELLED", new_total_amount, refund_amount)
+
+    @staticmethod
+    def record_refund(payment_id, refunded_amount, booking_id=None):
+        """
+        Queues a refund of a payment in its own transaction.
+
+        The refund is appended to the REFUNDS ledger; the payment keeps its
+        original amount and is settled later by ``python -m modules.refunds``.
+
+        Args:
+            payment_id (int): ID of the refunded payment.
+            refunded_amount (float): The amount refunded.
+            booking_id (int): The booking being refunded, if known.
+
+        Returns:
+            bool: True if the payment exists and the refund was queued.
+        """
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                refunded_at = datetime.now()
+                queued = RefundLedger.enqueue(cursor, payment_id, refunded_amount, booking_id, "MANUAL", refunded_at)
+                if queued:
+                    Rollups.refunded(cursor, payment_id, refunded_amount, refunded_at)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        if queued:
+            event_log.record(REFUND_QUEUED, payment_id=payment_id, booking_id=booking_id, amount=refunded_amount)
+        return queued
+
+    @staticmethod
+    def set_room_in_service(room_id, in_service):
+        """
+        Takes a room in or out of service (ROOMS.IS_AVAILABLE).
+
+        Args:
+            room_id (int): ID of the room.
+            in_service (bool): Whether the room may be sold.
+
+        Raises:
+            NotFoundError: If the room does not exist.
+        """
+        room_id = normalize_id(room_id)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("UPDATE rooms SET is_available = %s WHERE room_id = %s", (bool(in_service), room_id),
+                               name="room.set_in_service")
+                if cursor.rowcount != 1:
+                    raise NotFoundError(f"Room ID {room_id} does not exist.")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        room_cache.set_availability(room_id, in_service)
+        event_log.record(ROOM_AVAILABILITY_CHANGED, room_id=room_id, is_available=bool(in_service))
+        logger.info(f"Room {room_id} is now {'in' if in_service else 'out of'} service.")
+
+    @staticmethod
+    def daily_report(request):
+        """
+        Reads room nights, revenue, refunds, cancellations, ADR, RevPAR and
+        occupancy per day and room type.
+
+        Served from the DAILY_ROLLUPS counters, so the cost depends on the
+        number of days, not on the number of bookings.
+
+        Args:
+            request (ReportRequest): The date range (inclusive) and an optional room type.
+
+        Returns:
+            list: DailyRollup objects ordered by day, then room type.
+
+        Raises:
+            ValidationError: If the dates are malformed or out of order, or the range exceeds REPORT_MAX_DAYS.
+        """
+        first_day = HotelService._parse_date("from_date", request.from_date)
+        last_day = HotelService._parse_date("to_date", request.to_date)
+        if last_day < first_day:
+            raise ValidationError("to_date", "The end date must not be before the start date.")
+        if (last_day - first_day).days >= REPORT_MAX_DAYS:
+            raise ValidationError("to_date", f"Reports cover at most {REPORT_MAX_DAYS} days.")
+        return Rollups.report(first_day, last_day, request.room_type or None)
+
+    @staticmethod
+    def history(request):
+        """
+        Returns the whole booking history of a customer, oldest booking first.
+
+        Prefer ``iter_history`` for large histories; this collects every page.
+
+        Args:
+            request (HistoryRequest): The customer and optional filters.
+
+        Returns:
+            list: BookingRecord objects.
+        """
+        return list(HotelService.iter_history(request))
+
+    @staticmethod
+    def iter_history(request):
+        """
+        Streams the booking history of a customer, oldest booking first.
+
+        Rows are read one keyset page at a time (``booking_id > last seen``), and
+        the pooled connection is returned between pages, so memory stays bounded
+        by ``request.page_size`` however long the history is.
+
+        Args:
+            request (HistoryRequest): The customer, optional filters and the
+                booking id to start after.
+
+        Yields:
+            BookingRecord: One booking at a time.
+
+        Raises:
+            ValidationError: If a filter is malformed.
+        """
+        after = request.after_booking_id
+        while after is not None:
+            page = HotelService.history_page(HistoryRequest(
+                request.customer_id, request.status, request.from_date, request.to_date, after, request.page_size
+            ))
+            yield from page.records
+            after = page.next_after_booking_id
+
+    @staticmethod
+    def history_page(request):
+        """
+        Returns one keyset page of a customer's booking history.
+
+        Pages are served from the query cache when the same page was read
+        recently and no booking was written since.
+
+        Args:
+            request (HistoryRequest): The customer, filters, the booking id to
+                start after and the page size. ``from_date``/``to_date`` bound
+                the check-in date (inclusive); ``status`` matches BOOKINGS.STATUS.
+
+        Returns:
+            HistoryPage: The records and the ``after_booking_id`` for the next
+                page, or None when this is the last page.
+
+        Raises:
+            ValidationError: If a filter is malformed.
+        """
+        if not 1 <= int(request.page_size) <= 1000:
+            raise ValidationError("page_size", "Page size must be between 1 and 1000.")
+        conditions = ["customer_id = %s", "booking_id > %s"]
+        params = [normalize_id(request.customer_id), int(request.after_booking_id or 0)]
+        if request.status:
+            conditions.append("status = %s")
+            params.append(request.status.upper())
+        if request.from_date:
+            conditions.append("check_in >= %s")
+            params.append(HotelService._parse_date("from_date", request.from_date))
+        if request.to_date:
+            conditions.append("check_in <= %s")
+            params.append(HotelService._parse_date("to_date", request.to_date))
+        params.append(int(request.page_size))
+
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE {' AND '.join(conditions)} "
+                "ORDER BY booking_id LIMIT %s",
+                params,
+                name="history.page",
+                cache=True
+            )
+            rows = cursor.fetchall()
+            cursor.close()
+        records = [HotelService._booking_record(row) for row in rows]
+        logger.info(f"Fetched {len(records)} history rows for Customer ID: {request.customer_id}",
+                    extra={"customer_id": request.customer_id})
+        next_after = records[-1].booking_id if len(records) == int(request.page_size) else None
+        return HistoryPage(records, next_after)
+
+    @staticmethod
+    def _load_confirmed_booking(booking_id, customer_id=None):
+        # Reads the booking on a connection of its own, returned before the caller
+        # touches the caches. The cancellation's UPDATE only matches a booking that
+        # is still CONFIRMED, so a concurrent cancellation in between is caught there.
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                return HotelService._confirmed_booking(cursor, booking_id, customer_id)
+            finally:
+                cursor.close()
+
+    @staticmethod
+    def _confirmed_booking(cursor, booking_id, customer_id=None):
+        cursor.execute(
+            f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE booking_id = %s", (booking_id,), name="cancel.load_booking"
+        )
+        row = cursor.fetchone()
+        if row is None or (customer_id is not None and row[3] != normalize_id(customer_id)):
+            raise NotFoundError(f"No booking found with ID {booking_id}.")
+        booking = HotelService._booking_record(row)
+        if booking.status != 'CONFIRMED':
+            raise BookingError("Booking cannot be cancelled as it is already cancelled.")
+        return booking
+
+    @staticmethod
+    def _claim_failed(cursor, quote):
+        cursor.execute("SELECT is_available, price FROM rooms WHERE room_id = %s", (quote.room_id,),
+                       name="book.claim_check")
+        row = cursor.fetchone()
+        if row is None or not row[0] or float(row[1]) != quote.base_price:
+            raise BookingError(
+                f"Room ID {quote.room_id} cannot be booked: it is out of service or its price has just changed."
+            )
+        raise BookingConflictError(
+            f"Room ID {quote.room_id} was just booked for some of those nights by another request; please retry."
+        )
+
+    @staticmethod
+    def _booking_record(row):
+        record = BookingRecord(*row)
+        record.check_in = to_date(record.check_in)
+        record.check_out = to_date(record.check_out)
+        record.total_amount = float(record.total_amount)
+        return record
+
+    @staticmethod
+    def _parse_date(field, value):
+        try:
+            return to_date(value)
+        except (TypeError, ValueError):
+            raise ValidationError(field, "Dates must use the YYYY-MM-DD format.")
+
+    @staticmethod
+    def _stay(check_in, check_out):
+        check_in = HotelService._parse_date("check_in", check_in)
+        check_out = HotelService._parse_date("check_out", check_out)
+        if check_out < check_in:
+            raise ValidationError("check_out", "Check-out date must be later than the check-in date.")
+        # A same-day stay is billed as one night.
+        return check_in, check_out, max((check_out - check_in).days, 1)
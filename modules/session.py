@@ -0,0 +1,157 @@
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SessionStore:
+    """
+    SessionStore Class
+
+    In-process map from opaque session tokens to the logged-in customer's
+    profile (id, name, email, phone). Login stores the profile once, and every
+    later action resolves the token from memory instead of re-reading the
+    CUSTOMERS table.
+
+    Sessions expire after ``ttl`` seconds without use. The store is also capped
+    at ``max_sessions``: when it is full, the least recently used session is
+    evicted. Memory therefore stays bounded however many guests log in.
+
+    Every session has the same TTL and is moved to the end on use. The
+    OrderedDict is therefore in expiry order too, so expired sessions are
+    trimmed from its head in O(expired).
+    """
+    def __init__(self, ttl=None, max_sessions=None):
+        """
+        Args:
+            ttl (float): Idle seconds before a session expires. Defaults to the
+                SESSION_TTL environment variable, then 1800.
+            max_sessions (int): Most sessions kept at once. Defaults to the
+                SESSION_MAX environment variable, then 50000.
+        """
+        self.ttl = float(os.getenv("SESSION_TTL", "1800")) if ttl is None else ttl
+        self.max_sessions = int(os.getenv("SESSION_MAX", "50000")) if max_sessions is None else max_sessions
+        self._sessions = OrderedDict()  # token -> [profile, expires_at], least recently used first
+        self._by_customer = {}          # customer_id -> set of tokens
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def create(self, profile):
+        """
+        Opens a session for a customer.
+
+        Args:
+            profile (CustomerProfile): The authenticated customer.
+
+        Returns:
+            str: A new opaque token (URL-safe, 256 bits of randomness).
+        """
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._purge_expired_locked(time.monotonic())
+            while len(self._sessions) >= self.max_sessions:
+                self._drop_locked(next(iter(self._sessions)))
+                self.evictions += 1
+            self._sessions[token] = [profile, time.monotonic() + self.ttl]
+            self._by_customer.setdefault(profile.customer_id, set()).add(token)
+        return token
+
+    def get(self, token):
+        """
+        Resolves a token to its customer and extends the session.
+
+        Args:
+            token (str): A token returned by ``create``.
+
+        Returns:
+            CustomerProfile: The customer, or None if the token is unknown or expired.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(token)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    self._drop_locked(token)
+                self.misses += 1
+                return None
+            entry[1] = now + self.ttl
+            self._sessions.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def invalidate(self, token):
+        """
+        Ends one session (logout).
+
+        Returns:
+            bool: True if the session existed.
+        """
+        with self._lock:
+            return self._drop_locked(token)
+
+    def invalidate_customer(self, customer_id):
+        """
+        Ends every session of a customer, e.g. after their record changes.
+
+        Returns:
+            int: The number of sessions ended.
+        """
+        with self._lock:
+            tokens = list(self._by_customer.get(customer_id, ()))
+            for token in tokens:
+                self._drop_locked(token)
+        if tokens:
+            logger.info(f"Invalidated {len(tokens)} session(s) for Customer ID {customer_id}")
+        return len(tokens)
+
+    def purge_expired(self):
+        """
+        Removes expired sessions.
+
+        Returns:
+            int: The number of sessions removed.
+        """
+        with self._lock:
+            return self._purge_expired_locked(time.monotonic())
+
+    def stats(self):
+        """Returns the session count and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _purge_expired_locked(self, now):
+        removed = 0
+        while self._sessions:
+            token, (_, expires_at) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            self._drop_locked(token)
+            removed += 1
+        return removed
+
+    def _drop_locked(self, token):
+        entry = self._sessions.pop(token, None)
+        if entry is None:
+            return False
+        tokens = self._by_customer.get(entry[0].customer_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_customer[entry[0].customer_id]
+        return True
+
+
+# Process-wide store used by HotelService.
+session_store = SessionStore()
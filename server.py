@@ -0,0 +1,442 @@
+"""
+Hotel Booking HTTP Server
+
+Serves the booking system as a JSON API so many guests can be handled
+concurrently by one process, instead of one guest per ``main.py`` process.
+
+The server runs on asyncio and uses only the standard library. Every
+``HotelService`` call blocks on the database, so it runs on a bounded
+thread-pool executor. Each endpoint also has its own concurrency limit:
+a request that would have to wait behind too many others gets
+``503 Service Unavailable`` with ``Retry-After``, instead of piling up
+in memory.
+
+Endpoints:
+- GET  /health
+- GET  /metrics                       Prometheus text: per-query DB latency, rows, errors, pool waits
+- GET  /rooms?check_in=YYYY-MM-DD&check_out=YYYY-MM-DD[&type=Deluxe&max_price=250&limit=20]
+                                      (with type/max_price/limit: cheapest first)
+- POST /customers                     {first_name, last_name, email, password, phone_number}
+- POST /login                         {email, password} -> {token, customer}
+- POST /logout                        *
+- POST /quotes                        {room_id, check_in, check_out}
+- GET  /quotes?check_in=YYYY-MM-DD&check_out=YYYY-MM-DD   (every free room, cheapest first)
+- POST /holds                         * {room_id, check_in, check_out} -> {token, expires_in, ...}
+- DELETE /holds/<token>               * Release a hold before it expires
+- POST /bookings                      * {room_id, check_in, check_out, paid_amount?, hold_token?}
+- POST /bookings/<id>/cancel          * {type: "full" | "partial", new_check_out?}
+- GET  /customers/<id>/history?after=<booking_id>&limit=100&status=CONFIRMED&from=YYYY-MM-DD&to=YYYY-MM-DD
+  * Own history only. Keyset-paginated; pass the returned ``next_after`` as ``after`` for the next page.
+
+Endpoints marked * need ``Authorization: Bearer <token>`` from /login. The
+customer is resolved from the in-memory session store, not the database.
+
+Configuration (environment):
+- HTTP_HOST / HTTP_PORT: Listen address (default 127.0.0.1:8080).
+- HTTP_WORKERS: Executor threads for blocking calls (default 32). Keep
+  DB_POOL_MAX_SIZE close to this so workers do not queue on the pool.
+- HTTP_ENDPOINT_CONCURRENCY: In-flight requests per endpoint (default 16).
+- HTTP_ENDPOINT_QUEUE: Requests allowed to wait per endpoint before 503 (default 64).
+
+Usage:
+    python server.py
+"""
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from urllib.parse import parse_qs, urlsplit
+from config.db_config import warm_up
+from modules.events import event_log
+from modules.service import (
+    AuthenticateRequest,
+    BookRequest,
+    CancelFullRequest,
+    CancelPartialRequest,
+    HistoryRequest,
+    HoldRequest,
+    HotelService,
+    QuoteRequest,
+    RegisterRequest,
+    SearchRequest,
+)
+from utils.exceptions import (
+    BookingError,
+    InvalidCredentialsError,
+    InvalidSessionError,
+    NotFoundError,
+    RegistrationError,
+    ValidationError,
+)
+from utils.logger import get_logger, log_context, setup_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+metrics.describe("http_request_seconds", "Time to serve an HTTP request per endpoint, including queueing.")
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+KEEP_ALIVE_TIMEOUT = 15
+
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+ERROR_STATUS = (
+    (ValidationError, 400),
+    (InvalidCredentialsError, 401),
+    (InvalidSessionError, 401),
+    (NotFoundError, 404),
+    (RegistrationError, 409),
+    (BookingError, 409),
+)
+
+
+class HTTPError(Exception):
+    """Exception raised to answer a request with an error status."""
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class EndpointLimiter:
+    """
+    Caps the number of in-flight and waiting requests for one endpoint.
+
+    Requests beyond ``concurrency`` wait their turn; once ``max_waiting``
+    requests are already waiting, new ones are rejected with 503 at once.
+    """
+    def __init__(self, concurrency, max_waiting):
+        self.concurrency = concurrency
+        self.max_waiting = max_waiting
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self):
+        if self._semaphore.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise HTTPError(503, "Server busy, please retry.", {"Retry-After": "1"})
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+
+def to_json(value):
+    """Serializes service responses (dataclasses, dates) to JSON bytes."""
+    def default(obj):
+        if is_dataclass(obj):
+            return asdict(obj)
+        if isinstance(obj, (date, datetime)):
+            return obj.isoformat()
+        return str(obj)
+    if is_dataclass(value):
+        value = asdict(value)
+    elif isinstance(value, list):
+        value = [asdict(item) if is_dataclass(item) else item for item in value]
+    return json.dumps(value, default=default).encode()
+
+
+class HotelHTTPServer:
+    """
+    HotelHTTPServer Class
+
+    Minimal HTTP/1.1 server (keep-alive, Content-Length bodies) that maps JSON
+    requests onto ``HotelService`` calls executed on a bounded thread pool.
+    """
+    def __init__(self, host=None, port=None, workers=None, concurrency=None, max_waiting=None):
+        self.host = host or os.getenv("HTTP_HOST", "127.0.0.1")
+        self.port = int(port if port is not None else os.getenv("HTTP_PORT", "8080"))
+        self.workers = int(workers or os.getenv("HTTP_WORKERS", "32"))
+        self.concurrency = int(concurrency or os.getenv("HTTP_ENDPOINT_CONCURRENCY", "16"))
+        self.max_waiting = int(max_waiting or os.getenv("HTTP_ENDPOINT_QUEUE", "64"))
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hotel-http")
+        self.server = None
+        self.routes = [
+            ("GET", re.compile(r"^/health$"), "health", self.health),
+            ("GET", re.compile(r"^/metrics$"), "metrics", self.metrics),
+            ("GET", re.compile(r"^/rooms$"), "rooms", self.list_rooms),
+            ("POST", re.compile(r"^/customers$"), "register", self.register),
+            ("POST", re.compile(r"^/login$"), "login", self.login),
+            ("POST", re.compile(r"^/logout$"), "logout", self.logout),
+            ("POST", re.compile(r"^/quotes$"), "quote", self.quote),
+            ("GET", re.compile(r"^/quotes$"), "quote_rooms", self.quote_rooms),
+            ("POST", re.compile(r"^/holds$"), "hold", self.hold),
+            ("DELETE", re.compile(r"^/holds/([A-Za-z0-9_-]+)$"), "release_hold", self.release_hold),
+            ("POST", re.compile(r"^/bookings$"), "book", self.book),
+            ("POST", re.compile(r"^/bookings/(\d+)/cancel$"), "cancel", self.cancel),
+            ("GET", re.compile(r"^/customers/(\d+)/history$"), "history", self.history),
+        ]
+        self.limiters = {name: EndpointLimiter(self.concurrency, self.max_waiting) for _, _, name, _ in self.routes}
+
+    async def start(self):
+        """Starts listening. Returns once the socket is bound."""
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"HTTP server listening on {self.host}:{self.port}")
+
+    async def serve_forever(self):
+        """Starts the server and serves until cancelled."""
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        """Stops accepting connections and shuts the executor down."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False)
+
+    @staticmethod
+    def session_token(headers):
+        """Returns the bearer token of a request, or None."""
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        return token.strip() if scheme.lower() == "bearer" and token.strip() else None
+
+    def customer(self, headers):
+        """
+        Resolves the request's session to its customer, from memory.
+
+        Raises:
+            InvalidSessionError: If the bearer token is missing, unknown or expired.
+        """
+        return HotelService.current_customer(self.session_token(headers))
+
+    async def call(self, func, *args):
+        """Runs a blocking service call on the executor, carrying over the log context."""
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self.executor, context.run, func, *args)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, payload, extra_headers = await self.dispatch(method, target, headers, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self.write_response(writer, status, payload, extra_headers, keep_alive)
+                if not keep_alive:
+                    break
+        except HTTPError as e:
+            await self.write_response(writer, e.status, {"error": e.message}, e.headers, False)
+        except Exception as e:
+            logger.error(f"HTTP connection error: {e}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(413, "Request headers too large.")
+        if not head.strip():
+            return None
+        if len(head) > MAX_HEADER_BYTES:
+            raise HTTPError(413, "Request headers too large.")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line.")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length.")
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length.")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    async def write_response(self, writer, status, payload, extra_headers=None, keep_alive=True):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            body, content_type = to_json(payload), "application/json"
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+        headers.update(extra_headers or {})
+        head = f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    async def dispatch(self, method, target, headers, body):
+        """Routes one request. Returns (status, payload, headers)."""
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        path_matched = False
+        for route_method, pattern, name, handler in self.routes:
+            match = pattern.match(url.path)
+            if not match:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            try:
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise HTTPError(400, "Request body must be a JSON object.")
+                ids = {"customer_id": data.get("customer_id")}
+                if name == "history":
+                    ids["customer_id"] = match.group(1)
+                elif name == "cancel":
+                    ids["booking_id"] = match.group(1)
+                start = time.perf_counter()
+                try:
+                    with log_context(request_id=uuid.uuid4().hex[:16], **ids):
+                        async with self.limiters[name]:
+                            status, payload = await handler(match, query, data, headers)
+                finally:
+                    metrics.observe("http_request_seconds", time.perf_counter() - start, endpoint=name)
+                return status, payload, {}
+            except HTTPError as e:
+                return e.status, {"error": e.message}, e.headers
+            except json.JSONDecodeError:
+                return 400, {"error": "Request body is not valid JSON."}, {}
+            except (KeyError, TypeError) as e:
+                return 400, {"error": f"Missing or invalid field: {e}"}, {}
+            except Exception as e:
+                for error_type, status in ERROR_STATUS:
+                    if isinstance(e, error_type):
+                        if getattr(e, "retryable", False):
+                            return status, {"error": str(e), "retryable": True}, {"Retry-After": "1"}
+                        return status, {"error": str(e)}, {}
+                logger.error(f"Unhandled error on {method} {url.path}: {e}", exc_info=True)
+                return 500, {"error": "Internal server error."}, {}
+        if path_matched:
+            return 405, {"error": "Method not allowed."}, {}
+        return 404, {"error": "Not found."}, {}
+
+    async def health(self, match, query, data, headers):
+        return 200, {"status": "ok"}
+
+    async def metrics(self, match, query, data, headers):
+        return 200, metrics.render()
+
+    async def list_rooms(self, match, query, data, headers):
+        if any(key in query for key in ("type", "max_price", "limit")):
+            request = SearchRequest(query.get("type"), query.get("check_in"), query.get("check_out"),
+                                    query.get("max_price"), query.get("limit"))
+            return 200, await self.call(HotelService.search_rooms, request)
+        rooms = await self.call(HotelService.list_rooms, query.get("check_in"), query.get("check_out"))
+        return 200, rooms
+
+    async def register(self, match, query, data, headers):
+        request = RegisterRequest(data["first_name"], data["last_name"], data["email"],
+                                  data["password"], data["phone_number"])
+        return 201, await self.call(HotelService.register, request)
+
+    async def login(self, match, query, data, headers):
+        request = AuthenticateRequest(data["email"], data["password"])
+        return 200, await self.call(HotelService.login, request)
+
+    async def logout(self, match, query, data, headers):
+        HotelService.logout(self.session_token(headers))
+        return 200, {"status": "logged out"}
+
+    async def quote(self, match, query, data, headers):
+        request = QuoteRequest(data["room_id"], data["check_in"], data["check_out"])
+        return 200, await self.call(HotelService.quote, request)
+
+    async def quote_rooms(self, match, query, data, headers):
+        if "check_in" not in query or "check_out" not in query:
+            raise HTTPError(400, "check_in and check_out are required.")
+        return 200, await self.call(HotelService.quote_rooms, query["check_in"], query["check_out"])
+
+    async def hold(self, match, query, data, headers):
+        customer = self.customer(headers)
+        request = HoldRequest(customer.customer_id, data["room_id"], data["check_in"], data["check_out"])
+        return 201, await self.call(HotelService.hold_room, request)
+
+    async def release_hold(self, match, query, data, headers):
+        customer = self.customer(headers)
+        if not HotelService.release_hold(match.group(1), customer.customer_id):
+            raise HTTPError(404, "Hold not found or already expired.")
+        return 200, {"status": "released"}
+
+    async def book(self, match, query, data, headers):
+        customer = self.customer(headers)
+        request = BookRequest(customer.customer_id, data["room_id"], data["check_in"], data["check_out"],
+                              data.get("paid_amount"), data.get("hold_token"))
+        return 201, await self.call(HotelService.book, request)
+
+    async def cancel(self, match, query, data, headers):
+        customer = self.customer(headers)
+        booking_id = int(match.group(1))
+        kind = data.get("type", "full")
+        if kind == "full":
+            request = CancelFullRequest(booking_id, customer.customer_id)
+            return 200, await self.call(HotelService.cancel_full, request)
+        if kind == "partial":
+            request = CancelPartialRequest(booking_id, data["new_check_out"], customer.customer_id)
+            return 200, await self.call(HotelService.cancel_partial, request)
+        raise HTTPError(400, "type must be 'full' or 'partial'.")
+
+    async def history(self, match, query, data, headers):
+        customer_id = int(match.group(1))
+        if self.customer(headers).customer_id != customer_id:
+            raise HTTPError(403, "Sessions can only read their own history.")
+        try:
+            after = int(query.get("after", 0))
+            limit = int(query.get("limit", 100))
+        except ValueError:
+            raise HTTPError(400, "after and limit must be integers.")
+        request = HistoryRequest(
+            customer_id, query.get("status"), query.get("from"), query.get("to"), after, limit
+        )
+        page = await self.call(HotelService.history_page, request)
+        return 200, {"bookings": page.records, "next_after": page.next_after_booking_id}
+
+
+def main():
+    setup_logger()
+    event_log.warm_start()
+    if os.getenv("DB_WARMUP", "1") != "0":
+        warm_up()  # Connect before listening, so the first request does not pay the handshake
+    server = HotelHTTPServer()
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logging.info("HTTP server stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,17 @@
+-- Id sequences. Inserts draw ids with <TABLE>_SEQ.NEXTVAL up front (see
+-- StorageBackend.next_ids) so the new id is known without re-querying.
+-- When migrating existing tables, START each sequence above the current MAX id.
+create sequence if not exists HOTEL.PUBLIC.CUSTOMERS_SEQ start = 1 increment = 1;
+create sequence if not exists HOTEL.PUBLIC.PAYMENTS_SEQ start = 1 increment = 1;
+create sequence if not exists HOTEL.PUBLIC.BOOKINGS_SEQ start = 1 increment = 1;
+create sequence if not exists HOTEL.PUBLIC.REFUNDS_SEQ start = 1 increment = 1;
+create sequence if not exists HOTEL.PUBLIC.RATE_PLANS_SEQ start = 1 increment = 1;
+
+
+
+
 create or replace TABLE HOTEL.PUBLIC.BOOKINGS (
-	BOOKING_ID NUMBER(38,0) NOT NULL autoincrement start 1 increment 1 noorder,
+	BOOKING_ID NUMBER(38,0) NOT NULL DEFAULT HOTEL.PUBLIC.BOOKINGS_SEQ.NEXTVAL,
 	PAYMENT_ID NUMBER(38,0),
 	ROOM_ID NUMBER(38,0),
 	CUSTOMER_ID NUMBER(38,0),
@@ -21,7 +33,7 @@ create or replace TABLE HOTEL.PUBLIC.BOOKINGS (
 
 
 create or replace TABLE HOTEL.PUBLIC.CUSTOMERS (
-	CUSTOMER_ID NUMBER(38,0) NOT NULL autoincrement start 1 increment 1 noorder,
+	CUSTOMER_ID NUMBER(38,0) NOT NULL DEFAULT HOTEL.PUBLIC.CUSTOMERS_SEQ.NEXTVAL,
 	FIRST_NAME VARCHAR(50) NOT NULL,
 	LAST_NAME VARCHAR(50) NOT NULL,
 	EMAIL VARCHAR(100) NOT NULL,
@@ -37,14 +49,32 @@ create or replace TABLE HOTEL.PUBLIC.CUSTOMERS (
 
 
 create or replace TABLE HOTEL.PUBLIC.PAYMENTS (
-	PAYMENT_ID NUMBER(38,0) NOT NULL autoincrement start 1 increment 1 noorder,
+	PAYMENT_ID NUMBER(38,0) NOT NULL DEFAULT HOTEL.PUBLIC.PAYMENTS_SEQ.NEXTVAL,
 	ROOM_ID NUMBER(38,0),
 	PAYMENT_DATE TIMESTAMP_NTZ(9) DEFAULT CURRENT_TIMESTAMP(),
 	AMOUNT NUMBER(10,2) NOT NULL,
 	ISREFUND BOOLEAN DEFAULT FALSE,
 	REFUNDED_AMOUNT FLOAT DEFAULT 0,
+	SETTLED_REFUND_ID NUMBER(38,0) DEFAULT 0,
 	primary key (PAYMENT_ID)
 );
+-- Existing tables: alter table HOTEL.PUBLIC.PAYMENTS add column if not exists SETTLED_REFUND_ID NUMBER(38,0) DEFAULT 0;
+
+
+
+
+-- Append-only refund ledger. Cancellations insert a row; the settlement job
+-- (python -m modules.refunds) folds the rows into PAYMENTS.REFUNDED_AMOUNT and
+-- records the last settled REFUND_ID there. Rows are never updated or deleted.
+create table if not exists HOTEL.PUBLIC.REFUNDS (
+	REFUND_ID NUMBER(38,0) NOT NULL DEFAULT HOTEL.PUBLIC.REFUNDS_SEQ.NEXTVAL,
+	PAYMENT_ID NUMBER(38,0) NOT NULL,
+	BOOKING_ID NUMBER(38,0),
+	AMOUNT NUMBER(10,2) NOT NULL,
+	REASON VARCHAR(32),
+	CREATED_AT TIMESTAMP_NTZ(9) DEFAULT CURRENT_TIMESTAMP(),
+	primary key (REFUND_ID)
+);
 
 
 
@@ -54,5 +84,41 @@ create or replace TABLE HOTEL.PUBLIC.ROOMS (
 	ROOM_TYPE VARCHAR(16777216),
 	PRICE FLOAT,
 	IS_AVAILABLE BOOLEAN,
+	VERSION NUMBER(38,0) NOT NULL DEFAULT 0,
 	primary key (ROOM_ID)
-);
\ No newline at end of file
+);
+-- VERSION is bumped by every booking of the room (see CLAIM_ROOM in modules/service.py).
+-- Existing tables: alter table HOTEL.PUBLIC.ROOMS add column if not exists VERSION NUMBER(38,0) NOT NULL DEFAULT 0;
+
+
+
+
+-- Pricing rules applied to ROOMS.PRICE by modules.rates.RateEngine. A rule with
+-- MIN_NIGHTS <= 1 multiplies each covered night [START_DATE, END_DATE) whose
+-- weekday (Monday=0) is listed in WEEKDAYS; a rule with MIN_NIGHTS > 1
+-- multiplies whole stays of at least that many nights starting in the window.
+-- NULL ROOM_TYPE, dates or WEEKDAYS mean "any".
+create table if not exists HOTEL.PUBLIC.RATE_PLANS (
+	RATE_PLAN_ID NUMBER(38,0) NOT NULL DEFAULT HOTEL.PUBLIC.RATE_PLANS_SEQ.NEXTVAL,
+	NAME VARCHAR(100) NOT NULL,
+	ROOM_TYPE VARCHAR(16777216),
+	START_DATE DATE,
+	END_DATE DATE,
+	WEEKDAYS VARCHAR(20),
+	MIN_NIGHTS NUMBER(38,0) DEFAULT 1,
+	MULTIPLIER FLOAT NOT NULL DEFAULT 1,
+	primary key (RATE_PLAN_ID)
+);
+
+-- Daily revenue and occupancy counters per room type, updated by bookings,
+-- cancellations and refunds (modules/rollups.py). For existing bookings, fill
+-- them once with: python -m modules.rollups reconcile --fix
+create table if not exists HOTEL.PUBLIC.DAILY_ROLLUPS (
+	STAY_DATE DATE NOT NULL,
+	ROOM_TYPE VARCHAR(16777216) NOT NULL,
+	ROOM_NIGHTS NUMBER(38,0) NOT NULL DEFAULT 0,
+	REVENUE FLOAT NOT NULL DEFAULT 0,
+	REFUNDS FLOAT NOT NULL DEFAULT 0,
+	CANCELLATIONS NUMBER(38,0) NOT NULL DEFAULT 0,
+	primary key (STAY_DATE, ROOM_TYPE)
+);
@@ -0,0 +1,379 @@
+import logging
+import threading
+import time
+from collections import deque
+
+
+class PoolExhaustedError(Exception):
+    """Exception raised when no pooled connection becomes available in time."""
+    pass
+
+
+class PooledConnection:
+    """
+    Thin proxy around a borrowed database connection.
+
+    Behaves like the underlying DB-API connection, except that ``close()`` and
+    leaving a ``with`` block hand the connection back to its pool instead of
+    tearing it down, so existing ``conn.close()`` call sites keep working.
+
+    A connection handed back with an open transaction (writes reported with
+    ``note_write``, or the driver's ``in_transaction`` flag) is rolled back
+    first, so the next borrower neither inherits nor commits that work.
+    """
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._released = False
+        self._writes = []  # ``note_write`` callbacks of the open transaction (None for no callback)
+
+    @property
+    def raw(self):
+        """The underlying driver connection."""
+        return self._raw
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        """Opens a driver cursor, wrapped by the pool's ``cursor_wrapper`` if one is set."""
+        cursor = self._raw.cursor(*args, **kwargs)
+        wrapper = self._pool.cursor_wrapper
+        return wrapper(cursor, self) if wrapper else cursor
+
+    def note_write(self, on_end=None):
+        """
+        Records that the open transaction has written something.
+
+        Args:
+            on_end (callable): Called once when the transaction ends: on
+                ``commit()``, ``rollback()`` or the connection's return to the pool.
+        """
+        self._writes.append(on_end)
+
+    def commit(self):
+        """Commits the open transaction and runs its ``note_write`` callbacks."""
+        try:
+            return self._raw.commit()
+        finally:
+            self._end_transaction()
+
+    def rollback(self):
+        """Rolls back the open transaction and runs its ``note_write`` callbacks."""
+        try:
+            return self._raw.rollback()
+        finally:
+            self._end_transaction()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            try:
+                self.rollback()
+            except Exception:
+                # A broken connection must not go back into circulation.
+                self._release(discard=True)
+                return False
+        self.close()
+        return False
+
+    def close(self):
+        """Returns the connection to the pool. Safe to call more than once."""
+        self._release(discard=False)
+
+    def _release(self, discard):
+        if self._released:
+            return
+        self._released = True
+        if not discard and (self._writes or getattr(self._raw, "in_transaction", False)):
+            try:
+                self._raw.rollback()
+            except Exception as e:
+                logging.warning(f"Discarding pooled connection that failed to roll back: {e}")
+                discard = True
+        self._end_transaction()
+        self._pool.release(self._raw, discard=discard)
+
+    def _end_transaction(self):
+        writes, self._writes = self._writes, []
+        for on_end in writes:
+            if on_end is not None:
+                on_end()
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of reusable database connections.
+
+    Connections are created lazily by ``factory`` up to ``max_size``. Idle
+    connections older than ``idle_timeout`` seconds are closed, and every
+    checkout is validated with ``health_check`` so a dead connection is
+    replaced transparently instead of being handed to the caller.
+
+    Usage:
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            ...
+    """
+    def __init__(self, factory, max_size=5, idle_timeout=300, acquire_timeout=30, health_check=None,
+                 cursor_wrapper=None):
+        """
+        Initializes the pool. No connection is opened until the first checkout.
+
+        Args:
+            factory (callable): Zero-argument callable returning a new DB-API connection.
+            max_size (int): Maximum number of open connections (idle + borrowed).
+            idle_timeout (float): Seconds an idle connection may live before eviction.
+            acquire_timeout (float): Default seconds to wait for a free connection.
+            health_check (callable): Returns True if a connection is usable. Defaults
+                to ``ConnectionPool.default_health_check``.
+            cursor_wrapper (callable): ``f(cursor, connection)`` wrapping every
+                cursor opened on a borrowed ``PooledConnection`` (e.g. for
+                instrumentation). Health checks use raw cursors.
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.health_check = health_check or ConnectionPool.default_health_check
+        self.cursor_wrapper = cursor_wrapper
+
+        self._idle = deque()  # (connection, last_used) pairs, most recent on the right
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._health_failures = 0
+        self._acquires = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @staticmethod
+    def default_health_check(conn):
+        """
+        Checks a connection before it is handed out.
+
+        Uses the driver's cheap ``is_closed()`` flag when available (Snowflake),
+        otherwise falls back to a ``SELECT 1`` probe.
+
+        Args:
+            conn: The raw connection to check.
+
+        Returns:
+            bool: True if the connection looks usable.
+        """
+        is_closed = getattr(conn, "is_closed", None)
+        if callable(is_closed):
+            return not is_closed()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            return True
+        finally:
+            cursor.close()
+
+    def acquire(self, timeout=None):
+        """
+        Borrows a connection from the pool, opening a new one if allowed.
+
+        Args:
+            timeout (float): Seconds to wait when the pool is at ``max_size``.
+                Defaults to ``acquire_timeout``.
+
+        Returns:
+            PooledConnection: A proxy that returns the connection on ``close()``.
+
+        Raises:
+            PoolExhaustedError: If no connection becomes free within ``timeout``.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            stale = []
+            candidate = None
+            create = False
+            with self._cond:
+                if self._closed:
+                    raise PoolExhaustedError("Connection pool is closed.")
+                stale = self._collect_stale_locked(time.monotonic())
+                while candidate is None and not create:
+                    if self._idle:
+                        candidate, _ = self._idle.pop()
+                    elif self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._record_wait_locked(time.monotonic() - started)
+                            raise PoolExhaustedError(
+                                f"No database connection available after {timeout} seconds."
+                            )
+                        self._cond.wait(remaining)
+            self._close_quietly(stale)
+
+            if create:
+                try:
+                    raw = self.factory()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._misses += 1
+                    self._record_wait_locked(time.monotonic() - started)
+                return PooledConnection(self, raw)
+
+            if self._is_healthy(candidate):
+                with self._cond:
+                    self._hits += 1
+                    self._record_wait_locked(time.monotonic() - started)
+                return PooledConnection(self, candidate)
+
+            logging.warning("Discarding unhealthy pooled connection.")
+            with self._cond:
+                self._health_failures += 1
+            self.release(candidate, discard=True)
+
+    def connection(self, timeout=None):
+        """
+        Context-manager form of ``acquire``.
+
+        Args:
+            timeout (float): See ``acquire``.
+
+        Returns:
+            PooledConnection: Usable directly in a ``with`` statement.
+        """
+        return self.acquire(timeout)
+
+    def release(self, conn, discard=False):
+        """
+        Returns a raw connection to the pool.
+
+        Args:
+            conn: The raw connection previously handed out by ``acquire``.
+            discard (bool): Close the connection instead of keeping it idle.
+        """
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+                conn = None
+            self._cond.notify()
+        if conn is not None:
+            self._close_quietly([conn])
+
+    def prefill(self, count=1):
+        """
+        Opens connections ahead of demand, so the first checkouts skip the connect handshake.
+
+        Connections are borrowed through ``acquire`` (reusing idle ones first)
+        and handed straight back, so afterwards at least ``count`` are idle,
+        up to ``max_size``.
+
+        Args:
+            count (int): Connections to have ready.
+
+        Returns:
+            int: Idle connections after prefilling.
+        """
+        borrowed = []
+        try:
+            for _ in range(min(int(count), self.max_size)):
+                borrowed.append(self.acquire())
+        finally:
+            for conn in borrowed:
+                conn.close()
+        with self._cond:
+            return len(self._idle)
+
+    def evict_idle(self):
+        """
+        Closes idle connections that have exceeded ``idle_timeout``.
+
+        Returns:
+            int: Number of connections evicted.
+        """
+        with self._cond:
+            stale = self._collect_stale_locked(time.monotonic())
+        self._close_quietly(stale)
+        return len(stale)
+
+    def close_all(self):
+        """Closes every idle connection and refuses further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        self._close_quietly(idle)
+
+    def stats(self):
+        """
+        Reports pool usage counters.
+
+        Returns:
+            dict: size, idle, in_use, hits, misses, evictions, health_failures,
+            acquires, and acquire wait times (total/avg/max, in seconds).
+        """
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "health_failures": self._health_failures,
+                "acquires": self._acquires,
+                "acquire_wait_total": self._wait_total,
+                "acquire_wait_avg": self._wait_total / self._acquires if self._acquires else 0.0,
+                "acquire_wait_max": self._wait_max,
+            }
+
+    def _collect_stale_locked(self, now):
+        stale = []
+        # The deque is ordered by last use, so expired entries sit on the left.
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            stale.append(self._idle.popleft()[0])
+        self._size -= len(stale)
+        self._evictions += len(stale)
+        if stale:
+            self._cond.notify(len(stale))
+        return stale
+
+    def _record_wait_locked(self, waited):
+        self._acquires += 1
+        self._wait_total += waited
+        if waited > self._wait_max:
+            self._wait_max = waited
+
+    def _is_healthy(self, conn):
+        try:
+            return bool(self.health_check(conn))
+        except Exception as e:
+            logging.warning(f"Pooled connection health check failed: {e}")
+            return False
+
+    @staticmethod
+    def _close_quietly(connections):
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                logging.warning(f"Error closing pooled connection: {e}")
@@ -5,3 +5,30 @@ class RegistrationError(Exception):
 class LoginError(Exception):
     """Exception raised for errors in the login process."""
     pass
+
+class BookingError(Exception):
+    """Exception raised when a booking cannot be created or changed."""
+    pass
+
+class InvalidCredentialsError(LoginError):
+    """Exception raised when an email and password do not match a customer."""
+    pass
+
+class InvalidSessionError(LoginError):
+    """Exception raised when a session token is unknown or has expired."""
+    pass
+
+class ValidationError(Exception):
+    """Exception raised when a request field fails validation."""
+    def __init__(self, field, message):
+        super().__init__(f"{field}: {message}")
+        self.field = field
+        self.message = message
+
+class NotFoundError(Exception):
+    """Exception raised when a requested room, booking or customer does not exist."""
+    pass
+
+class BookingConflictError(BookingError):
+    """Exception raised when a concurrent booking of the same room won the race; the request may be retried."""
+    retryable = True
@@ -0,0 +1,211 @@
+import re
+import time
+from functools import lru_cache
+from utils.metrics import ROW_BUCKETS, metrics
+from utils.query_cache import read_tables, written_tables
+
+metrics.describe("db_query_execute_seconds", "Time spent in cursor.execute per named query.")
+metrics.describe("db_query_fetch_seconds", "Time spent fetching results per named query.")
+metrics.describe("db_query_rows", "Rows returned (or affected) per named query.")
+metrics.describe("db_query_errors_total", "Failed statements per named query and error type.")
+metrics.describe("db_pool_acquire_seconds", "Time spent waiting for a pooled connection.")
+metrics.describe("db_warmup_seconds", "Time spent opening connections ahead of the first query.")
+metrics.describe("db_query_cache_total", "Query result cache lookups per named query and result (hit/miss).")
+
+_VERB = re.compile(r"^\s*(INSERT\s+ALL|\w+)", re.IGNORECASE)
+_TABLE = {
+    "select": re.compile(r"\bFROM\s+([\w.]+)", re.IGNORECASE),
+    "delete": re.compile(r"\bFROM\s+([\w.]+)", re.IGNORECASE),
+    "insert": re.compile(r"\bINTO\s+([\w.]+)", re.IGNORECASE),
+    "update": re.compile(r"^\s*UPDATE\s+([\w.]+)", re.IGNORECASE),
+}
+
+
+@lru_cache(maxsize=1024)
+def query_name(sql):
+    """
+    Derives a stable metric name from a statement, e.g. ``select_bookings``.
+
+    Used when the call site does not pass ``name=``.
+    """
+    verb = _VERB.match(sql)
+    if not verb:
+        return "other"
+    verb = re.sub(r"\s+", "_", verb.group(1).lower())
+    table = _TABLE.get(verb)
+    table = table.search(sql) if table else None
+    return f"{verb}_{table.group(1).split('.')[-1].lower()}" if table else verb
+
+
+class InstrumentedCursor:
+    """
+    DB-API cursor wrapper that times every statement.
+
+    For each named query it records execute latency, fetch latency, and rows
+    returned (rows fetched for queries, ``rowcount`` for writes) in histograms,
+    and counts errors by type. Call sites name a statement with
+    ``cursor.execute(sql, params, name="book.payment")``; unnamed statements
+    are named from their verb and table.
+
+    With a ``QueryCache``, ``cursor.execute(sql, params, cache=True)`` is
+    answered from the cache when it can be, and stores the result otherwise
+    (fetched in full at once). Every write reports its tables to the cache
+    and to the cursor's pooled connection, which releases them when the
+    transaction commits or rolls back, or the connection goes back to the
+    pool. A cursor with no connection releases them on ``close()``.
+
+    Everything else is delegated to the driver cursor.
+    """
+    def __init__(self, cursor, statement_options=None, query_cache=None, connection=None):
+        """
+        Args:
+            cursor: The driver cursor.
+            statement_options (callable): ``f(name)`` returning extra keyword
+                arguments for the driver's ``execute`` (e.g. a Snowflake QUERY_TAG).
+            query_cache (QueryCache): Result cache for ``cache=True`` queries
+                and table invalidation on writes.
+            connection (PooledConnection): The connection the cursor belongs
+                to, told about every write (see ``PooledConnection.note_write``).
+        """
+        self._cursor = cursor
+        self._statement_options = statement_options
+        self._cache = query_cache if query_cache is not None and query_cache.enabled else None
+        self._name = None
+        self._rows = None
+        self._buffer = None       # Rows of a cached (or cache-filled) result, served by the fetch methods
+        self._description = None
+        self._connection = connection
+        self._writes = []         # Tables passed to ``begin_write`` with no connection to release them
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    @property
+    def description(self):
+        return self._description if self._buffer is not None else self._cursor.description
+
+    def execute(self, sql, params=None, name=None, cache=False):
+        """
+        Executes a statement.
+
+        Args:
+            sql (str): The statement.
+            params: Bind parameters.
+            name (str): Metric name of the statement.
+            cache (bool): Serve this read-only query from the query cache,
+                and cache its result on a miss.
+        """
+        options = {}
+        if self._statement_options:
+            options = self._statement_options(name or query_name(sql))
+        if params is None:
+            execute = lambda: self._cursor.execute(sql, **options)
+        else:
+            execute = lambda: self._cursor.execute(sql, params, **options)
+        if cache and self._cache is not None:
+            return self._cached_execute(sql, params, name, execute)
+        self._track_writes(sql)
+        return self._timed_execute(sql, name, execute)
+
+    def executemany(self, sql, seq_of_params, name=None):
+        self._track_writes(sql)
+        return self._timed_execute(sql, name, lambda: self._cursor.executemany(sql, seq_of_params))
+
+    def fetchone(self):
+        if self._buffer is not None:
+            return self._buffer.pop(0) if self._buffer else None
+        return self._timed_fetch(self._cursor.fetchone, lambda row: 0 if row is None else 1)
+
+    def fetchmany(self, size=None):
+        if self._buffer is not None:
+            size = getattr(self._cursor, "arraysize", 1) if size is None else size
+            rows, self._buffer[:size] = self._buffer[:size], []
+            return rows
+        fetch = self._cursor.fetchmany if size is None else (lambda: self._cursor.fetchmany(size))
+        return self._timed_fetch(fetch, len)
+
+    def fetchall(self):
+        if self._buffer is not None:
+            rows, self._buffer = self._buffer, []
+            return rows
+        return self._timed_fetch(self._cursor.fetchall, len)
+
+    def close(self):
+        self._finish()
+        while self._writes:
+            self._cache.end_write(self._writes.pop())
+        return self._cursor.close()
+
+    def _cached_execute(self, sql, params, name, execute):
+        query = name or query_name(sql)
+        key = self._cache.key(sql, params)
+        entry = self._cache.get(key)
+        if entry is not None:
+            metrics.inc("db_query_cache_total", query=query, result="hit")
+            self._finish()
+            self._buffer, self._description = list(entry.rows), entry.description
+            return self
+        metrics.inc("db_query_cache_total", query=query, result="miss")
+        tables = read_tables(sql)
+        versions = self._cache.versions(tables)
+        result = self._timed_execute(sql, name, execute)
+        rows = self._timed_fetch(self._cursor.fetchall, len)
+        description = self._cursor.description
+        self._cache.put(key, tables, rows, description, versions)
+        self._buffer, self._description = list(rows), description
+        return result
+
+    def _track_writes(self, sql):
+        if self._cache is None and self._connection is None:
+            return
+        tables = written_tables(sql)
+        if tables is not None and not tables:
+            return
+        on_end = None
+        if self._cache is not None:
+            self._cache.begin_write(tables)
+            if self._connection is None:
+                self._writes.append(tables)
+            else:
+                cache = self._cache
+                on_end = lambda: cache.end_write(tables)
+        if self._connection is not None:
+            self._connection.note_write(on_end)
+
+    def _timed_execute(self, sql, name, execute):
+        self._finish()
+        self._buffer = None
+        query = name or query_name(sql)
+        start = time.perf_counter()
+        try:
+            result = execute()
+        except Exception as e:
+            metrics.inc("db_query_errors_total", query=query, error=type(e).__name__)
+            raise
+        finally:
+            metrics.observe("db_query_execute_seconds", time.perf_counter() - start, query=query)
+        self._name = query
+        return self if result is self._cursor else result
+
+    def _timed_fetch(self, fetch, count):
+        start = time.perf_counter()
+        result = fetch()
+        if self._name is not None:
+            metrics.observe("db_query_fetch_seconds", time.perf_counter() - start, query=self._name)
+            self._rows = (self._rows or 0) + count(result)
+        return result
+
+    def _finish(self):
+        # Rows are reported once per statement, when the next one starts or the cursor closes.
+        if self._name is None:
+            return
+        rows = self._rows
+        if rows is None:
+            rowcount = getattr(self._cursor, "rowcount", -1)
+            rows = rowcount if rowcount is not None and rowcount >= 0 else 0
+        metrics.observe("db_query_rows", rows, buckets=ROW_BUCKETS, query=self._name)
+        self._name = None
+        self._rows = None
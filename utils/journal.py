@@ -0,0 +1,273 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single writer assumed
+    fcntl = None
+
+# Record layout: payload length, CRC-32 of (sequence + payload), sequence, then
+# the JSON payload. A record whose length or CRC does not check out ends the
+# segment: it is the torn tail of a write that never completed.
+_RECORD = struct.Struct("<IIQ")
+# The lock file also holds the journal head: base sequence of the active
+# segment and the last sequence written, so writers in other processes can
+# tell with one read whether someone appended since they last did.
+_HEAD = struct.Struct("<QQ")
+_SEGMENT_SUFFIX = ".seg"
+_SNAPSHOT_SUFFIX = ".snapshot.json"
+
+
+class Journal:
+    """
+    Append-only, segmented record log on local disk.
+
+    Records are JSON objects numbered by a gapless sequence starting at 1.
+    They are appended to the active segment file until it reaches
+    ``segment_bytes``; the next record then starts a new segment named after
+    its sequence number, so a reader can skip whole segments that precede the
+    position it resumes from. Segments are read through ``mmap``.
+
+    Several processes may append to the same directory: each append holds an
+    exclusive lock on ``journal.lock`` for the duration of the write.
+
+    Snapshots are whole-state JSON files tagged with the sequence they include,
+    so a consumer restores a snapshot and replays only the records after it.
+    """
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024, fsync=False):
+        """
+        Args:
+            directory (str): Directory holding the segments, snapshots and lock file.
+            segment_bytes (int): Size after which a new segment is started.
+            fsync (bool): fsync every append, not just flush it to the OS.
+        """
+        self.directory = directory
+        self.segment_bytes = int(segment_bytes)
+        self.fsync = fsync
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._lock_fd = os.open(os.path.join(directory, "journal.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        self._segment = None    # Open append handle of the active segment
+        self._base = 0          # Base sequence of the active segment
+        self._offset = 0        # End of the last valid record in the active segment
+        self._seq = 0           # Last sequence written
+        self.appends = 0
+        with self._lock, self._locked():
+            self._recover()
+
+    def append(self, record):
+        """
+        Appends a record.
+
+        Args:
+            record (dict): JSON-serializable record; dates and other values are
+                written with ``str``.
+
+        Returns:
+            int: The sequence number of the record.
+        """
+        payload = json.dumps(record, separators=(",", ":"), default=str).encode("utf-8")
+        with self._lock, self._locked():
+            self._catch_up()
+            seq = self._seq + 1
+            if self._offset and self._offset + _RECORD.size + len(payload) > self.segment_bytes:
+                self._open_segment(seq, create=True)
+            frame = _RECORD.pack(len(payload), zlib.crc32(struct.pack("<Q", seq) + payload), seq) + payload
+            self._segment.write(frame)
+            self._segment.flush()
+            if self.fsync:
+                os.fsync(self._segment.fileno())
+            self._offset += len(frame)
+            self._seq = seq
+            self._write_head()
+            self.appends += 1
+            return seq
+
+    def read(self, after=0):
+        """
+        Yields the records that follow a sequence number, in order.
+
+        Args:
+            after (int): Last sequence already seen; 0 for the whole journal.
+
+        Yields:
+            tuple: (sequence, record).
+        """
+        bases = self.segments()
+        for i, base in enumerate(bases):
+            if i + 1 < len(bases) and bases[i + 1] <= after + 1:
+                continue  # Every record of this segment is at or before ``after``
+            for seq, offset, payload in self._scan(self._segment_path(base)):
+                if seq > after:
+                    yield seq, json.loads(payload)
+
+    def last_seq(self):
+        """Returns the last sequence written by any process."""
+        with self._lock, self._locked():
+            self._catch_up()
+            return self._seq
+
+    def segments(self):
+        """Returns the base sequence numbers of the segments, oldest first."""
+        return sorted(int(name[:-len(_SEGMENT_SUFFIX)]) for name in os.listdir(self.directory)
+                      if name.endswith(_SEGMENT_SUFFIX))
+
+    def save_snapshot(self, name, seq, state):
+        """
+        Writes a snapshot atomically.
+
+        Args:
+            name (str): Snapshot name (one file per name).
+            seq (int): Last journal sequence reflected in ``state``.
+            state: JSON-serializable state.
+        """
+        path = os.path.join(self.directory, name + _SNAPSHOT_SUFFIX)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"seq": seq, "state": state}, f, separators=(",", ":"), default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def load_snapshot(self, name):
+        """
+        Reads a snapshot written by ``save_snapshot``.
+
+        Returns:
+            tuple: (seq, state), or (0, None) if there is no readable snapshot.
+        """
+        try:
+            with open(os.path.join(self.directory, name + _SNAPSHOT_SUFFIX)) as f:
+                snapshot = json.load(f)
+            return int(snapshot["seq"]), snapshot["state"]
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return 0, None
+
+    def compact(self, upto):
+        """
+        Deletes the segments whose records are all at or before ``upto``.
+
+        The active segment is always kept.
+
+        Returns:
+            int: Number of segments deleted.
+        """
+        with self._lock, self._locked():
+            self._catch_up()
+            bases = self.segments()
+            removed = 0
+            for i, base in enumerate(bases[:-1]):
+                if bases[i + 1] - 1 <= upto and base != self._base:
+                    os.remove(self._segment_path(base))
+                    removed += 1
+            return removed
+
+    def stats(self):
+        """Returns the last sequence, segment count, bytes on disk and appends made by this process."""
+        bases = self.segments()
+        size = sum(os.path.getsize(self._segment_path(base)) for base in bases)
+        return {"last_seq": self.last_seq(), "segments": len(bases), "bytes": size, "appends": self.appends}
+
+    def close(self):
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+            os.close(self._lock_fd)
+
+    def _segment_path(self, base):
+        return os.path.join(self.directory, f"{base:020d}{_SEGMENT_SUFFIX}")
+
+    def _locked(self):
+        return _FileLock(self._lock_fd)
+
+    def _read_head(self):
+        os.lseek(self._lock_fd, 0, os.SEEK_SET)
+        data = os.read(self._lock_fd, _HEAD.size)
+        return _HEAD.unpack(data) if len(data) == _HEAD.size else None
+
+    def _write_head(self):
+        os.lseek(self._lock_fd, 0, os.SEEK_SET)
+        os.write(self._lock_fd, _HEAD.pack(self._base, self._seq))
+
+    def _recover(self):
+        # Finds the active segment and its last valid record; a torn tail is cut off.
+        bases = self.segments()
+        if not bases:
+            self._open_segment(1, create=True)
+            self._write_head()
+            return
+        self._open_segment(bases[-1])
+        self._offset, self._seq = 0, bases[-1] - 1
+        for seq, offset, payload in self._scan(self._segment_path(self._base)):
+            self._offset = offset
+            self._seq = seq
+        if os.path.getsize(self._segment_path(self._base)) > self._offset:
+            os.truncate(self._segment_path(self._base), self._offset)
+        self._write_head()
+
+    def _catch_up(self):
+        # Another process appended (or started a segment) since our last append.
+        head = self._read_head()
+        if head is None or head == (self._base, self._seq):
+            return
+        base, _ = head
+        if base != self._base:
+            self._open_segment(base)
+            self._offset = 0
+        for seq, offset, payload in self._scan(self._segment_path(self._base), self._offset):
+            self._offset = offset
+            self._seq = seq
+
+    def _open_segment(self, base, create=False):
+        if self._segment is not None:
+            self._segment.close()
+        path = self._segment_path(base)
+        if create:
+            open(path, "ab").close()
+            self._offset = 0
+        self._segment = open(path, "ab")
+        self._base = base
+
+    @staticmethod
+    def _scan(path, start=0):
+        """Yields (sequence, end offset, payload bytes) for each valid record of a segment."""
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size <= start:
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    offset = start
+                    while offset + _RECORD.size <= size:
+                        length, crc, seq = _RECORD.unpack_from(view, offset)
+                        end = offset + _RECORD.size + length
+                        if end > size:
+                            return
+                        payload = view[offset + _RECORD.size:end]
+                        if zlib.crc32(struct.pack("<Q", seq) + payload) != crc:
+                            return
+                        yield seq, end, payload
+                        offset = end
+        except FileNotFoundError:
+            return
+
+
+class _FileLock:
+    """Exclusive ``flock`` on a file descriptor for the duration of a ``with`` block."""
+    def __init__(self, fd):
+        self.fd = fd
+
+    def __enter__(self):
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        return False
@@ -0,0 +1,56 @@
+import threading
+from contextlib import contextmanager
+
+
+class LockTimeout(Exception):
+    """Exception raised when a lock could not be taken in time."""
+    pass
+
+
+class StripedLock:
+    """
+    A fixed set of locks shared out by key.
+
+    Each key maps to one of ``stripes`` locks by hash, so work on the same key
+    is serialized while work on different keys almost always runs in parallel,
+    without a lock per key or a global lock.
+    """
+    def __init__(self, stripes=256):
+        """
+        Args:
+            stripes (int): Number of locks; more stripes mean fewer unrelated keys sharing one.
+        """
+        self._locks = [threading.Lock() for _ in range(max(int(stripes), 1))]
+        self.waits = 0
+        self.timeouts = 0
+
+    def lock_for(self, key):
+        """Returns the lock guarding ``key``."""
+        return self._locks[hash(key) % len(self._locks)]
+
+    @contextmanager
+    def hold(self, key, timeout=-1):
+        """
+        Holds the lock of ``key`` for the duration of a ``with`` block.
+
+        Args:
+            key: Any hashable key.
+            timeout (float): Seconds to wait for the lock; -1 waits forever.
+
+        Raises:
+            LockTimeout: If the lock could not be taken within ``timeout``.
+        """
+        lock = self.lock_for(key)
+        if not lock.acquire(blocking=False):
+            self.waits += 1
+            if not lock.acquire(timeout=timeout):
+                self.timeouts += 1
+                raise LockTimeout(f"Timed out after {timeout}s waiting for the lock of {key!r}.")
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def stats(self):
+        """Returns the stripe count and how often callers had to wait or gave up."""
+        return {"stripes": len(self._locks), "waits": self.waits, "timeouts": self.timeouts}
@@ -1,21 +1,188 @@
+import atexit
+import contextvars
+import gzip
+import json
 import logging
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Identifiers attached to every record logged while they are bound (see log_context).
+CONTEXT_FIELDS = ("request_id", "customer_id", "booking_id")
+
+_context = contextvars.ContextVar("log_context", default={})
+_lock = threading.Lock()
+_listener = None
+
+
+@contextmanager
+def log_context(**fields):
+    """
+    Binds identifiers to every log record emitted inside the ``with`` block.
+
+    Bindings nest, follow the current thread or asyncio task, and are removed
+    again on exit.
+
+    Args:
+        **fields: Values such as ``request_id``, ``customer_id`` or ``booking_id``.
+    """
+    token = _context.set({**_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the bound log context onto the record on the emitting thread."""
+    def filter(self, record):
+        for key, value in _context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line."""
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key in CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SizeAndTimeRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotates when the file reaches ``maxBytes`` or is older than ``interval`` seconds.
+
+    Rotated files are gzip-compressed (``hotel_system.log.1.gz`` ...).
+    """
+    def __init__(self, filename, max_bytes, interval, backup_count):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._compress
+
+    def shouldRollover(self, record):
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+    @staticmethod
+    def _compress(source, dest):
+        if not os.path.exists(source):
+            return
+        with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(source)
+
+
+def _level(value, default):
+    if value is None or value == "":
+        return default
+    if str(value).upper() in ("OFF", "NONE"):
+        return None
+    return logging.getLevelName(str(value).upper())
+
 
 def setup_logger():
     """
-    Sets up the logger for the hotel management system.
+    Configures logging for the hotel management system, once per process.
+
+    Records are put on an in-memory queue by a ``QueueHandler`` and written by a
+    ``QueueListener`` thread, so callers never block on file or console I/O.
+    Two sinks are attached, each with its own level:
 
-    This function configures the logging system to log messages to a specified log file.
-    It defines the log format, log level, and file mode. It also sets the log level for
-    the Snowflake connector to WARNING to reduce verbosity.
+    - the log file (LOG_FILE, default ``hotel_system.log``) as JSON lines,
+      rotated at LOG_MAX_BYTES (default 10 MB) or every LOG_ROTATE_SECONDS
+      (default one day), keeping LOG_BACKUP_COUNT (default 7) gzipped files.
+      Level: LOG_FILE_LEVEL, falling back to LOG_LEVEL (default INFO).
+    - stdout in plain text. Level: LOG_STDOUT_LEVEL (default WARNING; OFF disables it).
+
+    The Snowflake connector's own logger is kept at WARNING to reduce verbosity.
+    Calling this again is a no-op.
 
     Returns:
-        logging.Logger: The configured logger instance.
-    """
-    logging.basicConfig(
-        filename='hotel_system.log',
-        filemode='a',
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        level=logging.INFO
-    )
-    logging.getLogger('snowflake.connector').setLevel(logging.WARNING)
-    return logging.getLogger()
\ No newline at end of file
+        logging.Logger: The configured root logger.
+    """
+    global _listener
+    root = logging.getLogger()
+    with _lock:
+        if _listener is not None:
+            return root
+
+        file_level = _level(os.getenv("LOG_FILE_LEVEL"), _level(os.getenv("LOG_LEVEL"), logging.INFO))
+        stdout_level = _level(os.getenv("LOG_STDOUT_LEVEL"), logging.WARNING)
+
+        handlers = []
+        if file_level is not None:
+            file_handler = SizeAndTimeRotatingFileHandler(
+                os.getenv("LOG_FILE", "hotel_system.log"),
+                max_bytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+                interval=int(os.getenv("LOG_ROTATE_SECONDS", "86400")),
+                backup_count=int(os.getenv("LOG_BACKUP_COUNT", "7")),
+            )
+            file_handler.setLevel(file_level)
+            file_handler.setFormatter(JsonFormatter())
+            handlers.append(file_handler)
+        if stdout_level is not None:
+            stdout_handler = logging.StreamHandler(sys.stdout)
+            stdout_handler.setLevel(stdout_level)
+            stdout_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            handlers.append(stdout_handler)
+
+        queue_handler = QueueHandler(queue.SimpleQueue())
+        queue_handler.addFilter(ContextFilter())
+        root.handlers = [queue_handler]
+        levels = [handler.level for handler in handlers]
+        root.setLevel(min(levels) if levels else logging.CRITICAL)
+        logging.getLogger('snowflake.connector').setLevel(logging.WARNING)
+
+        _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logger)
+    return root
+
+
+def shutdown_logger():
+    """Drains the log queue and closes the sinks; safe to call more than once."""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def get_logger(name):
+    """
+    Returns a named logger without configuring anything.
+
+    Modules use this at import time; the entry point (``main.py``, ``server.py``,
+    scripts) calls ``setup_logger`` once.
+    """
+    return logging.getLogger(name)
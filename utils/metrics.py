@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Latency buckets in seconds, from sub-millisecond SQLite lookups to slow warehouse queries.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of counters and histograms keyed by metric name and labels.
+
+    Metrics are created on first use; ``render()`` produces the Prometheus text
+    exposition format.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # name -> {labels: Histogram}
+        self._counters = {}    # name -> {labels: float}
+        self._help = {}
+
+    def describe(self, name, help_text):
+        """Sets the HELP line of a metric."""
+        self._help[name] = help_text
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        """Records one observation in the histogram ``name`` for ``labels``."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        """Adds ``amount`` to the counter ``name`` for ``labels``."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def snapshot(self, name):
+        """
+        Returns the series of one metric as ``{labels: value}``.
+
+        Histograms are summarised as ``{"count", "sum"}``; counters as numbers.
+        """
+        with self._lock:
+            if name in self._histograms:
+                return {key: {"count": h.count, "sum": h.total} for key, h in self._histograms[name].items()}
+            return dict(self._counters.get(name, {}))
+
+    def reset(self):
+        """Drops every recorded series (used by benchmarks between runs)."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text, ending with a newline.
+        """
+        lines = []
+        with self._lock:
+            for name in sorted(self._counters):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_labels(key)} {value}")
+            for name in sorted(self._histograms):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_labels(key + (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(key)} {histogram.total}")
+                    lines.append(f"{name}_count{_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Writes ``render()`` to ``path`` atomically (for node_exporter's textfile collector)."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+def _labels(key):
+    if not key:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+
+def start_file_exporter(path=None, interval=None):
+    """
+    Starts a daemon thread that rewrites the metrics file periodically.
+
+    Args:
+        path (str): Output file (METRICS_FILE). Nothing is started if unset.
+        interval (float): Seconds between writes (METRICS_INTERVAL, default 15).
+
+    Returns:
+        threading.Thread: The exporter thread, or None if no path is configured.
+    """
+    path = path or os.getenv("METRICS_FILE")
+    if not path:
+        return None
+    interval = float(interval or os.getenv("METRICS_INTERVAL", "15"))
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                metrics.write(path)
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=run, name="metrics-exporter", daemon=True)
+    thread.start()
+    return thread
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,275 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+_WHITESPACE = re.compile(r"\s+")
+_VERB = re.compile(r"^\s*(\w+)", re.IGNORECASE)
+_READ_TABLES = re.compile(r"\b(?:FROM|JOIN)\s+([\w.]+)", re.IGNORECASE)
+_WRITE_TABLES = {
+    "insert": re.compile(r"\bINTO\s+([\w.]+)", re.IGNORECASE),   # Every target of an INSERT ALL
+    "merge": re.compile(r"^\s*MERGE\s+INTO\s+([\w.]+)", re.IGNORECASE),
+    "update": re.compile(r"^\s*UPDATE\s+([\w.]+)", re.IGNORECASE),
+    "delete": re.compile(r"^\s*DELETE\s+FROM\s+([\w.]+)", re.IGNORECASE),
+    "truncate": re.compile(r"^\s*TRUNCATE\s+(?:TABLE\s+)?([\w.]+)", re.IGNORECASE),
+    "alter": re.compile(r"^\s*ALTER\s+TABLE\s+([\w.]+)", re.IGNORECASE),
+    "drop": re.compile(r"^\s*DROP\s+TABLE\s+(?:IF\s+EXISTS\s+)?([\w.]+)", re.IGNORECASE),
+}
+# Statements that never change table contents.
+_READ_ONLY = {"select", "with", "show", "describe", "desc", "explain", "pragma",
+              "begin", "commit", "rollback", "savepoint", "release", "use", "set"}
+
+
+def _table(name):
+    return name.split(".")[-1].lower()
+
+
+@lru_cache(maxsize=1024)
+def read_tables(sql):
+    """Returns the tables a query reads (every FROM and JOIN), lower-cased."""
+    return frozenset(_table(name) for name in _READ_TABLES.findall(sql))
+
+
+@lru_cache(maxsize=1024)
+def written_tables(sql):
+    """
+    Returns the tables a statement writes, lower-cased.
+
+    Returns:
+        frozenset: Empty for read-only statements, or None when the statement
+            may write but its tables cannot be told (treated as every table).
+    """
+    verb = _VERB.match(sql)
+    verb = verb.group(1).lower() if verb else ""
+    if verb in _READ_ONLY:
+        return frozenset()
+    pattern = _WRITE_TABLES.get(verb)
+    tables = frozenset(_table(name) for name in pattern.findall(sql)) if pattern else frozenset()
+    return tables or None
+
+
+def _size_of(rows, sample=8):
+    # Approximate bytes held by a result: the list, plus its row tuples and
+    # their values extrapolated from the first few rows, so sizing a result
+    # costs far less than fetching it.
+    if not rows:
+        return sys.getsizeof(rows)
+    head = rows[:sample]
+    row_bytes = sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in head)
+    return sys.getsizeof(rows) + row_bytes * len(rows) // len(head)
+
+
+class _Entry:
+    __slots__ = ("rows", "description", "tables", "size", "expires_at")
+
+    def __init__(self, rows, description, tables, size, expires_at):
+        self.rows = rows
+        self.description = description
+        self.tables = tables
+        self.size = size
+        self.expires_at = expires_at
+
+
+class QueryCache:
+    """
+    Read-through cache of query results, keyed by normalized SQL and bind parameters.
+
+    Only statements executed with ``cache=True`` (see ``InstrumentedCursor``)
+    are cached. Entries are evicted least recently used first once their total
+    estimated size exceeds ``max_bytes``, and expire after ``ttl`` seconds,
+    which bounds how stale a result can get from writes made by other
+    processes.
+
+    Writes made in this process invalidate by table. When a cursor runs an
+    INSERT, UPDATE, DELETE or MERGE, every entry reading one of its tables is
+    dropped, and the tables stay marked as being written until its transaction
+    commits or rolls back (or its connection goes back to the pool), when
+    their entries are dropped again. While a table is being written, and when a write started after a
+    read did, results are not stored. That way a result read before a write
+    commits never outlives it.
+    """
+    def __init__(self, max_bytes=16 * 1024 * 1024, ttl=30):
+        """
+        Args:
+            max_bytes (int): Bytes of cached results kept at most; 0 disables the cache.
+            ttl (float): Seconds a result may be served for.
+        """
+        self.max_bytes = int(max_bytes)
+        self.ttl = float(ttl)
+        self._entries = OrderedDict()  # key -> _Entry, least recently used first
+        self._by_table = {}            # table -> set of keys
+        self._versions = {}            # table -> writes started
+        self._writers = {}             # table -> uncommitted writes
+        self._global_version = 0       # Writes whose tables are unknown count against every table
+        self._global_writers = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(sql, params=None):
+        """
+        Builds the cache key of a statement.
+
+        Whitespace in the SQL is collapsed, so the same query written on one
+        line or several shares an entry.
+
+        Returns:
+            tuple: (normalized SQL, parameters as a hashable tuple).
+        """
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        elif params is not None:
+            params = tuple(params)
+        return _WHITESPACE.sub(" ", sql).strip(), params
+
+    def versions(self, tables):
+        """Returns the write versions of ``tables``; pass them to ``put`` with the result."""
+        with self._lock:
+            return self._global_version, tuple(self._versions.get(table, 0) for table in sorted(tables))
+
+    def get(self, key):
+        """
+        Returns the cached entry for a key, or None.
+
+        Returns:
+            _Entry: With ``rows`` and the cursor ``description`` of the result.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove_locked(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, tables, rows, description, versions):
+        """
+        Stores a result, unless one of its tables was written since ``versions`` was taken.
+
+        Args:
+            key (tuple): From ``key``.
+            tables (frozenset): Tables the query reads.
+            rows (list): The fetched rows.
+            description: The cursor's ``description`` for the result.
+            versions (tuple): From ``versions``, taken before the query ran.
+
+        Returns:
+            bool: True if the result was stored.
+        """
+        size = _size_of(rows)
+        with self._lock:
+            if (size > self.max_bytes or self._global_writers
+                    or any(self._writers.get(table) for table in tables)
+                    or versions != (self._global_version,
+                                    tuple(self._versions.get(table, 0) for table in sorted(tables)))):
+                self.skipped += 1
+                return False
+            self._remove_locked(key)
+            self._entries[key] = _Entry(rows, description, tables, size, time.monotonic() + self.ttl)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove_locked(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def begin_write(self, tables):
+        """
+        Marks tables as being written by an open cursor and drops their entries.
+
+        Args:
+            tables (frozenset): From ``written_tables``; None for every table.
+        """
+        with self._lock:
+            if tables is None:
+                self._global_writers += 1
+                self._global_version += 1
+            else:
+                for table in tables:
+                    self._writers[table] = self._writers.get(table, 0) + 1
+                    self._versions[table] = self._versions.get(table, 0) + 1
+            self._invalidate_locked(tables)
+
+    def end_write(self, tables):
+        """Ends a ``begin_write`` once the writer's transaction is over, dropping the tables' entries again."""
+        with self._lock:
+            if tables is None:
+                self._global_writers -= 1
+                self._global_version += 1
+            else:
+                for table in tables:
+                    self._writers[table] -= 1
+                    if not self._writers[table]:
+                        del self._writers[table]
+                    self._versions[table] = self._versions.get(table, 0) + 1
+            self._invalidate_locked(tables)
+
+    def invalidate(self, tables=None):
+        """Drops the entries reading any of ``tables``, or every entry."""
+        with self._lock:
+            if tables is None:
+                self._global_version += 1
+            else:
+                for table in tables:
+                    self._versions[table] = self._versions.get(table, 0) + 1
+            self._invalidate_locked(tables)
+
+    def clear(self):
+        """Drops every entry and resets the counters."""
+        with self._lock:
+            self._invalidate_locked(None)
+            self._global_version += 1
+            self.hits = self.misses = self.evictions = self.invalidations = self.skipped = 0
+
+    def stats(self):
+        """Returns hit/miss counters, entries and bytes held."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "skipped": self.skipped,
+            }
+
+    def _invalidate_locked(self, tables):
+        if tables is None:
+            keys = list(self._entries)
+        else:
+            keys = {key for table in tables for key in self._by_table.get(table, ())}
+        for key in keys:
+            self._remove_locked(key)
+        self.invalidations += len(keys)
+
+    def _remove_locked(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
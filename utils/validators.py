@@ -0,0 +1,36 @@
+import re
+
+# Patterns are compiled once at import; the validators run on every registration
+# and on every row of a bulk import.
+NAME_PATTERN = re.compile(r'^[A-Za-z\s]{2,52}$')
+EMAIL_PATTERN = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+PASSWORD_PATTERN = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@#$%^&+=])[^\s]{8,}$')
+# +1-800-555-1234, +44 20 1234 5678, 1(800)555-1234, 800.555.1234, +91 1234567890
+PHONE_PATTERN = re.compile(r'^\+?\d{1,3}?[-.\s]?(\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}$')
+NON_DIGIT_PATTERN = re.compile(r'\D')
+
+NAME_RULE = "It should contain only alphabets, be 2-52 characters long, and may include spaces."
+EMAIL_RULE = "Invalid email format."
+PASSWORD_RULE = ("It must be at least 8 characters long and contain at least one uppercase letter, "
+                 "one lowercase letter, one digit, one special character, and no spaces.")
+PHONE_RULE = "It should contain 10 digits and may include spaces, dashes, parentheses, and a country code."
+
+
+def is_valid_name(name):
+    """Returns True if the name has only alphabets and spaces and is 2-52 characters long."""
+    return NAME_PATTERN.match(name) is not None
+
+
+def is_valid_email(email):
+    """Returns True if the email address is well formed."""
+    return EMAIL_PATTERN.match(email) is not None
+
+
+def is_valid_password(password):
+    """Returns True if the password has 8+ characters, upper, lower, digit, special character and no spaces."""
+    return PASSWORD_PATTERN.match(password) is not None
+
+
+def is_valid_phone(phone_number):
+    """Returns True if the phone number has exactly 10 digits in a common format."""
+    return PHONE_PATTERN.match(phone_number) is not None and len(NON_DIGIT_PATTERN.sub('', phone_number)) == 10